@@ -2,13 +2,15 @@
 Unified reporting and analytics dashboard
 """
 from decimal import Decimal
-from django.db.models import Sum, Count, Q, Avg
+from django.db.models import Sum, Count, Q, F
 from django.utils import timezone
 from datetime import timedelta, date
 from app_inventory.models import Inventory, StockTransaction, LumberProduct
-from app_sales.models import SalesOrder, SalesOrderItem, Customer
+from app_sales.models import SalesOrder, Customer
 from app_delivery.models import Delivery
 from app_supplier.models import PurchaseOrder, Supplier, SupplierPriceHistory
+from app_sales.cube import SalesCube
+from app_sales.receivables import Receivables
 
 
 class ComprehensiveReports:
@@ -76,15 +78,7 @@ class ComprehensiveReports:
         ).distinct().count()
         
         # Credit/Outstanding metrics
-        outstanding = SalesOrder.objects.filter(
-            payment_type='credit',
-            balance__gt=0
-        ).aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
-        
-        customers_with_credit = SalesOrder.objects.filter(
-            payment_type='credit',
-            balance__gt=0
-        ).values('customer').distinct().count()
+        outstanding, customers_with_credit = Receivables.outstanding_credit()
         
         return {
             'period_days': days,
@@ -172,42 +166,26 @@ class ComprehensiveReports:
     @staticmethod
     def aged_receivables(days_threshold=30):
         """
-        Get aged receivables (credit/SOA orders)
+        Get aged receivables (credit/SOA orders) per customer
         
         Args:
-            days_threshold: Days past due
+            days_threshold: Only orders at least this many days old
             
         Returns:
-            List of aged receivables
+            Dict with the total and per customer the overdue balance in
+            0-30/31-60/61-90/90+ day buckets (see Receivables.aging)
         """
-        cutoff_date = timezone.now() - timedelta(days=days_threshold)
-        
-        aged = SalesOrder.objects.filter(
-            payment_type='credit',
-            balance__gt=0,
-            created_at__lte=cutoff_date
-        ).select_related('customer').order_by('-created_at')
-        
-        total = Decimal('0')
-        items = []
-        for so in aged:
-            total += so.balance
-            items.append({
-                'so_number': so.so_number,
-                'customer_name': so.customer.name,
-                'customer_id': so.customer.id,
-                'total_amount': float(so.total_amount),
-                'amount_paid': float(so.amount_paid),
-                'balance': float(so.balance),
-                'days_old': (timezone.now() - so.created_at).days,
-                'created_at': so.created_at.isoformat()
-            })
+        aging = Receivables.aging(min_age=days_threshold)
         
         return {
             'days_threshold': days_threshold,
-            'total_outstanding': float(total),
-            'count': len(items),
-            'items': items
+            'as_of': aging['as_of'].isoformat(),
+            'total_outstanding': aging['total_outstanding'],
+            'buckets': aging['buckets'],
+            'bucket_labels': aging['bucket_labels'],
+            'count': aging['order_count'],
+            'customer_count': aging['customer_count'],
+            'items': [{**row, 'oldest_date': row['oldest_date'].isoformat()} for row in aging['customers']]
         }
     
     @staticmethod
@@ -221,16 +199,14 @@ class ComprehensiveReports:
         Returns:
             List of products with sales metrics
         """
-        cutoff_date = timezone.now() - timedelta(days=days)
-        
-        products = SalesOrderItem.objects.filter(
-            sales_order__created_at__gte=cutoff_date
-        ).values('product__id', 'product__name', 'product__sku').annotate(
+        products = SalesCube.product_facts(SalesCube.since(days)).values(
+            'product__id', 'product__name', 'product__sku'
+        ).annotate(
             total_pieces=Sum('quantity_pieces'),
             total_bf=Sum('board_feet'),
-            total_revenue=Sum('subtotal'),
-            transaction_count=Count('sales_order'),
-            avg_unit_price=Avg('unit_price')
+            total_revenue=Sum('revenue'),
+            transaction_count=Sum('line_count'),
+            avg_unit_price=Sum('unit_price_total') / Sum('line_count')
         ).order_by('-total_revenue')
         
         return list(products)
@@ -246,16 +222,14 @@ class ComprehensiveReports:
         Returns:
             Dict with category metrics
         """
-        cutoff_date = timezone.now() - timedelta(days=days)
-        
-        categories = SalesOrderItem.objects.filter(
-            sales_order__created_at__gte=cutoff_date
-        ).values('product__category__name').annotate(
-            total_revenue=Sum('subtotal'),
-            total_items=Count('id'),
+        categories = SalesCube.product_facts(SalesCube.since(days)).values(
+            product__category__name=F('category__name')
+        ).annotate(
+            total_revenue=Sum('revenue'),
+            total_items=Sum('line_count'),
             total_pieces=Sum('quantity_pieces'),
-            avg_item_value=Avg('subtotal'),
-            margin_estimate=Sum('subtotal')  # Would need cost tracking for actual margin
+            avg_item_value=Sum('revenue') / Sum('line_count'),
+            margin_estimate=Sum('revenue')  # Would need cost tracking for actual margin
         ).order_by('-total_revenue')
         
         return list(categories)
@@ -273,17 +247,13 @@ class ComprehensiveReports:
         """
         cutoff_date = timezone.now() - timedelta(days=days)
         
-        # Cash inflows from sales
-        cash_sales = SalesOrder.objects.filter(
-            created_at__gte=cutoff_date,
-            payment_type__in=['cash', 'partial']
-        ).aggregate(Sum('amount_paid'))['amount_paid__sum'] or Decimal('0')
-        
-        # Credit sales (to be collected)
-        credit_sales = SalesOrder.objects.filter(
-            created_at__gte=cutoff_date,
-            payment_type='credit'
-        ).aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0')
+        # Cash inflows from sales and credit sales (to be collected) in one pass
+        sales = SalesOrder.objects.filter(created_at__gte=cutoff_date).aggregate(
+            cash_sales=Sum('amount_paid', filter=Q(payment_type__in=['cash', 'partial']), default=Decimal('0')),
+            credit_sales=Sum('total_amount', filter=Q(payment_type='credit'), default=Decimal('0')),
+        )
+        cash_sales = sales['cash_sales']
+        credit_sales = sales['credit_sales']
         
         # Cash outflows (purchases)
         cash_outflows = PurchaseOrder.objects.filter(
@@ -294,18 +264,16 @@ class ComprehensiveReports:
         # Net cash position estimate
         net_position = cash_sales - cash_outflows
         
+        # Open credit from the customer ledger, one row per customer
+        outstanding_receivables, _ = Receivables.outstanding_credit()
+        
         return {
             'period_days': days,
             'cash_inflows': float(cash_sales),
             'credit_sales_outstanding': float(credit_sales),
             'cash_outflows': float(cash_outflows),
             'net_cash_position': float(net_position),
-            'outstanding_receivables': float(
-                SalesOrder.objects.filter(
-                    payment_type='credit',
-                    balance__gt=0
-                ).aggregate(Sum('balance'))['balance__sum'] or 0
-            )
+            'outstanding_receivables': float(outstanding_receivables)
         }
     
     @staticmethod
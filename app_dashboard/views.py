@@ -3,7 +3,6 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Sum, Count, Q, F, Avg
-from django.db.models.functions import TruncDate
 from django.utils import timezone
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
@@ -15,8 +14,12 @@ from app_dashboard.serializers import DashboardMetricSerializer
 from app_dashboard.reporting import ComprehensiveReports
 from app_inventory.models import Inventory, StockTransaction, LumberProduct
 from app_inventory.services import InventoryService
-from app_sales.models import SalesOrder
+from app_sales.fulfillment import FulfillmentReports
+from app_sales.heatmap import SalesHeatmap
+from app_sales.closing import DailyClose
+from app_sales.reporting import SalesReports
 from app_delivery.models import Delivery
+from core import business_dates
 
 
 class DashboardMetricViewSet(viewsets.ReadOnlyModelViewSet):
@@ -40,16 +43,14 @@ class DashboardMetricViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def sales_summary(self, request):
         """Get sales summary metrics"""
-        today = timezone.now().date()
+        today = business_dates.business_date()
         
-        daily_sales = SalesOrder.objects.filter(created_at__date=today).aggregate(
-            total=Sum('total_amount'),
-            count=Count('id')
-        )
+        # Read from the end-of-day close once today is closed
+        daily_sales = DailyClose.daily_totals(today, today)
         
         return Response({
-            'daily_sales_amount': float(daily_sales['total'] or 0),
-            'daily_sales_count': daily_sales['count'],
+            'daily_sales_amount': float(daily_sales[0]['total_sales']) if daily_sales else 0.0,
+            'daily_sales_count': daily_sales[0]['order_count'] if daily_sales else 0,
         })
     
     @action(detail=False, methods=['get'])
@@ -243,6 +244,20 @@ class DashboardMetricViewSet(viewsets.ReadOnlyModelViewSet):
             'suppliers': suppliers
         })
     
+    @action(detail=False, methods=['get'])
+    def fulfillment_latency(self, request):
+        """Get order fulfillment stage latency, throughput and backlog"""
+        days = int(request.query_params.get('days', 30))
+        report = FulfillmentReports.pipeline_latency(days=days)
+        return Response(report)
+    
+    @action(detail=False, methods=['get'])
+    def sales_heatmap(self, request):
+        """Get order count, revenue and board feet by weekday and hour, per order source"""
+        weeks = int(request.query_params.get('weeks', 8))
+        report = SalesHeatmap.heatmap(weeks=weeks)
+        return Response(report)
+    
     @action(detail=False, methods=['get'])
     def inventory_composition(self, request):
         """Get inventory composition by category"""
@@ -291,33 +306,45 @@ def inventory_composition_view(request):
 def sales_trend_view(request):
     """Render sales trend as HTML"""
     days = int(request.GET.get('days', 30))
-    cutoff_date = timezone.now() - timedelta(days=days)
+    # Long ranges are downsampled so the chart stays light on tablets
+    max_points = int(request.GET.get('max_points', 180))
     
-    sales_data = SalesOrder.objects.filter(
-        created_at__gte=cutoff_date
-    ).annotate(
-        date=TruncDate('created_at')
-    ).values('date').annotate(
-        total=Sum('total_amount'),
-        count=Count('id'),
-        avg=Avg('total_amount')
-    ).order_by('date')
-    
-    # Convert data to JSON-serializable format
-    data = []
-    for item in sales_data:
-        data.append({
-            'date': item['date'].isoformat() if item['date'] else None,
-            'total': float(item['total'] or 0),
-            'count': item['count'],
-            'avg': float(item['avg'] or 0)
-        })
+    # Closed days come from their end-of-day close
+    data = [{
+        'date': item['date'].isoformat(),
+        'total': float(item['total']),
+        'count': item['count'],
+        'avg': float(item['avg'])
+    } for item in SalesReports.sales_trend(days=days, max_points=max_points)]
     
     # Serialize as JSON string
     data_json = json.dumps(data, cls=DjangoJSONEncoder)
     return render(request, 'partials/sales_trend_partial.html', {'data': data_json})
 
 
+@login_required
+def sales_heatmap_view(request):
+    """Render sales by weekday and hour as HTML"""
+    weeks = int(request.GET.get('weeks', 8))
+    data = SalesHeatmap.heatmap(weeks=weeks)
+    
+    # Rows of the hours that had sales, for the template
+    for source in data['sources'].values():
+        source['rows'] = [
+            {'weekday': weekday, 'cells': [day[hour] for hour in data['hours']]}
+            for weekday, day in zip(data['weekdays'], source['grid'])
+        ]
+    return render(request, 'partials/sales_heatmap_partial.html', data)
+
+
+@login_required
+def fulfillment_latency_view(request):
+    """Render fulfillment pipeline latency as HTML"""
+    days = int(request.GET.get('days', 30))
+    data = FulfillmentReports.pipeline_latency(days=days)
+    return render(request, 'partials/fulfillment_latency_partial.html', data)
+
+
 @login_required
 def supplier_totals_view(request):
     """Render supplier totals as HTML"""
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from app_delivery.models import Delivery, DeliveryLog
+from app_delivery.models import Delivery, DeliveryLog, DeliveryAlert, Vehicle
 
 
 @admin.register(Delivery)
@@ -7,7 +7,7 @@ class DeliveryAdmin(admin.ModelAdmin):
     list_display = ('delivery_number', 'sales_order', 'status', 'driver_name', 'created_at')
     list_filter = ('status', 'created_at')
     search_fields = ('delivery_number', 'driver_name')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'status_changed_at')
 
 
 @admin.register(DeliveryLog)
@@ -15,3 +15,18 @@ class DeliveryLogAdmin(admin.ModelAdmin):
     list_display = ('delivery', 'status', 'updated_by', 'created_at')
     list_filter = ('status', 'created_at')
     readonly_fields = ('created_at',)
+
+
+@admin.register(Vehicle)
+class VehicleAdmin(admin.ModelAdmin):
+    list_display = ('plate_number', 'name', 'driver_name', 'capacity_board_feet', 'capacity_weight_kg', 'is_active')
+    list_filter = ('is_active',)
+    search_fields = ('plate_number', 'name', 'driver_name')
+    readonly_fields = ('created_at', 'updated_at')
+
+
+@admin.register(DeliveryAlert)
+class DeliveryAlertAdmin(admin.ModelAdmin):
+    list_display = ('delivery', 'status', 'age_hours', 'sla_hours', 'detected_at', 'resolved_at')
+    list_filter = ('status', 'resolved_at')
+    readonly_fields = ('detected_at', 'last_checked_at')
@@ -0,0 +1,119 @@
+"""
+Stuck-delivery detection
+"""
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from app_delivery.models import Delivery, DeliveryAlert
+
+
+class StuckDeliverySweeper:
+    """Record deliveries whose current stage has exceeded its SLA"""
+
+    # Hours a delivery may stay in each status before it is flagged
+    DEFAULT_SLA_HOURS = {
+        'pending': 24,
+        'on_picking': 4,
+        'loaded': 12,
+        'out_for_delivery': 24,
+    }
+
+    @staticmethod
+    @transaction.atomic
+    def sweep(sla_hours=None):
+        """
+        Refresh the open DeliveryAlert rows
+
+        Stuck deliveries are found with one query on (status, status_changed_at).
+        New ones get an alert, existing alerts get their age refreshed, and
+        alerts for deliveries that moved on are resolved.
+
+        Args:
+            sla_hours: Dict of status -> hours overriding DEFAULT_SLA_HOURS
+
+        Returns:
+            Dict with created/updated/resolved counts
+        """
+        sla = dict(StuckDeliverySweeper.DEFAULT_SLA_HOURS, **(sla_hours or {}))
+        now = timezone.now()
+
+        condition = Q()
+        for stage, hours in sla.items():
+            condition |= Q(status=stage, status_changed_at__lte=now - timedelta(hours=hours))
+        stuck = Delivery.objects.filter(condition).order_by().values_list('id', 'status', 'status_changed_at')
+
+        open_alerts = {
+            alert.delivery_id: alert
+            for alert in DeliveryAlert.objects.filter(resolved_at__isnull=True)
+        }
+
+        to_create = []
+        to_update = []
+        still_stuck = set()
+        for delivery_id, stage, changed_at in stuck:
+            age = Decimal(str(round((now - changed_at).total_seconds() / 3600, 2)))
+            alert = open_alerts.get(delivery_id)
+            if alert and alert.status == stage and alert.status_changed_at == changed_at:
+                alert.age_hours = age
+                alert.last_checked_at = now
+                to_update.append(alert)
+                still_stuck.add(delivery_id)
+            else:
+                to_create.append(DeliveryAlert(
+                    delivery_id=delivery_id,
+                    status=stage,
+                    status_changed_at=changed_at,
+                    sla_hours=Decimal(str(sla[stage])),
+                    age_hours=age
+                ))
+
+        # Alerts whose delivery is no longer stuck in the same stage are closed
+        resolved_ids = [alert.id for delivery_id, alert in open_alerts.items() if delivery_id not in still_stuck]
+        resolved = DeliveryAlert.objects.filter(id__in=resolved_ids).update(resolved_at=now)
+        DeliveryAlert.objects.bulk_update(to_update, ['age_hours', 'last_checked_at'])
+        DeliveryAlert.objects.bulk_create(to_create)
+
+        return {
+            'created': len(to_create),
+            'updated': len(to_update),
+            'resolved': resolved,
+            'open': len(to_create) + len(to_update),
+        }
+
+    @staticmethod
+    def open_alerts(min_age_hours=None):
+        """
+        Get open alerts for the warehouse dashboard
+
+        Args:
+            min_age_hours: Only alerts at least this old
+
+        Returns:
+            List of stuck delivery dicts, oldest first
+        """
+        alerts = DeliveryAlert.objects.filter(resolved_at__isnull=True).select_related(
+            'delivery', 'delivery__sales_order', 'delivery__sales_order__customer'
+        )
+        if min_age_hours is not None:
+            alerts = alerts.filter(age_hours__gte=min_age_hours)
+
+        items = []
+        for alert in alerts:
+            so = alert.delivery.sales_order
+            items.append({
+                'delivery_id': alert.delivery_id,
+                'delivery_number': alert.delivery.delivery_number,
+                'so_number': so.so_number,
+                'customer': so.customer.name,
+                'customer_phone': so.customer.phone_number,
+                'status': alert.status,
+                'age_hours': float(alert.age_hours),
+                'sla_hours': float(alert.sla_hours),
+                'status_changed_at': alert.status_changed_at,
+                'detected_at': alert.detected_at,
+                'last_checked_at': alert.last_checked_at,
+                'created_at': alert.delivery.created_at
+            })
+        return items
@@ -0,0 +1,134 @@
+"""
+Delivery stage-duration analytics built from DeliveryLog
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import Lag
+from app_delivery.models import DeliveryLog
+from core import business_dates
+from core.stats import summarize
+
+
+class DeliveryStageAnalytics:
+    """Time spent in each delivery status, from consecutive status logs"""
+
+    STAGES = ['pending', 'on_picking', 'loaded', 'out_for_delivery']
+    PERCENTILES = (50, 90, 99)
+
+    # Closed days never change, so their raw durations are cached for a long time
+    # (v2: days are business dates, not UTC dates)
+    CACHE_KEY = 'delivery_stage_durations_v2_{day}'
+    CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+    @staticmethod
+    def _day_bounds(first_day, last_day):
+        """Aware datetimes covering the business dates [first_day, last_day]"""
+        return business_dates.day_start(first_day), business_dates.day_start(last_day + timedelta(days=1))
+
+    @staticmethod
+    def _query_durations(first_day, last_day):
+        """
+        Stream stage durations for stages that ended between first_day and last_day
+
+        LAG over each delivery's logs pairs every status change with the
+        previous one, so the previous status is the stage that just ended.
+        The window runs over every log of the deliveries touched in the
+        period so stages that started before the period are measured fully.
+
+        Returns:
+            Dict mapping day -> list of (stage, driver, hours)
+        """
+        start, end = DeliveryStageAnalytics._day_bounds(first_day, last_day)
+
+        touched = DeliveryLog.objects.filter(created_at__gte=start, created_at__lt=end).values('delivery_id')
+        partition = {'partition_by': [F('delivery_id')], 'order_by': [F('created_at').asc(), F('id').asc()]}
+        rows = DeliveryLog.objects.filter(delivery_id__in=touched).annotate(
+            previous_status=Window(Lag('status'), **partition),
+            previous_at=Window(Lag('created_at'), **partition),
+        ).values_list('created_at', 'previous_status', 'previous_at', 'delivery__driver_name').order_by()
+
+        durations = defaultdict(list)
+        for created_at, previous_status, previous_at, driver_name in rows.iterator(chunk_size=2000):
+            if previous_status not in DeliveryStageAnalytics.STAGES or previous_at is None:
+                continue
+            if not start <= created_at < end:
+                continue
+            hours = (created_at - previous_at).total_seconds() / 3600
+            durations[business_dates.business_date(created_at)].append((previous_status, driver_name or 'Unassigned', hours))
+        return durations
+
+    @staticmethod
+    def _durations_by_day(first_day, last_day):
+        """Raw durations per day, reading closed days from the cache"""
+        today = business_dates.business_date()
+        days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+
+        cached = cache.get_many([DeliveryStageAnalytics.CACHE_KEY.format(day=day) for day in days if day < today])
+        by_day = {}
+        missing = []
+        for day in days:
+            key = DeliveryStageAnalytics.CACHE_KEY.format(day=day)
+            if key in cached:
+                by_day[day] = cached[key]
+            else:
+                missing.append(day)
+
+        if missing:
+            fresh = DeliveryStageAnalytics._query_durations(missing[0], missing[-1])
+            to_cache = {}
+            for day in missing:
+                by_day[day] = fresh.get(day, [])
+                if day < today:
+                    to_cache[DeliveryStageAnalytics.CACHE_KEY.format(day=day)] = by_day[day]
+            if to_cache:
+                cache.set_many(to_cache, DeliveryStageAnalytics.CACHE_TIMEOUT)
+
+        return by_day
+
+    @staticmethod
+    def stage_durations(days=30):
+        """
+        Get time-in-status distributions per stage, per driver and per day
+
+        Args:
+            days: Period in days (including today)
+
+        Returns:
+            Dict with p50/p90/p99 hours per stage, per driver and per day
+        """
+        last_day = business_dates.business_date()
+        first_day = last_day - timedelta(days=days - 1)
+        by_day = DeliveryStageAnalytics._durations_by_day(first_day, last_day)
+
+        per_stage = defaultdict(list)
+        per_driver = defaultdict(list)
+        daily = []
+        for day in sorted(by_day):
+            day_stages = defaultdict(list)
+            for stage, driver, hours in by_day[day]:
+                per_stage[stage].append(hours)
+                per_driver[(driver, stage)].append(hours)
+                day_stages[stage].append(hours)
+            if day_stages:
+                daily.append({
+                    'date': day,
+                    'stages': {
+                        stage: summarize(day_stages[stage], DeliveryStageAnalytics.PERCENTILES)
+                        for stage in DeliveryStageAnalytics.STAGES if stage in day_stages
+                    }
+                })
+
+        return {
+            'period_days': days,
+            'stages': {
+                stage: summarize(per_stage[stage], DeliveryStageAnalytics.PERCENTILES)
+                for stage in DeliveryStageAnalytics.STAGES
+            },
+            'by_driver': [
+                {'driver_name': driver, 'stage': stage, **summarize(values, DeliveryStageAnalytics.PERCENTILES)}
+                for (driver, stage), values in sorted(per_driver.items())
+            ],
+            'by_day': daily,
+        }
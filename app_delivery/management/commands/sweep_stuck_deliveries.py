@@ -0,0 +1,42 @@
+"""
+Management command to flag deliveries stuck in a stage longer than its SLA
+Usage: python manage.py sweep_stuck_deliveries [--sla STATUS=HOURS ...]
+
+Run it periodically (e.g. every 15 minutes from cron); the warehouse
+dashboard reads the resulting alerts instead of detecting on each request.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from app_delivery.alerts import StuckDeliverySweeper
+
+
+class Command(BaseCommand):
+    help = 'Flag deliveries whose current stage has exceeded its SLA'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sla',
+            action='append',
+            default=[],
+            metavar='STATUS=HOURS',
+            help='Override the SLA for a status, e.g. --sla on_picking=6 (repeatable)'
+        )
+    
+    def handle(self, *args, **options):
+        sla_hours = {}
+        for value in options['sla']:
+            stage, _, hours = value.partition('=')
+            if stage not in StuckDeliverySweeper.DEFAULT_SLA_HOURS:
+                raise CommandError(
+                    f"Unknown status '{stage}'. Valid: {', '.join(StuckDeliverySweeper.DEFAULT_SLA_HOURS)}"
+                )
+            try:
+                sla_hours[stage] = float(hours)
+            except ValueError:
+                raise CommandError(f'Invalid hours for {stage}: {hours}')
+        
+        result = StuckDeliverySweeper.sweep(sla_hours)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['open']} stuck deliveries "
+            f"({result['created']} new, {result['updated']} refreshed, {result['resolved']} resolved)"
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:28
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_delivery", "0004_merge_0002_alter_delivery_sales_order_0003_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Vehicle",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("plate_number", models.CharField(max_length=20, unique=True)),
+                ("name", models.CharField(blank=True, help_text="e.g., 6-Wheeler Truck", max_length=100)),
+                ("driver_name", models.CharField(blank=True, help_text="Default driver for this vehicle", max_length=200)),
+                ("capacity_board_feet", models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ("capacity_weight_kg", models.DecimalField(decimal_places=2, max_digits=10, validators=[django.core.validators.MinValueValidator(0)])),
+                ("is_active", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-capacity_board_feet", "plate_number"],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:33
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_status_changed_at(apps, schema_editor):
+    """Use the latest status log (or creation time) as the last transition"""
+    Delivery = apps.get_model("app_delivery", "Delivery")
+    DeliveryLog = apps.get_model("app_delivery", "DeliveryLog")
+
+    latest_log = DeliveryLog.objects.filter(
+        delivery_id=OuterRef("pk"), status=OuterRef("status")
+    ).order_by("-created_at").values("created_at")[:1]
+    Delivery.objects.update(status_changed_at=Coalesce(Subquery(latest_log), F("created_at")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_delivery", "0005_vehicle"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeliveryAlert",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("status", models.CharField(choices=[("pending", "Pending"), ("on_picking", "On Picking"), ("loaded", "Loaded"), ("out_for_delivery", "Out for Delivery"), ("delivered", "Delivered")], max_length=20)),
+                ("status_changed_at", models.DateTimeField()),
+                ("sla_hours", models.DecimalField(decimal_places=2, max_digits=8)),
+                ("age_hours", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("detected_at", models.DateTimeField(auto_now_add=True)),
+                ("last_checked_at", models.DateTimeField(auto_now=True)),
+                ("resolved_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "ordering": ["-age_hours"],
+            },
+        ),
+        migrations.AddField(
+            model_name="delivery",
+            name="status_changed_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text="When the delivery entered its current status"),
+        ),
+        migrations.RunPython(backfill_status_changed_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="delivery",
+            index=models.Index(fields=["status", "status_changed_at"], name="app_deliver_status_7ce7a8_idx"),
+        ),
+        migrations.AddField(
+            model_name="deliveryalert",
+            name="delivery",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="alerts", to="app_delivery.delivery"),
+        ),
+        migrations.AddIndex(
+            model_name="deliveryalert",
+            index=models.Index(fields=["resolved_at", "-age_hours"], name="app_deliver_resolve_136363_idx"),
+        ),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
+from django.core.validators import MinValueValidator
+from django.utils import timezone
 from app_sales.models import SalesOrder
+from core import business_dates
 
 
 class Delivery(models.Model):
@@ -24,10 +27,17 @@ class Delivery(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
+    status_changed_at = models.DateTimeField(default=timezone.now, help_text='When the delivery entered its current status')
+    # Calendar date at the yard when created (see core.business_dates)
+    business_date = models.DateField(default=business_dates.business_date, editable=False, db_index=True)
     
     class Meta:
         ordering = ['-created_at']
-        indexes = [models.Index(fields=['delivery_number']), models.Index(fields=['status', '-created_at'])]
+        indexes = [
+            models.Index(fields=['delivery_number']),
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['status', 'status_changed_at']),
+        ]
     
     def __str__(self):
         return f"{self.delivery_number} - {self.get_status_display()}"
@@ -49,3 +59,44 @@ class DeliveryLog(models.Model):
     
     def __str__(self):
         return f"{self.delivery.delivery_number} - {self.get_status_display()}"
+
+
+class DeliveryAlert(models.Model):
+    """Delivery that has been in its current status longer than the stage SLA"""
+    delivery = models.ForeignKey(Delivery, on_delete=models.CASCADE, related_name='alerts')
+    
+    status = models.CharField(max_length=20, choices=Delivery.STATUS_CHOICES)
+    status_changed_at = models.DateTimeField()
+    sla_hours = models.DecimalField(max_digits=8, decimal_places=2)
+    age_hours = models.DecimalField(max_digits=10, decimal_places=2)
+    
+    detected_at = models.DateTimeField(auto_now_add=True)
+    last_checked_at = models.DateTimeField(auto_now=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-age_hours']
+        indexes = [models.Index(fields=['resolved_at', '-age_hours'])]
+    
+    def __str__(self):
+        return f"{self.delivery.delivery_number} - {self.get_status_display()} ({self.age_hours}h)"
+
+
+class Vehicle(models.Model):
+    """Delivery vehicle and its load capacity"""
+    plate_number = models.CharField(max_length=20, unique=True)
+    name = models.CharField(max_length=100, blank=True, help_text='e.g., 6-Wheeler Truck')
+    driver_name = models.CharField(max_length=200, blank=True, help_text='Default driver for this vehicle')
+    
+    capacity_board_feet = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+    capacity_weight_kg = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+    
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-capacity_board_feet', 'plate_number']
+    
+    def __str__(self):
+        return f"{self.plate_number} ({self.capacity_board_feet} BF / {self.capacity_weight_kg} kg)"
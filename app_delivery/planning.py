@@ -0,0 +1,257 @@
+"""
+Truck load planning for loaded deliveries
+"""
+from django.db.models import Sum
+from app_delivery.models import Delivery, Vehicle
+from app_delivery.services import DeliveryService
+
+
+class LoadPlanner:
+    """Assign loaded deliveries to vehicle trips"""
+
+    # Average weight of dried sawn lumber, used to turn board feet into load weight
+    KG_PER_BOARD_FOOT = 1.2
+
+    @staticmethod
+    def get_loads(delivery_ids=None):
+        """
+        Get loaded deliveries with their total board feet and weight
+
+        Args:
+            delivery_ids: Limit to these delivery IDs (default: all loaded)
+
+        Returns:
+            List of load dicts, one per delivery
+        """
+        deliveries = Delivery.objects.filter(status='loaded')
+        if delivery_ids:
+            deliveries = deliveries.filter(id__in=delivery_ids)
+
+        rows = deliveries.annotate(
+            total_bf=Sum('sales_order__sales_order_items__board_feet', default=0)
+        ).values(
+            'id', 'delivery_number', 'sales_order__so_number', 'sales_order__customer__name', 'total_bf'
+        ).order_by('created_at')
+
+        return [
+            {
+                'delivery_id': row['id'],
+                'delivery_number': row['delivery_number'],
+                'so_number': row['sales_order__so_number'],
+                'customer_name': row['sales_order__customer__name'],
+                'board_feet': float(row['total_bf']),
+                'weight_kg': float(row['total_bf']) * LoadPlanner.KG_PER_BOARD_FOOT,
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def get_vehicles():
+        """Get active vehicles as plain capacity dicts"""
+        return [
+            {
+                'vehicle_id': vehicle['id'],
+                'plate_number': vehicle['plate_number'],
+                'driver_name': vehicle['driver_name'],
+                'capacity_board_feet': float(vehicle['capacity_board_feet']),
+                'capacity_weight_kg': float(vehicle['capacity_weight_kg']),
+            }
+            for vehicle in Vehicle.objects.filter(is_active=True).values(
+                'id', 'plate_number', 'driver_name', 'capacity_board_feet', 'capacity_weight_kg'
+            )
+        ]
+
+    @staticmethod
+    def _fits(vehicle, board_feet, weight_kg):
+        return board_feet <= vehicle['capacity_board_feet'] and weight_kg <= vehicle['capacity_weight_kg']
+
+    @staticmethod
+    def pack(loads, vehicles):
+        """
+        Pack loads into vehicle trips, minimizing the number of trips
+
+        Loads are placed first-fit-decreasing by their dominant share of the
+        largest vehicle. A local improvement pass then empties the least-filled
+        trips into the others, and finally spreads trips over the fleet using
+        the smallest vehicle that can carry each one.
+
+        Args:
+            loads: Load dicts with board_feet and weight_kg
+            vehicles: Vehicle dicts with capacity_board_feet and capacity_weight_kg
+
+        Returns:
+            Tuple of (trips, unassigned loads)
+        """
+        fits = LoadPlanner._fits
+        if not vehicles:
+            return [], list(loads)
+
+        max_bf = max(v['capacity_board_feet'] for v in vehicles) or 1
+        max_kg = max(v['capacity_weight_kg'] for v in vehicles) or 1
+
+        def size(board_feet, weight_kg):
+            return max(board_feet / max_bf, weight_kg / max_kg)
+
+        trips = []
+        unassigned = []
+
+        # First-fit-decreasing
+        for load in sorted(loads, key=lambda l: size(l['board_feet'], l['weight_kg']), reverse=True):
+            for trip in trips:
+                if fits(trip['vehicle'], trip['board_feet'] + load['board_feet'], trip['weight_kg'] + load['weight_kg']):
+                    trip['loads'].append(load)
+                    trip['board_feet'] += load['board_feet']
+                    trip['weight_kg'] += load['weight_kg']
+                    break
+            else:
+                candidates = [v for v in vehicles if fits(v, load['board_feet'], load['weight_kg'])]
+                if not candidates:
+                    unassigned.append(load)
+                    continue
+                # Open new trips on the largest vehicle; they are right-sized afterwards
+                vehicle = max(candidates, key=lambda v: size(v['capacity_board_feet'], v['capacity_weight_kg']))
+                trips.append({
+                    'vehicle': vehicle,
+                    'loads': [load],
+                    'board_feet': load['board_feet'],
+                    'weight_kg': load['weight_kg'],
+                })
+
+        # Local improvement: try to empty the least-filled trip into the others (best fit)
+        improved = True
+        while improved and len(trips) > 1:
+            improved = False
+            for trip in sorted(trips, key=lambda t: size(t['board_feet'], t['weight_kg'])):
+                others = [t for t in trips if t is not trip]
+                added = {id(t): [0.0, 0.0, []] for t in others}
+                placed = True
+                for load in sorted(trip['loads'], key=lambda l: size(l['board_feet'], l['weight_kg']), reverse=True):
+                    best = None
+                    best_room = None
+                    for other in others:
+                        extra = added[id(other)]
+                        bf = other['board_feet'] + extra[0] + load['board_feet']
+                        kg = other['weight_kg'] + extra[1] + load['weight_kg']
+                        if fits(other['vehicle'], bf, kg):
+                            room = size(other['vehicle']['capacity_board_feet'] - bf,
+                                        other['vehicle']['capacity_weight_kg'] - kg)
+                            if best is None or room < best_room:
+                                best, best_room = other, room
+                    if best is None:
+                        placed = False
+                        break
+                    extra = added[id(best)]
+                    extra[0] += load['board_feet']
+                    extra[1] += load['weight_kg']
+                    extra[2].append(load)
+
+                if placed:
+                    for other in others:
+                        extra = added[id(other)]
+                        other['board_feet'] += extra[0]
+                        other['weight_kg'] += extra[1]
+                        other['loads'].extend(extra[2])
+                    trips.remove(trip)
+                    improved = True
+                    break
+
+        # Spread trips over the fleet, using the smallest vehicle that can carry each one
+        trip_counts = {v['vehicle_id']: 0 for v in vehicles}
+        for trip in sorted(trips, key=lambda t: size(t['board_feet'], t['weight_kg']), reverse=True):
+            candidates = [v for v in vehicles if fits(v, trip['board_feet'], trip['weight_kg'])]
+            vehicle = min(candidates, key=lambda v: (
+                trip_counts[v['vehicle_id']], v['capacity_board_feet'], v['capacity_weight_kg']
+            ))
+            trip_counts[vehicle['vehicle_id']] += 1
+            trip['vehicle'] = vehicle
+            trip['vehicle_trip'] = trip_counts[vehicle['vehicle_id']]
+
+        trips.sort(key=lambda t: (t['vehicle_trip'], -t['vehicle']['capacity_board_feet'], t['vehicle']['plate_number']))
+        return trips, unassigned
+
+    @staticmethod
+    def build_plan(delivery_ids=None):
+        """
+        Build a load plan for loaded deliveries
+
+        Args:
+            delivery_ids: Limit to these delivery IDs (default: all loaded)
+
+        Returns:
+            Dict with trips, utilization and deliveries that fit no vehicle
+        """
+        loads = LoadPlanner.get_loads(delivery_ids)
+        vehicles = LoadPlanner.get_vehicles()
+        trips, unassigned = LoadPlanner.pack(loads, vehicles)
+
+        plan_trips = []
+        for number, trip in enumerate(trips, start=1):
+            vehicle = trip['vehicle']
+            plan_trips.append({
+                'trip_number': number,
+                'vehicle_id': vehicle['vehicle_id'],
+                'plate_number': vehicle['plate_number'],
+                'driver_name': vehicle['driver_name'],
+                'vehicle_trip': trip['vehicle_trip'],
+                'board_feet': round(trip['board_feet'], 2),
+                'weight_kg': round(trip['weight_kg'], 2),
+                'bf_utilization': round(trip['board_feet'] / vehicle['capacity_board_feet'] * 100, 1)
+                    if vehicle['capacity_board_feet'] else 0,
+                'weight_utilization': round(trip['weight_kg'] / vehicle['capacity_weight_kg'] * 100, 1)
+                    if vehicle['capacity_weight_kg'] else 0,
+                'delivery_ids': [load['delivery_id'] for load in trip['loads']],
+                'deliveries': trip['loads'],
+            })
+
+        return {
+            'delivery_count': len(loads),
+            'vehicle_count': len(vehicles),
+            'trip_count': len(plan_trips),
+            'vehicles_used': len({trip['vehicle_id'] for trip in plan_trips}),
+            'total_board_feet': round(sum(load['board_feet'] for load in loads), 2),
+            'total_weight_kg': round(sum(load['weight_kg'] for load in loads), 2),
+            'trips': plan_trips,
+            'unassigned': unassigned,
+        }
+
+    @staticmethod
+    def apply_plan(trips, updated_by=None):
+        """
+        Dispatch deliveries according to a load plan
+
+        Args:
+            trips: List of {"vehicle_id": 1, "delivery_ids": [...], "driver_name": optional}
+            updated_by: User applying the plan
+
+        Returns:
+            Dict with success/failure counts
+        """
+        vehicle_ids = {trip.get('vehicle_id') for trip in trips}
+        vehicles = Vehicle.objects.in_bulk([pk for pk in vehicle_ids if pk is not None])
+
+        result = {'success': 0, 'failed': 0, 'errors': [], 'updated_ids': [], 'failures': []}
+
+        for trip in trips:
+            vehicle = vehicles.get(trip.get('vehicle_id'))
+            delivery_ids = trip.get('delivery_ids', [])
+            if vehicle is None:
+                result['failed'] += len(delivery_ids)
+                result['errors'].append(f"Vehicle {trip.get('vehicle_id')}: not found")
+                result['failures'].extend(
+                    {'delivery_id': delivery_id, 'error': 'Vehicle not found'} for delivery_id in delivery_ids
+                )
+                continue
+
+            # One set-based transition per trip
+            trip_result = DeliveryService.bulk_transition(
+                delivery_ids=delivery_ids,
+                new_status='out_for_delivery',
+                notes=f'Dispatched on {vehicle.plate_number} per load plan',
+                updated_by=updated_by,
+                driver_name=trip.get('driver_name') or vehicle.driver_name,
+                plate_number=vehicle.plate_number
+            )
+            for key in result:
+                result[key] += trip_result[key]
+
+        return result
@@ -6,6 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from app_delivery.reporting import DeliveryReports
+from app_delivery.analytics import DeliveryStageAnalytics
 
 
 class DeliveryReportViewSet(viewsets.ViewSet):
@@ -31,6 +32,14 @@ class DeliveryReportViewSet(viewsets.ViewSet):
         report = DeliveryReports.delivery_turnaround_time(days=days)
         return Response(report)
     
+    @action(detail=False, methods=['get'])
+    def stage_durations(self, request):
+        """Get time spent in each delivery status (p50/p90/p99 hours)"""
+        days = int(request.query_params.get('days', 30))
+        
+        report = DeliveryStageAnalytics.stage_durations(days=days)
+        return Response(report)
+    
     @action(detail=False, methods=['get'])
     def by_driver(self, request):
         """Get delivery statistics by driver"""
@@ -58,8 +67,9 @@ class DeliveryReportViewSet(viewsets.ViewSet):
     def volume_trend(self, request):
         """Get delivery volume trend"""
         days = int(request.query_params.get('days', 30))
+        max_points = int(request.query_params.get('max_points', 0)) or None
         
-        trend = DeliveryReports.delivery_volume_trend(days=days)
+        trend = DeliveryReports.delivery_volume_trend(days=days, max_points=max_points)
         return Response({
             'period_days': days,
             'data': trend
@@ -3,11 +3,13 @@ Delivery reporting and analytics
 """
 from decimal import Decimal
 from django.db.models import Count, Sum, Avg, Q, F
-from django.db.models.functions import TruncDate
 from django.utils import timezone
 from datetime import timedelta, date
 from app_delivery.models import Delivery, DeliveryLog
+from app_delivery.services import delivery_duration, duration_hours
 from app_sales.models import SalesOrder
+from core import business_dates
+from core.stats import downsample
 
 
 class DeliveryReports:
@@ -25,40 +27,38 @@ class DeliveryReports:
             Dict with daily delivery data
         """
         if not summary_date:
-            summary_date = timezone.now().date()
+            summary_date = business_dates.business_date()
         
-        deliveries = Delivery.objects.filter(created_at__date=summary_date)
-        
-        delivered = deliveries.filter(status='delivered', delivered_at__date=summary_date).count()
-        pending = deliveries.filter(status='pending').count()
-        in_progress = deliveries.filter(status__in=['on_picking', 'loaded']).count()
-        in_transit = deliveries.filter(status='out_for_delivery').count()
-        
-        # Calculate metrics
-        delivered_today = Delivery.objects.filter(
+        created_today = Q(business_date=summary_date)
+        delivered_today = Q(
             status='delivered',
-            delivered_at__date=summary_date
+            delivered_at__gte=business_dates.day_start(summary_date),
+            delivered_at__lt=business_dates.day_start(summary_date + timedelta(days=1))
+        )
+        
+        # One pass over deliveries created or completed on the day
+        stats = Delivery.objects.filter(created_today | delivered_today).aggregate(
+            created=Count('id', filter=created_today),
+            delivered=Count('id', filter=created_today & delivered_today),
+            pending=Count('id', filter=created_today & Q(status='pending')),
+            in_progress=Count('id', filter=created_today & Q(status__in=['on_picking', 'loaded'])),
+            in_transit=Count('id', filter=created_today & Q(status='out_for_delivery')),
+            avg_time=Avg(delivery_duration(), filter=delivered_today)
         )
         
-        avg_time = None
-        if delivered_today.exists():
-            times = []
-            for d in delivered_today:
-                if d.delivered_at:
-                    time_taken = (d.delivered_at - d.created_at).total_seconds() / 3600
-                    times.append(time_taken)
-            if times:
-                avg_time = sum(times) / len(times)
+        created = stats['created']
+        delivered = stats['delivered']
+        avg_time = duration_hours(stats['avg_time'])
         
         return {
             'date': summary_date,
-            'deliveries_created': deliveries.count(),
+            'deliveries_created': created,
             'delivered_today': delivered,
-            'pending': pending,
-            'in_progress': in_progress,
-            'in_transit': in_transit,
+            'pending': stats['pending'],
+            'in_progress': stats['in_progress'],
+            'in_transit': stats['in_transit'],
             'avg_delivery_time_hours': round(avg_time, 1) if avg_time else None,
-            'completion_rate': round((delivered / deliveries.count() * 100), 1) if deliveries.count() > 0 else 0
+            'completion_rate': round((delivered / created * 100), 1) if created > 0 else 0
         }
     
     @staticmethod
@@ -168,12 +168,13 @@ class DeliveryReports:
         return issues
     
     @staticmethod
-    def delivery_volume_trend(days=30):
+    def delivery_volume_trend(days=30, max_points=None):
         """
         Get delivery volume trend over time
         
         Args:
             days: Period in days
+            max_points: Downsample to at most this many points (default: one per day)
             
         Returns:
             List of daily volume data
@@ -182,15 +183,13 @@ class DeliveryReports:
         
         volumes = Delivery.objects.filter(
             created_at__gte=cutoff_date
-        ).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
+        ).values(date=F('business_date')).annotate(
             created=Count('id', filter=Q(status__in=['pending', 'on_picking', 'loaded', 'out_for_delivery', 'delivered'])),
             completed=Count('id', filter=Q(status='delivered')),
             in_progress=Count('id', filter=Q(status__in=['on_picking', 'loaded', 'out_for_delivery']))
         ).order_by('date')
         
-        return list(volumes)
+        return downsample(list(volumes), max_points, y='created')
     
     @staticmethod
     def vehicle_utilization(days=30):
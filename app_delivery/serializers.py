@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from app_delivery.models import Delivery, DeliveryLog
+from app_delivery.models import Delivery, DeliveryLog, Vehicle
 from app_sales.serializers import SalesOrderSerializer
 
 
@@ -20,5 +20,13 @@ class DeliverySerializer(serializers.ModelSerializer):
         model = Delivery
         fields = ['id', 'delivery_number', 'sales_order', 'status',
                   'driver_name', 'plate_number', 'customer_signature', 'delivery_logs',
-                  'created_at', 'updated_at', 'delivered_at']
-        read_only_fields = ['id', 'delivery_number', 'created_at', 'updated_at']
+                  'created_at', 'updated_at', 'delivered_at', 'status_changed_at']
+        read_only_fields = ['id', 'delivery_number', 'created_at', 'updated_at', 'status_changed_at']
+
+
+class VehicleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Vehicle
+        fields = ['id', 'plate_number', 'name', 'driver_name', 'capacity_board_feet',
+                  'capacity_weight_kg', 'is_active', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
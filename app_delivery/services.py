@@ -1,13 +1,33 @@
 """
 Delivery management services
 """
+import re
 from decimal import Decimal
 from django.db import transaction, IntegrityError
+from django.db.models import Count, Sum, Avg, Q, F, Prefetch, ExpressionWrapper, DurationField
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from datetime import datetime
+from datetime import datetime, timedelta
 from app_delivery.models import Delivery, DeliveryLog
-from app_sales.models import SalesOrder
+from app_sales.models import SalesOrder, SalesOrderItem
+
+
+def delivery_duration():
+    """Database-side created -> delivered duration expression"""
+    return ExpressionWrapper(F('delivered_at') - F('created_at'), output_field=DurationField())
+
+
+def duration_hours(duration):
+    """Convert an aggregated duration to hours"""
+    return duration.total_seconds() / 3600 if duration is not None else None
+
+
+def _location_sort_key(location):
+    """Natural sort key for yard locations (Stack 2 before Stack 10); blanks sort last"""
+    if not location:
+        return (1, ())
+    parts = re.split(r'(\d+)', location.lower())
+    return (0, tuple((0, int(part), '') if part.isdigit() else (1, 0, part.strip(' ,')) for part in parts if part))
 
 
 class DeliveryService:
@@ -111,6 +131,60 @@ class DeliveryService:
         # If we reach here, retries exhausted
         raise IntegrityError('Could not generate a unique delivery_number after retries')
     
+    @staticmethod
+    @transaction.atomic
+    def create_deliveries_for_orders(sales_orders, created_by=None):
+        """
+        Create pending Deliveries for many SalesOrders at once
+
+        Orders that already have a delivery are skipped. Delivery numbers
+        continue today's sequence and deliveries and their initial logs are
+        inserted with one bulk_create each; if another process takes one of
+        the numbers first, it falls back to create_delivery_for_order.
+
+        Args:
+            sales_orders: SalesOrder instances
+            created_by: User recorded on the initial logs
+
+        Returns:
+            List of created Delivery instances
+        """
+        existing = set(
+            Delivery.objects.filter(sales_order__in=sales_orders).values_list('sales_order_id', flat=True)
+        )
+        orders = [so for so in sales_orders if so.id not in existing]
+        if not orders:
+            return []
+
+        today = datetime.now().strftime('%Y%m%d')
+        start = Delivery.objects.filter(delivery_number__startswith=f'DLV-{today}').count() + 1
+        now = timezone.now()
+
+        try:
+            with transaction.atomic():
+                deliveries = Delivery.objects.bulk_create([
+                    Delivery(
+                        sales_order=so,
+                        status='pending',
+                        delivery_number=f'DLV-{today}-{start + offset:04d}',
+                        status_changed_at=now
+                    )
+                    for offset, so in enumerate(orders)
+                ])
+        except IntegrityError:
+            return [DeliveryService.create_delivery_for_order(so, created_by=created_by) for so in orders]
+
+        DeliveryLog.objects.bulk_create([
+            DeliveryLog(
+                delivery=delivery,
+                status='pending',
+                notes=f'Delivery created for {delivery.sales_order.so_number}',
+                updated_by=created_by
+            )
+            for delivery in deliveries
+        ])
+        return deliveries
+    
     @staticmethod
     @transaction.atomic
     def update_status(delivery_id, new_status, notes='', updated_by=None, driver_name=None, plate_number=None, signature=None):
@@ -158,6 +232,7 @@ class DeliveryService:
                 delivery.customer_signature = signature
         
         delivery.updated_at = timezone.now()
+        delivery.status_changed_at = delivery.updated_at
         delivery.save()
         
         # Create log entry
@@ -187,7 +262,7 @@ class DeliveryService:
         deliveries = Delivery.objects.filter(
             status__in=['pending', 'on_picking']
         ).select_related('sales_order', 'sales_order__customer').prefetch_related(
-            'sales_order__sales_order_items'
+            Prefetch('sales_order__sales_order_items', queryset=SalesOrderItem.objects.select_related('product'))
         ).order_by('created_at')
         
         picking_list = []
@@ -220,6 +295,96 @@ class DeliveryService:
         picking_list.sort(key=lambda x: (-x['priority'], x['created_at']))
         return picking_list
     
+    @staticmethod
+    def get_wave_picking_list(delivery_ids=None):
+        """
+        Get a consolidated pick list for a wave of pending deliveries
+        
+        Items are aggregated by product across all orders in the wave and
+        sorted by yard location so staff pick everything in one walk. Each
+        line carries the per-order breakdown used to split the pick at put-away.
+        
+        Args:
+            delivery_ids: Delivery IDs in the wave (default: all pending)
+            
+        Returns:
+            Dict with wave deliveries, totals and location-sorted pick lines
+        """
+        items = SalesOrderItem.objects.filter(sales_order__delivery__status='pending')
+        if delivery_ids:
+            items = items.filter(sales_order__delivery__id__in=delivery_ids)
+        
+        # One query: items joined to product, yard location, order, customer and delivery
+        items = items.select_related(
+            'product', 'product__inventory', 'sales_order__customer', 'sales_order__delivery'
+        ).order_by('sales_order__delivery__created_at', 'id')
+        
+        deliveries = {}
+        lines = {}
+        for item in items:
+            so = item.sales_order
+            delivery = so.delivery
+            product = item.product
+            
+            if delivery.id not in deliveries:
+                deliveries[delivery.id] = {
+                    'delivery_id': delivery.id,
+                    'delivery_number': delivery.delivery_number,
+                    'so_number': so.so_number,
+                    'customer_name': so.customer.name,
+                    'created_at': delivery.created_at,
+                }
+            
+            line = lines.get(product.id)
+            if line is None:
+                inventory = getattr(product, 'inventory', None)
+                line = lines[product.id] = {
+                    'product_id': product.id,
+                    'product_name': product.name,
+                    'sku': product.sku,
+                    'dimensions': f"{product.thickness}\" x {product.width}\" x {product.length}ft",
+                    'location': inventory.warehouse_location if inventory else '',
+                    'quantity_pieces': 0,
+                    'board_feet': Decimal('0'),
+                    'orders': {},
+                }
+            line['quantity_pieces'] += item.quantity_pieces
+            line['board_feet'] += item.board_feet
+            
+            # Put-away breakdown: how much of this pick goes to each order
+            order = line['orders'].get(delivery.id)
+            if order is None:
+                order = line['orders'][delivery.id] = {
+                    'delivery_id': delivery.id,
+                    'delivery_number': delivery.delivery_number,
+                    'so_number': so.so_number,
+                    'customer_name': so.customer.name,
+                    'quantity_pieces': 0,
+                    'board_feet': Decimal('0'),
+                }
+            order['quantity_pieces'] += item.quantity_pieces
+            order['board_feet'] += item.board_feet
+        
+        pick_lines = sorted(
+            lines.values(),
+            key=lambda line: (_location_sort_key(line['location']), line['sku'])
+        )
+        for line in pick_lines:
+            line['orders'] = [
+                dict(order, board_feet=float(order['board_feet']))
+                for order in line['orders'].values()
+            ]
+            line['board_feet'] = float(line['board_feet'])
+        
+        return {
+            'delivery_count': len(deliveries),
+            'deliveries': list(deliveries.values()),
+            'line_count': len(pick_lines),
+            'total_pieces': sum(line['quantity_pieces'] for line in pick_lines),
+            'total_board_feet': round(sum(line['board_feet'] for line in pick_lines), 2),
+            'lines': pick_lines,
+        }
+    
     @staticmethod
     def get_delivery_queue():
         """
@@ -230,7 +395,10 @@ class DeliveryService:
         """
         deliveries = Delivery.objects.filter(
             status__in=['loaded', 'out_for_delivery']
-        ).select_related('sales_order', 'sales_order__customer').order_by('status', 'created_at')
+        ).select_related('sales_order', 'sales_order__customer').annotate(
+            total_items=Count('sales_order__sales_order_items'),
+            total_bf=Sum('sales_order__sales_order_items__board_feet', default=0)
+        ).order_by('status', 'created_at')
         
         queue = []
         for delivery in deliveries:
@@ -245,8 +413,8 @@ class DeliveryService:
                 'status': delivery.status,
                 'driver_name': delivery.driver_name or 'Not assigned',
                 'plate_number': delivery.plate_number or 'Not assigned',
-                'total_items': so.sales_order_items.count(),
-                'total_bf': float(sum(item.board_feet for item in so.sales_order_items.all())),
+                'total_items': delivery.total_items,
+                'total_bf': float(delivery.total_bf),
                 'created_at': delivery.created_at
             })
         
@@ -260,85 +428,138 @@ class DeliveryService:
         Returns:
             Dict with delivery KPIs
         """
-        from django.db.models import Count, Q, Avg
-        from datetime import timedelta
-        
-        total = Delivery.objects.count()
-        pending = Delivery.objects.filter(status='pending').count()
-        on_picking = Delivery.objects.filter(status='on_picking').count()
-        loaded = Delivery.objects.filter(status='loaded').count()
-        in_transit = Delivery.objects.filter(status='out_for_delivery').count()
-        delivered = Delivery.objects.filter(status='delivered').count()
-        
-        # Calculate average delivery time
-        delivered_with_time = Delivery.objects.filter(
-            status='delivered',
-            delivered_at__isnull=False
-        ).annotate(
-            delivery_time=(
-                Delivery._meta.get_field('delivered_at').get_prep_value
-            )
-        )
-        
-        # Simpler approach: get last 7 days delivered
-        recent_delivered = Delivery.objects.filter(
-            status='delivered',
-            delivered_at__gte=timezone.now() - timedelta(days=7)
+        # Status counts and last-7-days average delivery time in a single query
+        stats = Delivery.objects.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(status='pending')),
+            on_picking=Count('id', filter=Q(status='on_picking')),
+            loaded=Count('id', filter=Q(status='loaded')),
+            in_transit=Count('id', filter=Q(status='out_for_delivery')),
+            delivered=Count('id', filter=Q(status='delivered')),
+            avg_delivery_time=Avg(delivery_duration(), filter=Q(
+                status='delivered',
+                delivered_at__gte=timezone.now() - timedelta(days=7)
+            ))
         )
         
-        avg_time_hours = 0
-        if recent_delivered.exists():
-            total_time = sum((d.delivered_at - d.created_at).total_seconds() 
-                           for d in recent_delivered if d.delivered_at)
-            avg_time_hours = (total_time / len(recent_delivered)) / 3600 if recent_delivered.count() > 0 else 0
+        total = stats['total']
+        delivered = stats['delivered']
+        avg_time_hours = duration_hours(stats['avg_delivery_time']) or 0
         
         return {
             'total_deliveries': total,
-            'pending': pending,
-            'on_picking': on_picking,
-            'loaded': loaded,
-            'in_transit': in_transit,
+            'pending': stats['pending'],
+            'on_picking': stats['on_picking'],
+            'loaded': stats['loaded'],
+            'in_transit': stats['in_transit'],
             'delivered': delivered,
             'avg_delivery_time_hours': round(avg_time_hours, 1),
             'completion_rate': round((delivered / total * 100), 1) if total > 0 else 0
         }
     
     @staticmethod
-    def bulk_update_status(delivery_ids, new_status, notes='', updated_by=None):
+    def bulk_transition(delivery_ids, new_status, notes='', updated_by=None, driver_name=None, plate_number=None, signature=None):
         """
-        Bulk update delivery status
+        Set-based status transition for many deliveries
+        
+        Current statuses are read in one query and validated against
+        VALID_TRANSITIONS. Valid deliveries are moved with one UPDATE per
+        source status and their logs are inserted with a single bulk_create.
         
         Args:
             delivery_ids: List of delivery IDs
             new_status: New status for all
             notes: Status change notes
             updated_by: User updating
+            driver_name: Driver name (for out_for_delivery)
+            plate_number: Vehicle plate (for out_for_delivery)
+            signature: Customer signature (for delivered)
             
         Returns:
-            Dict with success/failure counts
+            Dict with success/failure counts, updated IDs and per-ID failures
         """
-        success_count = 0
-        failed_count = 0
-        errors = []
-        
+        failures = []
+        ids = []
         for delivery_id in delivery_ids:
             try:
-                DeliveryService.update_status(
-                    delivery_id=delivery_id,
-                    new_status=new_status,
-                    notes=notes,
-                    updated_by=updated_by
-                )
-                success_count += 1
-            except ValidationError as e:
-                failed_count += 1
-                errors.append(f"Delivery {delivery_id}: {str(e)}")
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"Delivery {delivery_id}: {str(e)}")
+                ids.append(int(delivery_id))
+            except (TypeError, ValueError):
+                failures.append({'delivery_id': delivery_id, 'error': 'Invalid delivery ID'})
+        ids = list(dict.fromkeys(ids))
+        
+        updated_ids = []
+        with transaction.atomic():
+            current = dict(Delivery.objects.filter(id__in=ids).order_by().values_list('id', 'status'))
+            
+            by_status = {}
+            for delivery_id in ids:
+                current_status = current.get(delivery_id)
+                if current_status is None:
+                    failures.append({'delivery_id': delivery_id, 'error': 'Delivery not found'})
+                    continue
+                valid_next = DeliveryService.VALID_TRANSITIONS.get(current_status, [])
+                if new_status not in valid_next:
+                    failures.append({
+                        'delivery_id': delivery_id,
+                        'error': f"Invalid status transition from {current_status} to {new_status}. "
+                                 f"Valid options: {', '.join(valid_next)}"
+                    })
+                    continue
+                by_status.setdefault(current_status, []).append(delivery_id)
+            
+            now = timezone.now()
+            changes = {'status': new_status, 'updated_at': now, 'status_changed_at': now}
+            if new_status == 'out_for_delivery':
+                if driver_name:
+                    changes['driver_name'] = driver_name
+                if plate_number:
+                    changes['plate_number'] = plate_number
+            if new_status == 'delivered':
+                changes['delivered_at'] = now
+                if signature:
+                    changes['customer_signature'] = signature
+            
+            for current_status, group in by_status.items():
+                # Guard on the source status so a concurrent change is not overwritten
+                updated = Delivery.objects.filter(id__in=group, status=current_status).update(**changes)
+                if updated < len(group):
+                    moved = set(Delivery.objects.filter(id__in=group, status=new_status, updated_at=now).values_list('id', flat=True))
+                    for delivery_id in group:
+                        if delivery_id not in moved:
+                            failures.append({'delivery_id': delivery_id, 'error': 'Delivery status changed concurrently'})
+                    group = [delivery_id for delivery_id in group if delivery_id in moved]
+                updated_ids.extend(group)
+            
+            DeliveryLog.objects.bulk_create([
+                DeliveryLog(delivery_id=delivery_id, status=new_status, notes=notes, updated_by=updated_by)
+                for delivery_id in updated_ids
+            ])
         
         return {
-            'success': success_count,
-            'failed': failed_count,
-            'errors': errors
+            'success': len(updated_ids),
+            'failed': len(failures),
+            'errors': [f"Delivery {failure['delivery_id']}: {failure['error']}" for failure in failures],
+            'updated_ids': updated_ids,
+            'failures': failures
         }
+    
+    @staticmethod
+    def bulk_update_status(delivery_ids, new_status, notes='', updated_by=None):
+        """
+        Bulk update delivery status
+        
+        Args:
+            delivery_ids: List of delivery IDs
+            new_status: New status for all
+            notes: Status change notes
+            updated_by: User updating
+            
+        Returns:
+            Dict with success/failure counts
+        """
+        return DeliveryService.bulk_transition(
+            delivery_ids=delivery_ids,
+            new_status=new_status,
+            notes=notes,
+            updated_by=updated_by
+        )
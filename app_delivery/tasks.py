@@ -0,0 +1,11 @@
+"""
+Background tasks of the delivery app (run by core's run_task_worker)
+"""
+from core.task_queue import task
+
+
+@task(concurrency=1)
+def sweep_stuck_deliveries(sla_hours=None):
+    """Flag deliveries whose current stage has exceeded its SLA"""
+    from app_delivery.alerts import StuckDeliverySweeper
+    return StuckDeliverySweeper.sweep(sla_hours)
@@ -1,3 +1,280 @@
-from django.test import TestCase
+import random
+from decimal import Decimal
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase, SimpleTestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from app_inventory.models import LumberCategory, LumberProduct, Inventory
+from app_sales.models import Customer, SalesOrder, SalesOrderItem
+from app_delivery.models import Delivery, DeliveryAlert, DeliveryLog, Vehicle
+from app_delivery.services import DeliveryService
+from app_delivery.planning import LoadPlanner
+from app_delivery.reporting import DeliveryReports
+from app_delivery.analytics import DeliveryStageAnalytics
+from app_delivery.alerts import StuckDeliverySweeper
+from core import business_dates
 
-# Create your tests here.
+User = get_user_model()
+
+
+class DeliveryTestMixin:
+    """Shared fixtures for delivery tests"""
+
+    def make_product(self, sku, location=''):
+        product = LumberProduct.objects.create(
+            name=f"Lumber {sku}",
+            category=self.category,
+            thickness=2,
+            width=4,
+            length=10,
+            price_per_board_foot=Decimal('10.00'),
+            sku=sku,
+        )
+        Inventory.objects.create(product=product, quantity_pieces=500, total_board_feet=3000,
+                                 warehouse_location=location)
+        return product
+
+    def make_delivery(self, number, lines, status='pending'):
+        so = SalesOrder.objects.create(
+            customer=self.customer, so_number=f"SO-{number}", payment_type='cash', created_by=self.user
+        )
+        for product, pieces in lines:
+            bf = product.calculate_board_feet(pieces)
+            SalesOrderItem.objects.create(
+                sales_order=so, product=product, quantity_pieces=pieces,
+                board_feet=bf, unit_price=Decimal('10.00'), subtotal=bf * 10
+            )
+        return Delivery.objects.create(sales_order=so, delivery_number=f"DLV-{number}", status=status)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="warehouse", password="testpass123")
+        self.category = LumberCategory.objects.create(name="Softwood")
+        self.customer = Customer.objects.create(name="Test Customer", phone_number="09171234567")
+
+
+class WavePickingListTestCase(DeliveryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.stack10 = self.make_product("P-10", "Yard A, Stack 10")
+        self.stack2 = self.make_product("P-2", "Yard A, Stack 2")
+        self.unplaced = self.make_product("P-X")
+        self.first = self.make_delivery("001", [(self.stack10, 5), (self.stack2, 3)])
+        self.second = self.make_delivery("002", [(self.stack10, 7), (self.unplaced, 1)])
+        self.make_delivery("003", [(self.stack2, 9)], status='loaded')
+
+    def test_aggregates_by_product_in_location_order(self):
+        with self.assertNumQueries(1):
+            wave = DeliveryService.get_wave_picking_list()
+
+        self.assertEqual(wave['delivery_count'], 2)
+        self.assertEqual([line['sku'] for line in wave['lines']], ["P-2", "P-10", "P-X"])
+
+        stack10 = wave['lines'][1]
+        self.assertEqual(stack10['quantity_pieces'], 12)
+        self.assertEqual(
+            [(order['delivery_id'], order['quantity_pieces']) for order in stack10['orders']],
+            [(self.first.id, 5), (self.second.id, 7)]
+        )
+        self.assertEqual(wave['total_pieces'], 16)
+
+    def test_limits_wave_to_requested_deliveries(self):
+        wave = DeliveryService.get_wave_picking_list(delivery_ids=[self.second.id])
+
+        self.assertEqual(wave['delivery_count'], 1)
+        self.assertEqual([line['sku'] for line in wave['lines']], ["P-10", "P-X"])
+
+
+class BulkTransitionTestCase(DeliveryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        product = self.make_product("P-1")
+        self.pending = [self.make_delivery(f"10{i}", [(product, 1)]) for i in range(5)]
+        self.picking = self.make_delivery("200", [(product, 1)], status='on_picking')
+        self.delivered = self.make_delivery("300", [(product, 1)], status='delivered')
+
+    def test_transitions_valid_ids_and_reports_failures(self):
+        ids = [d.id for d in self.pending] + [self.picking.id, self.delivered.id, 999999]
+
+        # savepoint, status read, one UPDATE per source status (2), bulk log insert, release
+        with self.assertNumQueries(6):
+            result = DeliveryService.bulk_transition(ids, 'delivered', notes='Bulk', updated_by=self.user)
+
+        self.assertEqual(result['success'], 6)
+        self.assertEqual(
+            sorted(failure['delivery_id'] for failure in result['failures']), [self.delivered.id, 999999]
+        )
+        self.assertEqual(Delivery.objects.filter(status='delivered', delivered_at__isnull=False).count(), 6)
+        self.assertEqual(DeliveryLog.objects.filter(status='delivered', notes='Bulk').count(), 6)
+
+    def test_rejects_invalid_transition(self):
+        result = DeliveryService.bulk_transition([self.pending[0].id], 'loaded')
+
+        self.assertEqual(result['success'], 0)
+        self.assertEqual(result['failed'], 1)
+        self.assertIn('Invalid status transition from pending to loaded', result['errors'][0])
+
+
+class DeliveryMetricsTestCase(DeliveryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        product = self.make_product("P-1")
+        self.make_delivery("001", [(product, 3), (product, 2)], status='loaded')
+        self.make_delivery("002", [(product, 1)])
+        done = self.make_delivery("003", [(product, 1)], status='delivered')
+        # Both on today's date whatever the time of day the tests run
+        morning = business_dates.day_start(business_dates.business_date()) + timedelta(hours=6)
+        Delivery.objects.filter(id=done.id).update(
+            created_at=morning, delivered_at=morning + timedelta(hours=6)
+        )
+
+    def test_metrics_in_one_query(self):
+        with self.assertNumQueries(1):
+            metrics = DeliveryService.get_delivery_metrics()
+
+        self.assertEqual((metrics['total_deliveries'], metrics['pending'], metrics['loaded']), (3, 1, 1))
+        self.assertEqual(metrics['avg_delivery_time_hours'], 6.0)
+
+    def test_queue_annotates_items_and_board_feet(self):
+        with self.assertNumQueries(1):
+            queue = DeliveryService.get_delivery_queue()
+
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue[0]['total_items'], 2)
+        self.assertAlmostEqual(queue[0]['total_bf'], 33.33, places=2)
+
+    def test_daily_summary(self):
+        with self.assertNumQueries(1):
+            summary = DeliveryReports.daily_delivery_summary()
+
+        self.assertEqual(summary['deliveries_created'], 3)
+        self.assertEqual(summary['delivered_today'], 1)
+        self.assertEqual(summary['avg_delivery_time_hours'], 6.0)
+
+
+class StageDurationTestCase(DeliveryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        product = self.make_product("P-1")
+        start = timezone.now() - timedelta(hours=10)
+        for number, picking_hours in (("001", 1), ("002", 3)):
+            delivery = self.make_delivery(number, [(product, 1)], status='loaded')
+            delivery.driver_name = "Juan"
+            delivery.save()
+            for status, offset in (('pending', 0), ('on_picking', 2), ('loaded', 2 + picking_hours)):
+                log = DeliveryLog.objects.create(delivery=delivery, status=status)
+                DeliveryLog.objects.filter(id=log.id).update(created_at=start + timedelta(hours=offset))
+
+    def test_stage_percentiles(self):
+        report = DeliveryStageAnalytics.stage_durations(days=7)
+
+        self.assertEqual(report['stages']['pending']['count'], 2)
+        self.assertEqual(report['stages']['pending']['p50'], 2.0)
+        self.assertEqual(report['stages']['on_picking']['p50'], 2.0)
+        self.assertEqual(report['stages']['on_picking']['p90'], 2.8)
+        self.assertEqual(report['stages']['loaded']['count'], 0)
+        self.assertEqual({row['driver_name'] for row in report['by_driver']}, {"Juan"})
+
+    def test_days_are_business_dates(self):
+        from datetime import date
+        from unittest import mock
+
+        # Just after the yard's midnight, while UTC is still on the previous day
+        day = date(2025, 3, 10)
+        midnight = business_dates.day_start(day)
+        delivery = self.make_delivery("003", [(self.make_product("P-3"), 1)], status='on_picking')
+        for status, created_at in (('pending', midnight - timedelta(hours=1)), ('on_picking', midnight + timedelta(minutes=30))):
+            log = DeliveryLog.objects.create(delivery=delivery, status=status)
+            DeliveryLog.objects.filter(id=log.id).update(created_at=created_at)
+
+        with mock.patch('django.utils.timezone.now', return_value=midnight + timedelta(hours=1)):
+            report = DeliveryStageAnalytics.stage_durations(days=2)
+
+        self.assertEqual([row['date'] for row in report['by_day']], [day])
+        self.assertEqual(report['by_day'][0]['stages']['pending']['p50'], 1.5)
+
+
+class StuckDeliverySweeperTestCase(DeliveryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        product = self.make_product("P-1")
+        self.picking = self.make_delivery("001", [(product, 1)], status='on_picking')
+        self.fresh = self.make_delivery("002", [(product, 1)], status='on_picking')
+        Delivery.objects.filter(id=self.picking.id).update(status_changed_at=timezone.now() - timedelta(hours=5))
+
+    def test_sweep_creates_refreshes_and_resolves_alerts(self):
+        self.assertEqual(StuckDeliverySweeper.sweep()['created'], 1)
+        self.assertEqual(StuckDeliverySweeper.sweep(), {'created': 0, 'updated': 1, 'resolved': 0, 'open': 1})
+        self.assertEqual([item['delivery_id'] for item in StuckDeliverySweeper.open_alerts()], [self.picking.id])
+
+        DeliveryService.update_status(self.picking.id, 'loaded')
+        self.assertEqual(StuckDeliverySweeper.sweep()['resolved'], 1)
+        self.assertFalse(DeliveryAlert.objects.filter(resolved_at__isnull=True).exists())
+
+    def test_sla_override(self):
+        result = StuckDeliverySweeper.sweep({'on_picking': 6})
+
+        self.assertEqual(result['open'], 0)
+
+    def test_endpoint_rejects_bad_hours(self):
+        self.client.force_login(self.user)
+        StuckDeliverySweeper.sweep()
+
+        response = self.client.get('/api/warehouse/stuck_deliveries/', {'hours': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/warehouse/stuck_deliveries/', {'hours': '4'})
+        self.assertEqual(response.json()['stuck_count'], 1)
+
+
+class LoadPlannerTestCase(DeliveryTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.product = self.make_product("P-1")  # 6.67 BF per piece
+        self.truck = Vehicle.objects.create(plate_number="TRK-1", driver_name="Juan",
+                                            capacity_board_feet=1000, capacity_weight_kg=5000)
+        self.big = self.make_delivery("001", [(self.product, 90)], status='loaded')    # 600 BF
+        self.medium = self.make_delivery("002", [(self.product, 60)], status='loaded')  # 400 BF
+        self.small = self.make_delivery("003", [(self.product, 45)], status='loaded')   # 300 BF
+        self.make_delivery("004", [(self.product, 10)])
+
+    def test_plan_minimizes_trips(self):
+        plan = LoadPlanner.build_plan()
+
+        self.assertEqual(plan['delivery_count'], 3)
+        self.assertEqual(plan['trip_count'], 2)
+        self.assertEqual(sorted(plan['trips'][0]['delivery_ids'] + plan['trips'][1]['delivery_ids']),
+                         sorted([self.big.id, self.medium.id, self.small.id]))
+        self.assertEqual(plan['unassigned'], [])
+
+    def test_apply_plan_dispatches_deliveries(self):
+        result = LoadPlanner.apply_plan([{'vehicle_id': self.truck.id, 'delivery_ids': [self.big.id, self.small.id]}])
+
+        self.assertEqual(result['success'], 2)
+        self.big.refresh_from_db()
+        self.assertEqual(self.big.status, 'out_for_delivery')
+        self.assertEqual((self.big.driver_name, self.big.plate_number), ("Juan", "TRK-1"))
+
+
+class LoadPlannerPackTestCase(SimpleTestCase):
+    def test_packs_hundreds_of_loads_within_bounds(self):
+        rng = random.Random(7)
+        loads = []
+        for i in range(500):
+            bf = rng.uniform(20, 900)
+            loads.append({'delivery_id': i, 'board_feet': bf, 'weight_kg': bf * LoadPlanner.KG_PER_BOARD_FOOT})
+        vehicles = [
+            {'vehicle_id': 1, 'plate_number': 'A', 'driver_name': '', 'capacity_board_feet': 2000.0, 'capacity_weight_kg': 3000.0},
+            {'vehicle_id': 2, 'plate_number': 'B', 'driver_name': '', 'capacity_board_feet': 1000.0, 'capacity_weight_kg': 1500.0},
+        ]
+
+        trips, unassigned = LoadPlanner.pack(loads, vehicles)
+
+        self.assertEqual(unassigned, [])
+        self.assertEqual(sum(len(trip['loads']) for trip in trips), 500)
+        for trip in trips:
+            self.assertLessEqual(trip['board_feet'], trip['vehicle']['capacity_board_feet'])
+            self.assertLessEqual(trip['weight_kg'], trip['vehicle']['capacity_weight_kg'])
+        # Never worse than a trip per 2000 BF of total volume, rounded up, plus FFD slack
+        lower_bound = sum(load['board_feet'] for load in loads) / 2000
+        self.assertLess(len(trips), lower_bound * 1.3 + 1)
@@ -5,9 +5,12 @@ from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from datetime import datetime
-from app_delivery.models import Delivery, DeliveryLog
-from app_delivery.serializers import DeliverySerializer, DeliveryLogSerializer
+from app_delivery.models import Delivery, DeliveryLog, Vehicle
+from app_delivery.serializers import DeliverySerializer, DeliveryLogSerializer, VehicleSerializer
 from app_delivery.services import DeliveryService
+from app_sales.models import SalesOrderItem
+from core.data_exports import DataExports
+from core.report_engine import Column
 
 
 class DeliveryViewSet(viewsets.ModelViewSet):
@@ -146,7 +149,7 @@ class DeliveryViewSet(viewsets.ModelViewSet):
             return Response({'error': 'delivery_ids and status are required'}, 
                            status=status.HTTP_400_BAD_REQUEST)
         
-        result = DeliveryService.bulk_update_status(
+        result = DeliveryService.bulk_transition(
             delivery_ids=delivery_ids,
             new_status=new_status,
             notes=notes,
@@ -154,3 +157,46 @@ class DeliveryViewSet(viewsets.ModelViewSet):
         )
         
         return Response(result)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream deliveries as CSV or NDJSON
+        
+        Query params: output (csv/ndjson), date_from, date_to, customer,
+        product (deliveries of orders containing the product), status
+        """
+        params = request.query_params
+        try:
+            output = DataExports.output(params)
+            deliveries = Delivery.objects.order_by('id')
+            deliveries = DataExports.filter_dates(deliveries, params)
+            deliveries = DataExports.filter_ids(deliveries, params, {'customer': 'sales_order__customer_id'})
+            if params.get('product'):
+                deliveries = deliveries.filter(sales_order_id__in=SalesOrderItem.objects.filter(
+                    product_id=DataExports.parse_id(params['product'], 'product')
+                ).values('sales_order_id'))
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get('status'):
+            deliveries = deliveries.filter(status=params['status'])
+        
+        columns = [
+            Column('Delivery Number', 'delivery_number'),
+            Column('Created', 'created_at', fmt='datetime'),
+            Column('Status', 'status'),
+            Column('SO Number', 'sales_order__so_number', key='so_number'),
+            Column('Customer ID', 'sales_order__customer_id', fmt='int', key='customer_id'),
+            Column('Customer', 'sales_order__customer__name', key='customer'),
+            Column('Driver', 'driver_name'),
+            Column('Plate Number', 'plate_number'),
+            Column('Delivered', 'delivered_at', fmt='datetime'),
+        ]
+        return DataExports.response(deliveries, columns, output, 'deliveries')
+
+
+class VehicleViewSet(viewsets.ModelViewSet):
+    """API endpoint for the delivery vehicle registry"""
+    queryset = Vehicle.objects.all()
+    serializer_class = VehicleSerializer
+    permission_classes = [IsAuthenticated]
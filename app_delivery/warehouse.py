@@ -5,8 +5,17 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from app_delivery.models import Delivery
+from app_delivery.models import DeliveryAlert
 from app_delivery.services import DeliveryService
+from app_delivery.planning import LoadPlanner
+from app_delivery.alerts import StuckDeliverySweeper
+
+
+def _parse_id_list(value):
+    """Parse a comma-separated id list from a query param (raises ValueError)"""
+    if not value:
+        return None
+    return [int(pk) for pk in value.split(',') if pk.strip()] or None
 
 
 class WarehouseViewSet(viewsets.ViewSet):
@@ -19,9 +28,11 @@ class WarehouseViewSet(viewsets.ViewSet):
         picking_list = DeliveryService.get_picking_list()
         dispatch_queue = DeliveryService.get_delivery_queue()
         metrics = DeliveryService.get_delivery_metrics()
+        stuck_count = DeliveryAlert.objects.filter(resolved_at__isnull=True).count()
         
         return Response({
             'metrics': metrics,
+            'stuck_count': stuck_count,
             'picking_list': {
                 'count': len(picking_list),
                 'items': picking_list[:10]  # Show top 10
@@ -47,6 +58,23 @@ class WarehouseViewSet(viewsets.ViewSet):
             'items': picking_list
         })
     
+    @action(detail=False, methods=['get'])
+    def wave_picking_list(self, request):
+        """
+        Get a consolidated pick list for a wave of pending deliveries
+        
+        Query params:
+            delivery_ids: Comma-separated delivery IDs (default: all pending)
+        """
+        try:
+            delivery_ids = _parse_id_list(request.query_params.get('delivery_ids'))
+        except ValueError:
+            return Response({'error': 'delivery_ids must be a comma-separated list of integers'},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        wave = DeliveryService.get_wave_picking_list(delivery_ids=delivery_ids)
+        return Response(wave)
+    
     @action(detail=False, methods=['post'])
     def start_picking(self, request):
         """
@@ -168,6 +196,43 @@ class WarehouseViewSet(viewsets.ViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['get'])
+    def load_plan(self, request):
+        """
+        Plan vehicle trips for loaded deliveries
+        
+        Query params:
+            delivery_ids: Comma-separated delivery IDs (default: all loaded)
+        """
+        try:
+            delivery_ids = _parse_id_list(request.query_params.get('delivery_ids'))
+        except ValueError:
+            return Response({'error': 'delivery_ids must be a comma-separated list of integers'},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        plan = LoadPlanner.build_plan(delivery_ids=delivery_ids)
+        return Response(plan)
+    
+    @action(detail=False, methods=['post'])
+    def apply_load_plan(self, request):
+        """
+        Dispatch deliveries according to a (reviewed) load plan
+        
+        Expected payload:
+        {
+            "trips": [
+                {"vehicle_id": 1, "delivery_ids": [1, 2, 3], "driver_name": "John Doe"}
+            ]
+        }
+        """
+        trips = request.data.get('trips', [])
+        
+        if not trips:
+            return Response({'error': 'trips is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = LoadPlanner.apply_plan(trips, updated_by=request.user)
+        return Response(result)
+    
     @action(detail=False, methods=['post'])
     def bulk_status_change(self, request):
         """
@@ -187,7 +252,7 @@ class WarehouseViewSet(viewsets.ViewSet):
                 'error': 'delivery_ids and status are required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        result = DeliveryService.bulk_update_status(
+        result = DeliveryService.bulk_transition(
             delivery_ids=delivery_ids,
             new_status=new_status,
             notes=f'Bulk updated by {request.user.get_full_name() or request.user.username}',
@@ -198,36 +263,28 @@ class WarehouseViewSet(viewsets.ViewSet):
     
     @action(detail=False, methods=['get'])
     def stuck_deliveries(self, request):
-        """Get deliveries stuck in process for too long"""
-        from datetime import timedelta
-        from django.utils import timezone
-        
-        hours = int(request.query_params.get('hours', 24))
-        cutoff_time = timezone.now() - timedelta(hours=hours)
-        
-        stuck = Delivery.objects.filter(
-            status__in=['pending', 'on_picking', 'loaded', 'out_for_delivery'],
-            created_at__lte=cutoff_time
-        ).select_related('sales_order', 'sales_order__customer').order_by('created_at')
-        
-        items = []
-        for delivery in stuck:
-            age_hours = (timezone.now() - delivery.created_at).total_seconds() / 3600
-            so = delivery.sales_order
-            
-            items.append({
-                'delivery_id': delivery.id,
-                'delivery_number': delivery.delivery_number,
-                'so_number': so.so_number,
-                'customer': so.customer.name,
-                'customer_phone': so.customer.phone_number,
-                'status': delivery.status,
-                'age_hours': round(age_hours, 1),
-                'created_at': delivery.created_at
-            })
+        """
+        Get deliveries stuck in their current stage past its SLA
+        
+        Reads the alerts maintained by the sweep_stuck_deliveries command.
+        
+        Query params:
+            hours: Only deliveries stuck at least this many hours
+        """
+        hours = request.query_params.get('hours')
+        try:
+            hours = float(hours) if hours else None
+            if hours is not None and not 0 <= hours < float('inf'):
+                raise ValueError
+        except ValueError:
+            return Response({'error': 'hours must be a non-negative number'},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        items = StuckDeliverySweeper.open_alerts(min_age_hours=hours)
         
         return Response({
             'threshold_hours': hours,
+            'sla_hours': StuckDeliverySweeper.DEFAULT_SLA_HOURS,
             'stuck_count': len(items),
             'deliveries': items
         })
@@ -16,7 +16,8 @@ class LumberProductAdmin(admin.ModelAdmin):
 
 @admin.register(Inventory)
 class InventoryAdmin(admin.ModelAdmin):
-    list_display = ('product', 'quantity_pieces', 'total_board_feet', 'last_updated')
+    list_display = ('product', 'quantity_pieces', 'total_board_feet', 'warehouse_location', 'last_updated')
+    search_fields = ('product__name', 'product__sku', 'warehouse_location')
     readonly_fields = ('last_updated',)
 
 
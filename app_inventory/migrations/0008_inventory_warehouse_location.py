@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_inventory", "0007_alter_lumberproduct_category"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inventory",
+            name="warehouse_location",
+            field=models.CharField(blank=True, help_text="e.g., Yard A, Section B, Stack 3", max_length=200),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator
 from decimal import Decimal
+from core import business_dates
 
 
 class LumberCategory(models.Model):
@@ -79,6 +80,9 @@ class Inventory(models.Model):
     quantity_pieces = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     total_board_feet = models.DecimalField(max_digits=12, decimal_places=2, default=0, validators=[MinValueValidator(0)])
     
+    # Yard location used to order warehouse pick walks
+    warehouse_location = models.CharField(max_length=200, blank=True, help_text='e.g., Yard A, Section B, Stack 3')
+    
     last_updated = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -107,6 +111,8 @@ class StockTransaction(models.Model):
     
     created_by = models.ForeignKey('core.CustomUser', on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Calendar date at the yard when created (see core.business_dates)
+    business_date = models.DateField(default=business_dates.business_date, editable=False, db_index=True)
     
     class Meta:
         ordering = ['-created_at']
@@ -7,6 +7,8 @@ from django.utils import timezone
 from datetime import timedelta
 from app_inventory.models import Inventory, StockTransaction, InventorySnapshot, LumberProduct
 from app_sales.models import SalesOrder, SalesOrderItem
+from core import business_dates
+from core.stats import downsample
 
 
 class InventoryReports:
@@ -126,6 +128,33 @@ class InventoryReports:
             'data': list(products)
         }
     
+    @staticmethod
+    def stock_level_history(days=90, product_id=None, max_points=None):
+        """
+        Get stock levels over time from the daily inventory snapshots
+        
+        Args:
+            days: Period in days
+            product_id: Only this product (default: all products)
+            max_points: Downsample to at most this many points (default: one per day);
+                each bucket keeps its lowest and highest level
+            
+        Returns:
+            List of daily stock levels
+        """
+        snapshots = InventorySnapshot.objects.filter(
+            snapshot_date__gte=business_dates.business_date() - timedelta(days=days)
+        )
+        if product_id:
+            snapshots = snapshots.filter(product_id=product_id)
+        
+        levels = snapshots.values(date=F('snapshot_date')).annotate(
+            quantity_pieces=Sum('quantity_pieces'),
+            board_feet=Sum('total_board_feet')
+        ).order_by('date')
+        
+        return downsample(list(levels), max_points, y='board_feet', method='minmax')
+    
     @staticmethod
     def stock_value_report():
         """
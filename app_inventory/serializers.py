@@ -130,7 +130,7 @@ class InventorySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Inventory
-        fields = ['id', 'product', 'product_id', 'quantity_pieces', 'total_board_feet', 'last_updated']
+        fields = ['id', 'product', 'product_id', 'quantity_pieces', 'total_board_feet', 'warehouse_location', 'last_updated']
 
 
 class StockTransactionSerializer(serializers.ModelSerializer):
@@ -12,6 +12,7 @@ from django.utils.decorators import method_decorator
 from django.core.cache import cache
 from datetime import timedelta
 from django.db import transaction as db_transaction
+from django.core.exceptions import ValidationError
 from app_inventory.models import LumberCategory, LumberProduct, Inventory, StockTransaction
 from app_inventory.serializers import (
     LumberCategorySerializer, LumberProductSerializer, 
@@ -19,6 +20,8 @@ from app_inventory.serializers import (
 )
 from app_inventory.services import InventoryService
 from app_inventory.reporting import InventoryReports
+from core.data_exports import DataExports
+from core.report_engine import Column
 
 
 class ProductPagination(PageNumberPagination):
@@ -505,6 +508,39 @@ class StockTransactionViewSet(viewsets.ModelViewSet):
         transactions = StockTransaction.objects.filter(transaction_type=tx_type)
         serializer = self.get_serializer(transactions, many=True)
         return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream the stock ledger as CSV or NDJSON
+        
+        Query params: output (csv/ndjson), date_from, date_to, product, type
+        """
+        params = request.query_params
+        try:
+            output = DataExports.output(params)
+            transactions = StockTransaction.objects.order_by('id')
+            transactions = DataExports.filter_dates(transactions, params)
+            transactions = DataExports.filter_ids(transactions, params, {'product': 'product_id'})
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get('type'):
+            transactions = transactions.filter(transaction_type=params['type'])
+        
+        columns = [
+            Column('ID', 'id', fmt='int'),
+            Column('Date', 'created_at', fmt='datetime'),
+            Column('Product ID', 'product_id', fmt='int'),
+            Column('Product', 'product__name', key='product'),
+            Column('Type', 'transaction_type'),
+            Column('Pieces', 'quantity_pieces', fmt='int'),
+            Column('Board Feet', 'board_feet', fmt='number'),
+            Column('Cost per Unit', 'cost_per_unit', fmt='money'),
+            Column('Reference ID', 'reference_id'),
+            Column('Reason', 'reason'),
+            Column('Created By', 'created_by__username', key='created_by'),
+        ]
+        return DataExports.response(transactions, columns, output, 'stock_ledger')
 
 
 class AdjustmentViewSet(viewsets.ViewSet):
@@ -604,6 +640,20 @@ class InventoryReportViewSet(viewsets.ViewSet):
         report = InventoryReports.inventory_turnover(days=days)
         return Response(report)
     
+    @action(detail=False, methods=['get'])
+    def stock_history(self, request):
+        """Get daily stock levels (?days=&product=&max_points=)"""
+        days = int(request.query_params.get('days', 90))
+        max_points = int(request.query_params.get('max_points', 0)) or None
+        
+        history = InventoryReports.stock_level_history(
+            days=days, product_id=request.query_params.get('product'), max_points=max_points
+        )
+        return Response({
+            'period_days': days,
+            'data': history
+        })
+    
     @action(detail=False, methods=['get'])
     def stock_value(self, request):
         """Get total stock value by category"""
@@ -1,6 +1,11 @@
 from django.contrib import admin
-from app_sales.models import Customer, SalesOrder, SalesOrderItem, Receipt, ShoppingCart, CartItem
-from app_sales.notification_models import OrderNotification, OrderConfirmation
+from app_sales.models import (
+    Customer, SalesOrder, SalesOrderItem, Receipt, ShoppingCart, CartItem, DailySalesClose, DailySalesCloseLine,
+    CashierShift
+)
+from app_sales.notification_models import (
+    OrderNotification, OrderConfirmation, PickupSlot, OrderNotificationArchive, OutboundMessage
+)
 
 
 @admin.register(Customer)
@@ -114,10 +119,11 @@ class OrderConfirmationAdmin(admin.ModelAdmin):
     def mark_ready_for_pickup(self, request, queryset):
         """Admin action to mark orders as ready for pickup"""
         from app_sales.services import OrderConfirmationService
-        count = 0
-        for confirmation in queryset.filter(status__in=['created', 'confirmed']):
-            confirmation.mark_ready_for_pickup()
-            count += 1
+        result = OrderConfirmationService.bulk_mark_ready(
+            queryset.filter(status__in=['created', 'confirmed']).values_list('sales_order_id', flat=True),
+            updated_by=request.user
+        )
+        count = result['success']
         self.message_user(request, f"{count} order(s) marked as ready for pickup. Customer(s) have been notified.")
     mark_ready_for_pickup.short_description = "Mark selected orders as ready for pickup and notify customers"
     
@@ -134,10 +140,10 @@ class OrderConfirmationAdmin(admin.ModelAdmin):
     def mark_picked_up(self, request, queryset):
         """Admin action to mark orders as picked up"""
         from app_sales.services import OrderConfirmationService
-        count = 0
-        for confirmation in queryset.filter(status='ready_for_pickup'):
-            confirmation.mark_picked_up()
-            count += 1
+        result = OrderConfirmationService.bulk_mark_picked_up(
+            queryset.filter(status='ready_for_pickup').values_list('sales_order_id', flat=True)
+        )
+        count = result['success']
         self.message_user(request, f"{count} order(s) marked as picked up.")
     mark_picked_up.short_description = "Mark selected orders as picked up by customer"
     
@@ -173,3 +179,78 @@ class OrderNotificationAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('sales_order', 'customer')
+
+
+@admin.register(PickupSlot)
+class PickupSlotAdmin(admin.ModelAdmin):
+    list_display = ('date', 'order_count', 'board_feet', 'order_capacity', 'board_feet_capacity', 'updated_at')
+    list_editable = ('order_capacity', 'board_feet_capacity')
+    date_hierarchy = 'date'
+    # Load counters are maintained by the scheduler; only capacity overrides are edited here
+    readonly_fields = ('order_count', 'board_feet', 'updated_at')
+
+
+@admin.register(OrderNotificationArchive)
+class OrderNotificationArchiveAdmin(admin.ModelAdmin):
+    list_display = ('original_id', 'customer', 'notification_type', 'title', 'created_at', 'archived_at')
+    list_filter = ('notification_type', 'created_at')
+    search_fields = ('customer__name', 'title')
+    list_select_related = ('customer',)
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'channel', 'recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'channel')
+    search_fields = ('recipient', 'subject', 'customer__name')
+    readonly_fields = ('created_at', 'sent_at', 'claimed_at', 'last_error')
+    list_select_related = ('customer',)
+    actions = ['retry_now']
+    
+    def retry_now(self, request, queryset):
+        """Admin action to send failed or delayed messages on the next worker run"""
+        from django.utils import timezone
+        count = queryset.exclude(status='sent').update(status='pending', attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f"{count} message(s) queued for sending.")
+    retry_now.short_description = "Retry selected messages now"
+
+
+class DailySalesCloseLineInline(admin.TabularInline):
+    model = DailySalesCloseLine
+    fields = ('payment_type', 'cashier', 'order_count', 'total_sales', 'total_discount', 'total_paid', 'outstanding_balance')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySalesClose)
+class DailySalesCloseAdmin(admin.ModelAdmin):
+    """Z-reports are immutable: view only"""
+    list_display = ('business_date', 'order_count', 'total_sales', 'total_paid', 'outstanding_balance', 'closed_by', 'created_at')
+    date_hierarchy = 'business_date'
+    inlines = [DailySalesCloseLineInline]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CashierShift)
+class CashierShiftAdmin(admin.ModelAdmin):
+    list_display = ('cashier', 'status', 'opened_at', 'closed_at', 'receipt_count', 'net_cash', 'counted_cash', 'variance')
+    list_filter = ('status', 'cashier')
+    readonly_fields = (
+        'receipt_count', 'total_tendered', 'total_change', 'net_cash', 'counted_cash', 'variance',
+        'closed_by', 'opened_at', 'closed_at'
+    )
@@ -0,0 +1,242 @@
+"""
+End-of-day close (Z-report) of POS sales
+
+Closing a business date freezes its totals per payment type and cashier in
+DailySalesClose/DailySalesCloseLine. Reports over any period read the closed
+days from those rows and only aggregate orders of days that are still open
+(normally just today), filtering the indexed business_date column. Only
+finished days can be closed, so a close always holds the whole day.
+
+A closed day is frozen: later edits to its orders (payments changing
+amount_paid and balance, corrections, deletes) do not change its totals in
+any report. Receivables (app_sales.receivables) follow the live balances.
+"""
+import operator
+from datetime import timedelta
+from decimal import Decimal
+from functools import reduce
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+from django.utils import timezone
+from app_sales.models import DailySalesClose, DailySalesCloseLine, Receipt, SalesOrder
+from core import business_dates
+
+CENT = Decimal('0.01')
+
+AMOUNT_FIELDS = ('total_sales', 'total_discount', 'total_paid', 'outstanding_balance')
+
+ORDER_AGGREGATES = {
+    'order_count': Count('id'),
+    'total_sales': Sum('total_amount'),
+    'total_discount': Sum('discount_amount'),
+    'total_paid': Sum('amount_paid'),
+    'outstanding_balance': Sum('balance'),
+}
+
+
+class DailyClose:
+    """Close business dates and report totals from closed and open days"""
+
+    @staticmethod
+    def close_day(business_date=None, closed_by=None):
+        """
+        Freeze the totals of a business date
+
+        Args:
+            business_date: Date to close (default: yesterday)
+            closed_by: User running the close
+
+        Returns:
+            DailySalesClose
+
+        Raises:
+            ValidationError: If the date is not over yet or already closed
+        """
+        business_date = business_date or business_dates.business_date() - timedelta(days=1)
+        end = business_dates.day_start(business_date + timedelta(days=1))
+        if end > timezone.now():
+            raise ValidationError(f'{business_date} is not over yet')
+
+        orders = SalesOrder.objects.filter(business_date=business_date, created_at__lt=end)
+        lines = list(
+            orders.values('payment_type', 'created_by').annotate(**ORDER_AGGREGATES).order_by('payment_type', 'created_by')
+        )
+        # Frozen to cents; the day totals are the sum of the rounded lines so they always agree
+        for line in lines:
+            for field in AMOUNT_FIELDS:
+                line[field] = Decimal(line[field] or 0).quantize(CENT)
+        totals = {field: sum((line[field] for line in lines), Decimal('0')) for field in AMOUNT_FIELDS}
+
+        try:
+            with transaction.atomic():
+                close = DailySalesClose.objects.create(
+                    business_date=business_date,
+                    closed_at=end,
+                    closed_by=closed_by,
+                    order_count=sum(line['order_count'] for line in lines),
+                    receipt_count=Receipt.objects.filter(business_date=business_date, created_at__lt=end).count(),
+                    **totals,
+                )
+                DailySalesCloseLine.objects.bulk_create([
+                    DailySalesCloseLine(
+                        close=close,
+                        payment_type=line['payment_type'],
+                        cashier_id=line['created_by'],
+                        order_count=line['order_count'],
+                        **{field: line[field] for field in AMOUNT_FIELDS},
+                    )
+                    for line in lines
+                ])
+        except IntegrityError:
+            raise ValidationError(f'{business_date} is already closed')
+        return close
+
+    @staticmethod
+    def close_pending(until=None, closed_by=None):
+        """
+        Close every business date up to `until` that has orders and no close
+
+        Args:
+            until: Last date to close (default: yesterday)
+            closed_by: User running the close
+
+        Returns:
+            List of DailySalesClose created
+        """
+        until = until or business_dates.business_date() - timedelta(days=1)
+        # Anti-join on the unique close date, so open days before the latest close are caught up too
+        dates = SalesOrder.objects.filter(business_date__lte=until).filter(
+            ~Exists(DailySalesClose.objects.filter(business_date=OuterRef('business_date')))
+        ).values_list('business_date', flat=True).distinct().order_by('business_date')
+        return [DailyClose.close_day(day, closed_by) for day in dates]
+
+    @staticmethod
+    def open_filter(start_date, end_date, closed_days):
+        """
+        Filter for the orders/receipts of a period not covered by a close
+
+        Runs of open dates become business_date ranges.
+
+        Args:
+            start_date, end_date: Period (inclusive)
+            closed_days: Set of the closed business dates in the period
+
+        Returns:
+            Q, or None when the whole period is closed
+        """
+        last = min(end_date, business_dates.business_date())
+        conditions = []
+        run_start = None
+        day = start_date
+        while day <= last:
+            if day in closed_days:
+                if run_start:
+                    conditions.append(Q(business_date__range=(run_start, day - timedelta(days=1))))
+                    run_start = None
+            elif run_start is None:
+                run_start = day
+            day += timedelta(days=1)
+        if run_start:
+            conditions.append(Q(business_date__range=(run_start, last)))
+        return reduce(operator.or_, conditions) if conditions else None
+
+    @staticmethod
+    def period_totals(start_date, end_date):
+        """
+        Sales totals of a period with payment type and cashier breakdowns
+
+        Args:
+            start_date: First business date
+            end_date: Last business date (inclusive)
+
+        Returns:
+            Dict with totals (Decimal), 'by_payment_type', 'by_cashier' and
+            the number of closed days in the period
+        """
+        from core.models import CustomUser
+
+        closes = set()
+        receipt_count = 0
+        for business_date, receipts in DailySalesClose.objects.filter(
+            business_date__range=(start_date, end_date)
+        ).values_list('business_date', 'receipt_count'):
+            closes.add(business_date)
+            receipt_count += receipts
+        open_days = DailyClose.open_filter(start_date, end_date, closes)
+
+        lines = []
+        if closes:
+            # Annotations cannot reuse the model's field names
+            for line in DailySalesCloseLine.objects.filter(close__business_date__range=(start_date, end_date)).values(
+                'payment_type', 'cashier'
+            ).annotate(**{f'sum_{field}': Sum(field) for field in ('order_count',) + AMOUNT_FIELDS}).order_by():
+                lines.append({key.removeprefix('sum_'): value for key, value in line.items()})
+
+        if open_days:
+            for line in SalesOrder.objects.filter(open_days).values('payment_type', 'created_by').annotate(
+                **ORDER_AGGREGATES
+            ).order_by():
+                line['cashier'] = line.pop('created_by')
+                lines.append(line)
+            receipt_count += Receipt.objects.filter(open_days).count()
+
+        def rollup(key):
+            groups = {}
+            for line in lines:
+                group = groups.setdefault(line[key], {'order_count': 0, **{field: Decimal('0') for field in AMOUNT_FIELDS}})
+                group['order_count'] += line['order_count'] or 0
+                for field in AMOUNT_FIELDS:
+                    group[field] += line[field] or Decimal('0')
+            return groups
+
+        by_payment_type = rollup('payment_type')
+        by_cashier = rollup('cashier')
+        names = dict(CustomUser.objects.filter(id__in=[cashier for cashier in by_cashier if cashier]).values_list('id', 'username'))
+
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'closed_days': len(closes),
+            'order_count': sum(group['order_count'] for group in by_payment_type.values()),
+            'receipt_count': receipt_count,
+            **{field: sum((group[field] for group in by_payment_type.values()), Decimal('0')) for field in AMOUNT_FIELDS},
+            'by_payment_type': [
+                {'payment_type': payment_type, **group} for payment_type, group in sorted(by_payment_type.items())
+            ],
+            'by_cashier': [
+                {'cashier_id': cashier, 'cashier': names.get(cashier), **group}
+                for cashier, group in sorted(by_cashier.items(), key=lambda item: -item[1]['total_sales'])
+            ],
+        }
+
+    @staticmethod
+    def daily_totals(start_date, end_date):
+        """
+        Totals per business date of a period, for days with sales
+
+        Returns:
+            List of dicts (business_date, order_count, amounts, closed) ordered by date
+        """
+        days = {}
+        closes = set()
+        for close in DailySalesClose.objects.filter(business_date__range=(start_date, end_date)).values(
+            'business_date', 'order_count', *AMOUNT_FIELDS
+        ):
+            closes.add(close['business_date'])
+            if close['order_count']:
+                days[close['business_date']] = {**close, 'closed': True}
+
+        open_days = DailyClose.open_filter(start_date, end_date, closes)
+        if open_days:
+            live = SalesOrder.objects.filter(open_days).values('business_date').annotate(**ORDER_AGGREGATES).order_by()
+            for row in live:
+                day = days.setdefault(row['business_date'], {
+                    'business_date': row['business_date'], 'order_count': 0,
+                    **{field: Decimal('0') for field in AMOUNT_FIELDS}, 'closed': False,
+                })
+                day['order_count'] += row['order_count']
+                for field in AMOUNT_FIELDS:
+                    day[field] += row[field] or Decimal('0')
+
+        return [days[day] for day in sorted(days)]
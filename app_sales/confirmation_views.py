@@ -10,6 +10,7 @@ from django.core.exceptions import ValidationError
 from app_sales.notification_models import OrderNotification, OrderConfirmation
 from app_sales.models import SalesOrder, Customer
 from app_sales.services import OrderConfirmationService
+from app_sales.scheduling import PickupScheduler
 from django.shortcuts import get_object_or_404
 
 
@@ -118,6 +119,40 @@ class OrderConfirmationViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'])
+    def bulk_mark_ready(self, request):
+        """
+        Mark many orders as ready for pickup
+        
+        Expected payload:
+        {
+            "sales_order_ids": [1, 2, 3]
+        }
+        """
+        sales_order_ids = request.data.get('sales_order_ids', [])
+        if not sales_order_ids:
+            return Response({'error': 'sales_order_ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = OrderConfirmationService.bulk_mark_ready(sales_order_ids, updated_by=request.user)
+        return Response(result)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_mark_picked_up(self, request):
+        """
+        Mark many orders as picked up
+        
+        Expected payload:
+        {
+            "sales_order_ids": [1, 2, 3]
+        }
+        """
+        sales_order_ids = request.data.get('sales_order_ids', [])
+        if not sales_order_ids:
+            return Response({'error': 'sales_order_ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = OrderConfirmationService.bulk_mark_picked_up(sales_order_ids)
+        return Response(result)
+    
     @action(detail=False, methods=['get'])
     def pending_pickups(self, request):
         """Get all pending pickups for authenticated customer"""
@@ -156,6 +191,23 @@ class OrderConfirmationViewSet(viewsets.ModelViewSet):
             })
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['get'])
+    def pickup_schedule(self, request):
+        """
+        Get booked preparation load against yard capacity per day
+        
+        Query params:
+            days: Number of days from today (default 14)
+        """
+        try:
+            days = int(request.query_params.get('days', 14))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'days': PickupScheduler.schedule(days=max(1, min(days, PickupScheduler.HORIZON_DAYS)))
+        })
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -238,14 +290,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
                     'updated_count': 0
                 })
             
-            unread = OrderNotification.objects.filter(
-                customer=customer,
-                is_read=False
-            )
-            count = unread.count()
-            
-            for notif in unread:
-                notif.mark_as_read()
+            count = OrderConfirmationService.mark_all_notifications_read(customer.id)
             
             return Response({
                 'updated_count': count,
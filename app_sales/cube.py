@@ -0,0 +1,139 @@
+"""
+Pre-aggregated sales cube (SalesFact)
+
+Product, category and customer reports used to join every SalesOrderItem
+of their period to its order and product. SalesFact keeps those totals per
+business date, customer and product instead, so a 365-day report reads a
+few rows per day.
+
+The rows of a (business date, customer) slice are re-aggregated from its
+orders in the same transaction whenever an order or line is saved or
+deleted, by the SalesOrder and SalesOrderItem signals (app_sales.models),
+whatever the write path. Queryset update()/bulk_create() skip signals;
+rebuild() (manage.py rebuild_sales_cube) recomputes any period from
+scratch after such writes.
+"""
+from datetime import timedelta
+from itertools import islice
+from django.db import transaction
+from django.db.models import Count, Sum
+from app_sales.heatmap import SalesHeatmap
+from app_sales.models import SalesFact, SalesOrder, SalesOrderItem
+from core import business_dates
+
+
+class SalesCube:
+    """Maintain and query the SalesFact rollup"""
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def _facts(orders):
+        """Unsaved SalesFact rows of an order queryset: product rows, then order rows"""
+        for row in SalesOrderItem.objects.filter(sales_order__in=orders).values(
+            'sales_order__business_date', 'sales_order__customer_id', 'product_id', 'product__category_id'
+        ).annotate(
+            orders=Count('sales_order', distinct=True),
+            lines=Count('id'),
+            pieces=Sum('quantity_pieces'),
+            bf=Sum('board_feet'),
+            subtotal=Sum('subtotal'),
+            unit_prices=Sum('unit_price'),
+        ).order_by().iterator(chunk_size=SalesCube.BATCH_SIZE):
+            yield SalesFact(
+                business_date=row['sales_order__business_date'],
+                customer_id=row['sales_order__customer_id'],
+                product_id=row['product_id'],
+                category_id=row['product__category_id'],
+                order_count=row['orders'],
+                line_count=row['lines'],
+                quantity_pieces=row['pieces'],
+                board_feet=row['bf'],
+                revenue=row['subtotal'],
+                unit_price_total=row['unit_prices'],
+            )
+
+        for row in orders.values('business_date', 'customer_id').annotate(
+            orders=Count('id'), total=Sum('total_amount')
+        ).order_by().iterator(chunk_size=SalesCube.BATCH_SIZE):
+            yield SalesFact(
+                business_date=row['business_date'],
+                customer_id=row['customer_id'],
+                order_count=row['orders'],
+                revenue=row['total'],
+            )
+
+    @staticmethod
+    @transaction.atomic
+    def refresh(business_date, customer_id):
+        """
+        Re-aggregate the facts of one customer's orders of one business date
+        and bump its week's heatmap version
+
+        Args:
+            business_date: Business date of the slice
+            customer_id: Customer ID
+        """
+        SalesFact.objects.filter(business_date=business_date, customer_id=customer_id).delete()
+        SalesFact.objects.bulk_create(
+            SalesCube._facts(SalesOrder.objects.filter(business_date=business_date, customer_id=customer_id))
+        )
+        SalesHeatmap.invalidate(business_date)
+
+    @staticmethod
+    def record_order(order):
+        """Bring the cube up to date after an order or one of its lines changed"""
+        SalesCube.refresh(order.business_date, order.customer_id)
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(start_date=None, end_date=None):
+        """
+        Recompute the facts of a period (default: all history) from the orders
+
+        Args:
+            start_date: First business date
+            end_date: Last business date (inclusive)
+
+        Returns:
+            Dict with the number of facts written
+        """
+        facts = SalesFact.objects.all()
+        orders = SalesOrder.objects.all()
+        if start_date:
+            facts = facts.filter(business_date__gte=start_date)
+            orders = orders.filter(business_date__gte=start_date)
+        if end_date:
+            facts = facts.filter(business_date__lte=end_date)
+            orders = orders.filter(business_date__lte=end_date)
+
+        facts.delete()
+        written = 0
+        rows = SalesCube._facts(orders)
+        while batch := list(islice(rows, SalesCube.BATCH_SIZE)):
+            SalesFact.objects.bulk_create(batch)
+            written += len(batch)
+        return {'facts': written}
+
+    @staticmethod
+    def since(days):
+        """First business date of a rolling window of `days` days ending today"""
+        return business_dates.business_date() - timedelta(days=days)
+
+    @staticmethod
+    def _period(facts, start_date, end_date):
+        if start_date:
+            facts = facts.filter(business_date__gte=start_date)
+        if end_date:
+            facts = facts.filter(business_date__lte=end_date)
+        return facts
+
+    @staticmethod
+    def product_facts(start_date=None, end_date=None):
+        """Product rows of a period (line item totals)"""
+        return SalesCube._period(SalesFact.objects.filter(product__isnull=False), start_date, end_date)
+
+    @staticmethod
+    def order_facts(start_date=None, end_date=None):
+        """Order rows of a period (order totals per customer and day)"""
+        return SalesCube._period(SalesFact.objects.filter(product__isnull=True), start_date, end_date)
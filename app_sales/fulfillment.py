@@ -0,0 +1,171 @@
+"""
+Fulfillment pipeline latency reporting from OrderConfirmation timestamps
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Count, Q, F, ExpressionWrapper, DurationField
+from django.db.models.functions import Coalesce
+from app_sales.notification_models import OrderConfirmation
+from core import business_dates
+from core.stats import summarize
+
+
+def _elapsed(start, end):
+    """Database-side duration between two timestamp expressions"""
+    return ExpressionWrapper(end - start, output_field=DurationField())
+
+
+class FulfillmentReports:
+    """Per-stage latency, throughput and backlog of the order fulfillment pipeline"""
+
+    # Stage name -> (start, end) timestamp expressions on OrderConfirmation
+    STAGES = {
+        'confirmation': (F('created_at'), Coalesce('confirmed_at', 'sales_order__confirmed_at')),
+        'preparation': (Coalesce('confirmed_at', 'sales_order__confirmed_at', 'created_at'), F('ready_at')),
+        'pickup': (F('ready_at'), F('picked_up_at')),
+        'total': (F('created_at'), F('picked_up_at')),
+    }
+    PERCENTILES = (50, 95)
+
+    # v2: days are business dates, not UTC dates
+    CACHE_KEY = 'fulfillment_day_v2_{day}'
+    CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+    @staticmethod
+    def _query_days(first_day, last_day):
+        """
+        Bucket stage latencies and throughput by business date for first_day..last_day
+
+        One query returns every confirmation that was created, became ready
+        or was picked up in the period, with stage durations computed in the
+        database. A stage is attributed to the day it ended.
+
+        Returns:
+            Dict mapping day -> {'latencies': {stage: [hours]}, 'created': n, 'ready': n, 'picked_up': n}
+        """
+        start = business_dates.day_start(first_day)
+        end = business_dates.day_start(last_day + timedelta(days=1))
+
+        annotations = {}
+        for stage, (stage_start, stage_end) in FulfillmentReports.STAGES.items():
+            annotations[f'{stage}_end'] = stage_end
+            annotations[f'{stage}_duration'] = _elapsed(stage_start, stage_end)
+
+        rows = OrderConfirmation.objects.filter(
+            Q(created_at__gte=start, created_at__lt=end)
+            | Q(ready_at__gte=start, ready_at__lt=end)
+            | Q(picked_up_at__gte=start, picked_up_at__lt=end)
+            | Q(confirmed_at__gte=start, confirmed_at__lt=end)
+        ).annotate(**annotations).values('created_at', 'ready_at', 'picked_up_at', *annotations).order_by()
+
+        days = defaultdict(lambda: {'latencies': defaultdict(list), 'created': 0, 'ready': 0, 'picked_up': 0})
+
+        def bucket(moment):
+            if moment is not None and start <= moment < end:
+                return days[business_dates.business_date(moment)]
+            return None
+
+        for row in rows.iterator(chunk_size=2000):
+            for field, counter in (('created_at', 'created'), ('ready_at', 'ready'), ('picked_up_at', 'picked_up')):
+                day = bucket(row[field])
+                if day is not None:
+                    day[counter] += 1
+            for stage in FulfillmentReports.STAGES:
+                duration = row[f'{stage}_duration']
+                day = bucket(row[f'{stage}_end'])
+                if day is not None and duration is not None:
+                    day['latencies'][stage].append(duration.total_seconds() / 3600)
+
+        return {
+            day: {**values, 'latencies': dict(values['latencies'])}
+            for day, values in days.items()
+        }
+
+    @staticmethod
+    def _days(first_day, last_day):
+        """Per-day buckets, reading closed days from the cache"""
+        today = business_dates.business_date()
+        empty = {'latencies': {}, 'created': 0, 'ready': 0, 'picked_up': 0}
+        days = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+
+        cached = cache.get_many([FulfillmentReports.CACHE_KEY.format(day=day) for day in days if day < today])
+        result = {}
+        missing = []
+        for day in days:
+            key = FulfillmentReports.CACHE_KEY.format(day=day)
+            if key in cached:
+                result[day] = cached[key]
+            else:
+                missing.append(day)
+
+        if missing:
+            fresh = FulfillmentReports._query_days(missing[0], missing[-1])
+            to_cache = {}
+            for day in missing:
+                result[day] = fresh.get(day, empty)
+                if day < today:
+                    to_cache[FulfillmentReports.CACHE_KEY.format(day=day)] = result[day]
+            if to_cache:
+                cache.set_many(to_cache, FulfillmentReports.CACHE_TIMEOUT)
+
+        return result
+
+    @staticmethod
+    def backlog():
+        """Current number of orders waiting at each stage"""
+        return OrderConfirmation.objects.aggregate(
+            awaiting_confirmation=Count('id', filter=Q(status='created')),
+            awaiting_preparation=Count('id', filter=Q(status__in=['created', 'confirmed'])),
+            awaiting_pickup=Count('id', filter=Q(status='ready_for_pickup')),
+        )
+
+    @staticmethod
+    def pipeline_latency(days=30):
+        """
+        Get fulfillment latency distributions, daily throughput and backlog
+
+        Args:
+            days: Period in days (including today)
+
+        Returns:
+            Dict with p50/p95 hours per stage, per-day throughput and backlog
+        """
+        last_day = business_dates.business_date()
+        first_day = last_day - timedelta(days=days - 1)
+        by_day = FulfillmentReports._days(first_day, last_day)
+
+        latencies = defaultdict(list)
+        daily = []
+        for day in sorted(by_day):
+            values = by_day[day]
+            for stage, hours in values['latencies'].items():
+                latencies[stage].extend(hours)
+            daily.append({
+                'date': day.isoformat(),
+                'created': values['created'],
+                'ready': values['ready'],
+                'picked_up': values['picked_up'],
+                'net_backlog_change': values['created'] - values['ready'],
+            })
+
+        created = sum(day['created'] for day in daily)
+        ready = sum(day['ready'] for day in daily)
+
+        return {
+            'period_days': days,
+            'stages': {
+                stage: summarize(latencies[stage], FulfillmentReports.PERCENTILES)
+                for stage in FulfillmentReports.STAGES
+            },
+            'throughput': {
+                'created': created,
+                'ready': ready,
+                'picked_up': sum(day['picked_up'] for day in daily),
+                'avg_created_per_day': round(created / days, 1),
+                'avg_ready_per_day': round(ready / days, 1),
+                'keeping_up': ready >= created,
+            },
+            'backlog': FulfillmentReports.backlog(),
+            'daily': daily,
+        }
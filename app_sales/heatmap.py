@@ -0,0 +1,168 @@
+"""
+Hour-of-day by weekday sales heatmap
+
+Order count, revenue and board feet per weekday and hour at the yard, for
+walk-in POS sales and customer orders separately. One grouped query over
+the line items, filtered on the indexed SalesOrder.created_at, returns a
+cell per (week, weekday, hour, source). A week that has ended is cached
+and only the current week is read again. The cache key holds the week's
+SalesWeekVersion, which SalesCube.refresh() bumps whenever an order or
+line of the week is saved or deleted, so an edit to a past week is seen
+by every process (the default LocMemCache is per process) without
+deleting keys.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncWeek
+from app_sales.models import SalesOrder, SalesOrderItem, SalesWeekVersion
+from core import business_dates
+
+
+class SalesHeatmap:
+    """Weekday x hour sales activity, cached per closed week"""
+
+    WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+    CACHE_KEY = 'sales_heatmap_week_{week}_v{version}'
+    CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+    @staticmethod
+    def invalidate(business_date):
+        """Bump the version of a business date's week, so its cached cells are no longer read"""
+        week = business_date - timedelta(days=business_date.weekday())
+        if SalesWeekVersion.objects.filter(week=week).update(version=F('version') + 1):
+            return
+        try:
+            with transaction.atomic():
+                SalesWeekVersion.objects.create(week=week)
+        except IntegrityError:
+            # Created concurrently
+            SalesWeekVersion.objects.filter(week=week).update(version=F('version') + 1)
+
+    @staticmethod
+    def _query_weeks(first_week, last_week):
+        """
+        Cells of the weeks starting first_week..last_week (Mondays)
+
+        Revenue is the sum of line subtotals, which is the orders' amount
+        before discount; orders are counted once per cell.
+
+        Returns:
+            Dict mapping week -> list of (source, weekday, hour, orders, revenue, board_feet)
+        """
+        tz = business_dates.business_timezone()
+        created_at = 'sales_order__created_at'
+        rows = SalesOrderItem.objects.filter(
+            sales_order__created_at__gte=business_dates.day_start(first_week),
+            sales_order__created_at__lt=business_dates.day_start(last_week + timedelta(days=7)),
+        ).values(
+            'sales_order__order_source',
+            week=TruncWeek(created_at, output_field=DateField(), tzinfo=tz),
+            weekday=ExtractIsoWeekDay(created_at, tzinfo=tz),
+            hour=ExtractHour(created_at, tzinfo=tz),
+        ).annotate(
+            orders=Count('sales_order', distinct=True),
+            revenue=Sum('subtotal'),
+            bf=Sum('board_feet'),
+        ).order_by()
+
+        weeks = defaultdict(list)
+        for row in rows:
+            weeks[row['week']].append((
+                row['sales_order__order_source'], row['weekday'], row['hour'],
+                row['orders'], row['revenue'] or Decimal('0'), row['bf'] or Decimal('0'),
+            ))
+        return weeks
+
+    @staticmethod
+    def _weeks(first_week, last_week):
+        """Cells per week, reading closed weeks from the cache"""
+        today = business_dates.business_date()
+        current_week = today - timedelta(days=today.weekday())
+        weeks = [first_week + timedelta(weeks=offset) for offset in range((last_week - first_week).days // 7 + 1)]
+        versions = dict(
+            SalesWeekVersion.objects.filter(week__range=(first_week, last_week)).values_list('week', 'version')
+        )
+        keys = {week: SalesHeatmap.CACHE_KEY.format(week=week, version=versions.get(week, 0)) for week in weeks}
+
+        cached = cache.get_many([keys[week] for week in weeks if week < current_week])
+        result = {}
+        missing = []
+        for week in weeks:
+            key = keys[week]
+            if key in cached:
+                result[week] = cached[key]
+            else:
+                missing.append(week)
+
+        if missing:
+            fresh = SalesHeatmap._query_weeks(missing[0], missing[-1])
+            to_cache = {}
+            for week in missing:
+                result[week] = fresh.get(week, [])
+                if week < current_week:
+                    to_cache[keys[week]] = result[week]
+            if to_cache:
+                cache.set_many(to_cache, SalesHeatmap.CACHE_TIMEOUT)
+
+        return result
+
+    @staticmethod
+    def heatmap(weeks=8):
+        """
+        Get sales activity by weekday and hour
+
+        Args:
+            weeks: Number of weeks, including the current one
+
+        Returns:
+            Dict with the period, the hours that had sales, and per order
+            source a 7 x 24 grid of {orders, revenue, board_feet, level}
+            (level 0-4 is the order count relative to the busiest cell)
+        """
+        today = business_dates.business_date()
+        last_week = today - timedelta(days=today.weekday())
+        first_week = last_week - timedelta(weeks=weeks - 1)
+
+        empty = lambda: {'orders': 0, 'revenue': Decimal('0'), 'board_feet': Decimal('0')}
+        grids = {source: [[empty() for _ in range(24)] for _ in SalesHeatmap.WEEKDAYS]
+                 for source, _ in SalesOrder.ORDER_SOURCE_CHOICES}
+        for cells in SalesHeatmap._weeks(first_week, last_week).values():
+            for source, weekday, hour, orders, revenue, board_feet in cells:
+                cell = grids[source][weekday - 1][hour]
+                cell['orders'] += orders
+                cell['revenue'] += revenue
+                cell['board_feet'] += board_feet
+
+        hours = sorted({
+            hour for grid in grids.values() for day in grid for hour, cell in enumerate(day) if cell['orders']
+        })
+        sources = {}
+        for source, label in SalesOrder.ORDER_SOURCE_CHOICES:
+            grid = grids[source]
+            busiest = max(cell['orders'] for day in grid for cell in day)
+            for day in grid:
+                for cell in day:
+                    cell['level'] = math.ceil(cell['orders'] * 4 / busiest) if busiest else 0
+                    cell['revenue'] = float(cell['revenue'])
+                    cell['board_feet'] = float(cell['board_feet'])
+            sources[source] = {
+                'label': label,
+                'orders': sum(cell['orders'] for day in grid for cell in day),
+                'revenue': sum(cell['revenue'] for day in grid for cell in day),
+                'grid': grid,
+            }
+
+        return {
+            'period_weeks': weeks,
+            'start_date': first_week,
+            'end_date': today,
+            'weekdays': list(SalesHeatmap.WEEKDAYS),
+            'hours': list(range(hours[0], hours[-1] + 1)) if hours else [],
+            'sources': sources,
+        }
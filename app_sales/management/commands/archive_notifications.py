@@ -0,0 +1,49 @@
+"""
+Management command to move old read notifications into the archive table
+Usage: python manage.py archive_notifications [--days 90] [--batch-size 1000] [--dry-run]
+
+Keeps OrderNotification (and its customer/created_at index) small; run it
+daily from cron.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from app_sales.retention import NotificationArchiver
+
+
+class Command(BaseCommand):
+    help = 'Archive read order notifications older than the retention period'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=NotificationArchiver.DEFAULT_RETENTION_DAYS,
+            help=f'Keep read notifications newer than this many days (default: {NotificationArchiver.DEFAULT_RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=NotificationArchiver.DEFAULT_BATCH_SIZE,
+            help=f'Notifications moved per transaction (default: {NotificationArchiver.DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many notifications would be archived'
+        )
+    
+    def handle(self, *args, **options):
+        days = options['days']
+        batch_size = options['batch_size']
+        if days < 0 or batch_size < 1:
+            raise CommandError('--days must be >= 0 and --batch-size >= 1')
+        
+        if options['dry_run']:
+            count = NotificationArchiver.eligible(days).count()
+            self.stdout.write(f'{count} read notification(s) older than {days} days would be archived')
+            return
+        
+        result = NotificationArchiver.archive(days=days, batch_size=batch_size)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {result['archived']} notification(s) in {result['batches']} batch(es)"
+        ))
@@ -0,0 +1,40 @@
+"""
+Management command for the end-of-day close (Z-report) of POS sales
+Usage: python manage.py close_sales_days [--date YYYY-MM-DD]
+
+Without --date, closes every day up to yesterday that has orders and no
+close yet; run it from cron shortly after midnight. A day can only be
+closed once it is over.
+"""
+from datetime import datetime
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from app_sales.closing import DailyClose
+
+
+class Command(BaseCommand):
+    help = 'Freeze daily sales totals of finished business days'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Close only this business date (YYYY-MM-DD)'
+        )
+    
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                business_date = datetime.strptime(options['date'], '%Y-%m-%d').date()
+                closes = [DailyClose.close_day(business_date)]
+            except ValueError:
+                raise CommandError('--date must be in YYYY-MM-DD format')
+            except ValidationError as e:
+                raise CommandError(e.messages[0])
+        else:
+            closes = DailyClose.close_pending()
+        
+        for close in closes:
+            self.stdout.write(
+                f'{close.business_date}: {close.order_count} order(s), total {close.total_sales}'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Closed {len(closes)} day(s)'))
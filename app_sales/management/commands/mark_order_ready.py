@@ -1,6 +1,7 @@
 """
 Management command to mark orders as ready for pickup and notify customers
 Usage: python manage.py mark_order_ready [--order-id ORDER_ID] [--all-pending] [--notify]
+       python manage.py mark_order_ready --order-ids 1,2,3 [--confirm | --picked-up]
 """
 from django.core.management.base import BaseCommand, CommandError
 from app_sales.models import SalesOrder
@@ -27,6 +28,21 @@ class Command(BaseCommand):
             type=str,
             help='Mark order by SO number (e.g., SO-20251213-0001)'
         )
+        parser.add_argument(
+            '--order-ids',
+            type=str,
+            help='Comma-separated sales order IDs to update in one batch'
+        )
+        parser.add_argument(
+            '--confirm',
+            action='store_true',
+            help='With --order-ids: confirm the sales orders first (same as the admin confirm action)'
+        )
+        parser.add_argument(
+            '--picked-up',
+            action='store_true',
+            help='With --order-ids: mark the orders as picked up instead of ready'
+        )
         parser.add_argument(
             '--notify',
             action='store_true',
@@ -38,9 +54,19 @@ class Command(BaseCommand):
         order_id = options.get('order_id')
         all_pending = options.get('all_pending')
         so_number = options.get('so_number')
+        order_ids = options.get('order_ids')
+        
+        if options.get('confirm') and options.get('picked_up'):
+            raise CommandError('--confirm and --picked-up cannot be combined')
         
         try:
-            if order_id:
+            if order_ids:
+                try:
+                    ids = [int(pk) for pk in order_ids.split(',') if pk.strip()]
+                except ValueError:
+                    raise CommandError('--order-ids must be a comma-separated list of integers')
+                self.mark_batch(ids, confirm=options.get('confirm'), picked_up=options.get('picked_up'))
+            elif order_id:
                 self.mark_order_by_id(order_id)
             elif so_number:
                 self.mark_order_by_number(so_number)
@@ -48,8 +74,10 @@ class Command(BaseCommand):
                 self.mark_all_pending()
             else:
                 self.stdout.write(self.style.ERROR(
-                    'Please provide --order-id, --so-number, or --all-pending'
+                    'Please provide --order-id, --order-ids, --so-number, or --all-pending'
                 ))
+        except CommandError:
+            raise
         except Exception as e:
             raise CommandError(f'Error: {str(e)}')
     
@@ -73,19 +101,35 @@ class Command(BaseCommand):
             raise CommandError(f'Order confirmation not found for: {so_number}')
     
     def mark_all_pending(self):
-        """Mark all pending orders as ready"""
-        pending = OrderConfirmation.objects.filter(
+        """Mark all pending orders as ready in one batch"""
+        pending = list(OrderConfirmation.objects.filter(
             status__in=['created', 'confirmed']
-        ).select_related('sales_order', 'customer')
+        ).values_list('sales_order_id', flat=True))
         
-        count = pending.count()
-        if count == 0:
+        if not pending:
             self.stdout.write(self.style.WARNING('No pending orders to mark as ready'))
             return
         
-        self.stdout.write(f'Found {count} pending order(s)')
-        for confirmation in pending:
-            self.mark_ready(confirmation)
+        self.stdout.write(f'Found {len(pending)} pending order(s)')
+        self.mark_batch(pending)
+    
+    def mark_batch(self, order_ids, confirm=False, picked_up=False):
+        """Confirm, mark ready or mark picked up many orders with set-based updates"""
+        if confirm:
+            result = OrderConfirmationService.bulk_confirm_orders(order_ids)
+            action = f"confirmed ({result['ready']} marked ready for pickup)"
+        elif picked_up:
+            result = OrderConfirmationService.bulk_mark_picked_up(order_ids)
+            action = 'marked as picked up'
+        else:
+            result = OrderConfirmationService.bulk_mark_ready(order_ids)
+            action = 'marked as ready for pickup'
+        
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f'  {error}'))
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {result['success']} order(s) {action}, {result['failed']} skipped. Customers have been notified."
+        ))
     
     def mark_ready(self, confirmation):
         """Mark order as ready and notify customer"""
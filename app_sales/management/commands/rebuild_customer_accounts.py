@@ -0,0 +1,25 @@
+"""
+Management command to recompute customer accounts (CustomerAccount)
+Usage: python manage.py rebuild_customer_accounts [--customer ID ...]
+
+Order counts, purchases, payments and balances are moved on every order
+save, payment and delete; run this after bulk data fixes or imports made
+with queryset updates, which bypass them.
+Without --customer, every account is recomputed.
+"""
+from django.core.management.base import BaseCommand
+from app_sales.receivables import Receivables
+
+
+class Command(BaseCommand):
+    help = 'Recompute customer account counters and balances from the sales orders'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--customer', type=int, nargs='+', dest='customer_ids', help='Customer IDs to recompute')
+    
+    def handle(self, *args, **options):
+        result = Receivables.rebuild(options['customer_ids'])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {result['accounts']} customer accounts, corrected {result['corrected']}"
+        ))
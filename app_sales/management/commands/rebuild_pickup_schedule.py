@@ -0,0 +1,21 @@
+"""
+Management command to recompute the pickup schedule's per-day load counters
+Usage: python manage.py rebuild_pickup_schedule
+
+The counters are maintained incrementally as orders are created and
+prepared; run this after bulk data fixes or deletes to resync them with
+the created/confirmed OrderConfirmation queue.
+"""
+from django.core.management.base import BaseCommand
+from app_sales.scheduling import PickupScheduler
+
+
+class Command(BaseCommand):
+    help = 'Recompute pickup schedule load counters from the order confirmation queue'
+    
+    def handle(self, *args, **options):
+        result = PickupScheduler.rebuild()
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Booked {result['orders']} queued orders over {result['days']} pickup days"
+        ))
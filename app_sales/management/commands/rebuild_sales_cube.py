@@ -0,0 +1,32 @@
+"""
+Management command to recompute the pre-aggregated sales cube (SalesFact)
+Usage: python manage.py rebuild_sales_cube [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+
+The cube is maintained as orders are created and edited; run this after
+bulk data fixes, imports or deletes made outside the sales services.
+Without dates, the whole history is recomputed.
+"""
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from app_sales.cube import SalesCube
+
+
+class Command(BaseCommand):
+    help = 'Recompute the sales cube from the sales orders'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='First business date (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Last business date (YYYY-MM-DD)')
+    
+    def handle(self, *args, **options):
+        try:
+            start_date, end_date = (
+                datetime.strptime(options[name], '%Y-%m-%d').date() if options[name] else None
+                for name in ('date_from', 'date_to')
+            )
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+        
+        result = SalesCube.rebuild(start_date, end_date)
+        
+        self.stdout.write(self.style.SUCCESS(f"Wrote {result['facts']} sales facts"))
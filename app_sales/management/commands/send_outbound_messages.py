@@ -0,0 +1,66 @@
+"""
+Management command to deliver queued customer emails and SMS
+Usage: python manage.py send_outbound_messages [--loop] [--interval 5] [--batch-size 100] [--channel email]
+
+Without --loop it sends until the outbox has nothing due and exits
+(suitable for cron); with --loop it keeps polling as a worker process.
+"""
+import time
+from django.core.management.base import BaseCommand
+from app_sales.notification_models import OutboundMessage
+from app_sales.outbox import Outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound customer messages in batches per channel'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--channel',
+            action='append',
+            choices=[choice for choice, _ in OutboundMessage.CHANNEL_CHOICES],
+            help='Only drain this channel (repeatable; default: all)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=Outbox.BATCH_SIZE,
+            help=f'Messages claimed per channel and batch (default: {Outbox.BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll for new messages'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to sleep when the outbox is empty (with --loop, default: 5)'
+        )
+    
+    def handle(self, *args, **options):
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        try:
+            while True:
+                summary = Outbox.process(channels=options['channel'], batch_size=options['batch_size'])
+                handled = 0
+                for channel, counts in summary.items():
+                    for key, value in counts.items():
+                        totals[key] += value
+                        handled += value
+                    if any(counts.values()):
+                        self.stdout.write(
+                            f"{channel}: {counts['sent']} sent, {counts['retried']} to retry, {counts['failed']} failed"
+                        )
+                
+                if not handled:
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals['sent']} message(s); {totals['retried']} to retry, {totals['failed']} failed"
+        ))
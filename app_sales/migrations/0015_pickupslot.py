@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:40
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_pickup_slots(apps, schema_editor):
+    """Book the current created/confirmed queue on its pickup days"""
+    OrderConfirmation = apps.get_model("app_sales", "OrderConfirmation")
+    PickupSlot = apps.get_model("app_sales", "PickupSlot")
+
+    queue = OrderConfirmation.objects.filter(
+        status__in=["created", "confirmed"], estimated_pickup_date__isnull=False
+    ).values("estimated_pickup_date").annotate(
+        orders=Count("id", distinct=True),
+        total_bf=Sum("sales_order__sales_order_items__board_feet", default=0),
+    ).order_by()
+    PickupSlot.objects.bulk_create([
+        PickupSlot(date=row["estimated_pickup_date"], order_count=row["orders"], board_feet=row["total_bf"])
+        for row in queue
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_sales", "0014_alter_customer_email"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PickupSlot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField(unique=True)),
+                ("order_count", models.PositiveIntegerField(default=0)),
+                ("board_feet", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("order_capacity", models.PositiveIntegerField(blank=True, null=True)),
+                ("board_feet_capacity", models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["date"],
+            },
+        ),
+        migrations.RunPython(backfill_pickup_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_sales", "0015_pickupslot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderNotificationArchive",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("original_id", models.BigIntegerField(unique=True)),
+                ("notification_type", models.CharField(choices=[("order_confirmed", "Order Confirmed"), ("ready_for_pickup", "Ready for Pickup"), ("payment_pending", "Payment Pending"), ("payment_completed", "Payment Completed"), ("order_cancelled", "Order Cancelled"), ("order_delayed", "Order Delayed")], max_length=30)),
+                ("title", models.CharField(max_length=255)),
+                ("message", models.TextField()),
+                ("created_at", models.DateTimeField()),
+                ("read_at", models.DateTimeField(blank=True, null=True)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                ("customer", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="archived_notifications", to="app_sales.customer")),
+                ("sales_order", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="archived_notifications", to="app_sales.salesorder")),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [models.Index(fields=["customer", "-created_at"], name="app_sales_o_custome_04aefb_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_sales", "0017_outboundmessage"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySalesClose",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("business_date", models.DateField(unique=True)),
+                ("closed_at", models.DateTimeField()),
+                ("order_count", models.IntegerField(default=0)),
+                ("receipt_count", models.IntegerField(default=0)),
+                ("total_sales", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("total_discount", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("total_paid", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("outstanding_balance", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("closed_by", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "verbose_name": "Daily Sales Close",
+                "verbose_name_plural": "Daily Sales Closes",
+                "ordering": ["-business_date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailySalesCloseLine",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("payment_type", models.CharField(choices=[("cash", "Cash"), ("partial", "Partial Payment"), ("credit", "Credit (SOA)")], max_length=20)),
+                ("order_count", models.IntegerField(default=0)),
+                ("total_sales", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("total_discount", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("total_paid", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("outstanding_balance", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("cashier", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to=settings.AUTH_USER_MODEL)),
+                ("close", models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name="lines", to="app_sales.dailysalesclose")),
+            ],
+            options={
+                "verbose_name": "Daily Sales Close Line",
+                "verbose_name_plural": "Daily Sales Close Lines",
+                "ordering": ["close", "payment_type"],
+            },
+        ),
+    ]
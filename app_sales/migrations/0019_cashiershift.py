@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_sales", "0018_dailysalesclose"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CashierShift",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("status", models.CharField(choices=[("open", "Open"), ("closed", "Closed")], default="open", max_length=10)),
+                ("opening_float", models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ("receipt_count", models.IntegerField(default=0)),
+                ("total_tendered", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("total_change", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("net_cash", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("counted_cash", models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ("variance", models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ("notes", models.TextField(blank=True)),
+                ("opened_at", models.DateTimeField(auto_now_add=True)),
+                ("closed_at", models.DateTimeField(blank=True, null=True)),
+                ("cashier", models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name="cashier_shifts", to=settings.AUTH_USER_MODEL)),
+                ("closed_by", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "ordering": ["-opened_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="receipt",
+            name="shift",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="receipts", to="app_sales.cashiershift"),
+        ),
+        migrations.AddIndex(
+            model_name="cashiershift",
+            index=models.Index(fields=["cashier", "-opened_at"], name="app_sales_c_cashier_611c46_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="cashiershift",
+            constraint=models.UniqueConstraint(condition=models.Q(("status", "open")), fields=("cashier",), name="one_open_shift_per_cashier"),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:18
+
+from zoneinfo import ZoneInfo
+
+import core.business_dates
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_business_date(apps, schema_editor):
+    """Derive the yard-local business date of existing rows from created_at"""
+    tz = ZoneInfo(getattr(settings, "BUSINESS_TIME_ZONE", settings.TIME_ZONE))
+    for model_name in ("SalesOrder", "Receipt"):
+        Model = apps.get_model("app_sales", model_name)
+        batch = []
+        for row in Model.objects.only("id", "created_at").order_by("id").iterator(chunk_size=2000):
+            row.business_date = row.created_at.astimezone(tz).date()
+            batch.append(row)
+            if len(batch) == 1000:
+                Model.objects.bulk_update(batch, ["business_date"])
+                batch = []
+        if batch:
+            Model.objects.bulk_update(batch, ["business_date"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_sales", "0019_cashiershift"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="salesorder",
+            name="business_date",
+            field=models.DateField(db_index=True, default=core.business_dates.business_date, editable=False),
+        ),
+        migrations.AddField(
+            model_name="receipt",
+            name="business_date",
+            field=models.DateField(db_index=True, default=core.business_dates.business_date, editable=False),
+        ),
+        migrations.RunPython(backfill_business_date, migrations.RunPython.noop),
+    ]
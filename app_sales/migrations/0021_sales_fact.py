@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_sales_facts(apps, schema_editor):
+    """Aggregate the existing orders into the cube (see app_sales.cube.SalesCube)"""
+    SalesFact = apps.get_model("app_sales", "SalesFact")
+    SalesOrder = apps.get_model("app_sales", "SalesOrder")
+    SalesOrderItem = apps.get_model("app_sales", "SalesOrderItem")
+    facts = [
+        SalesFact(
+            business_date=row["sales_order__business_date"], customer_id=row["sales_order__customer_id"],
+            product_id=row["product_id"], category_id=row["product__category_id"], order_count=row["orders"],
+            line_count=row["lines"], quantity_pieces=row["pieces"], board_feet=row["bf"],
+            revenue=row["subtotal"], unit_price_total=row["unit_prices"],
+        )
+        for row in SalesOrderItem.objects.values(
+            "sales_order__business_date", "sales_order__customer_id", "product_id", "product__category_id"
+        ).annotate(
+            orders=Count("sales_order", distinct=True), lines=Count("id"), pieces=Sum("quantity_pieces"),
+            bf=Sum("board_feet"), subtotal=Sum("subtotal"), unit_prices=Sum("unit_price"),
+        ).order_by()
+    ]
+    facts += [
+        SalesFact(
+            business_date=row["business_date"], customer_id=row["customer_id"],
+            order_count=row["orders"], revenue=row["total"],
+        )
+        for row in SalesOrder.objects.values("business_date", "customer_id").annotate(
+            orders=Count("id"), total=Sum("total_amount")
+        ).order_by()
+    ]
+    SalesFact.objects.bulk_create(facts, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_inventory", "0009_business_date"),
+        ("app_sales", "0020_business_date"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SalesFact",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("business_date", models.DateField()),
+                ("order_count", models.IntegerField(default=0)),
+                ("line_count", models.IntegerField(default=0)),
+                ("quantity_pieces", models.IntegerField(default=0)),
+                ("board_feet", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("revenue", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("unit_price_total", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("category", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="app_inventory.lumbercategory")),
+                ("customer", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="app_sales.customer")),
+                ("product", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name="+", to="app_inventory.lumberproduct")),
+            ],
+            options={
+                "verbose_name": "Sales Fact",
+                "verbose_name_plural": "Sales Facts",
+                "ordering": ["-business_date"],
+                "indexes": [models.Index(fields=["business_date", "product"], name="app_sales_s_busines_66d040_idx"), models.Index(fields=["business_date", "customer"], name="app_sales_s_busines_114d27_idx")],
+            },
+        ),
+        migrations.RunPython(populate_sales_facts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:36
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Q, Sum
+from django.db.models.functions import Round
+
+
+def populate_customer_accounts(apps, schema_editor):
+    """Sum the existing orders into the ledger (see app_sales.receivables.Receivables)"""
+    CustomerAccount = apps.get_model("app_sales", "CustomerAccount")
+    SalesOrder = apps.get_model("app_sales", "SalesOrder")
+    CustomerAccount.objects.bulk_create([
+        CustomerAccount(
+            customer_id=row["customer_id"],
+            outstanding_balance=Decimal(row["outstanding"]).quantize(Decimal("0.01")),
+            credit_balance=Decimal(row["credit"]).quantize(Decimal("0.01")),
+        )
+        for row in SalesOrder.objects.values("customer_id").annotate(
+            # Each order's balance in cents, as the ledger posts it
+            outstanding=Sum(Round("balance", 2), default=Decimal("0")),
+            credit=Sum(Round("balance", 2), filter=Q(payment_type="credit"), default=Decimal("0")),
+        ).order_by()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_sales", "0021_sales_fact"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CustomerAccount",
+            fields=[
+                ("customer", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name="account", serialize=False, to="app_sales.customer")),
+                ("outstanding_balance", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("credit_balance", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Customer Account",
+                "verbose_name_plural": "Customer Accounts",
+            },
+        ),
+        migrations.RunPython(populate_customer_accounts, migrations.RunPython.noop),
+    ]
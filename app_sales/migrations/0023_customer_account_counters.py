@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:40
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Round
+
+
+def populate_counters(apps, schema_editor):
+    """Count the existing orders into the accounts created by 0022"""
+    CustomerAccount = apps.get_model("app_sales", "CustomerAccount")
+    SalesOrder = apps.get_model("app_sales", "SalesOrder")
+    accounts = {account.customer_id: account for account in CustomerAccount.objects.all()}
+    for row in SalesOrder.objects.values("customer_id").annotate(
+        orders=Count("id"),
+        credit_orders=Count("id", filter=Q(payment_type="credit")),
+        purchases=Sum(Round("total_amount", 2), default=Decimal("0")),
+        paid=Sum(Round("amount_paid", 2), default=Decimal("0")),
+    ).order_by():
+        account = accounts.get(row["customer_id"])
+        if account is None:
+            continue
+        account.order_count = row["orders"]
+        account.credit_order_count = row["credit_orders"]
+        account.total_purchases = Decimal(row["purchases"]).quantize(Decimal("0.01"))
+        account.total_paid = Decimal(row["paid"]).quantize(Decimal("0.01"))
+    CustomerAccount.objects.bulk_update(
+        accounts.values(), ["order_count", "credit_order_count", "total_purchases", "total_paid"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app_sales", "0022_customer_account"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customeraccount",
+            name="credit_order_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="customeraccount",
+            name="order_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="customeraccount",
+            name="total_paid",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name="customeraccount",
+            name="total_purchases",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
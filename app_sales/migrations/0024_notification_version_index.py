@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_sales', '0023_customer_account_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ordernotification',
+            index=models.Index(fields=['customer', 'updated_at'], name='app_sales_o_custome_d554ab_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_sales', '0024_notification_version_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesWeekVersion',
+            fields=[
+                ('week', models.DateField(primary_key=True, serialize=False)),
+                ('version', models.IntegerField(default=1)),
+            ],
+            options={
+                'verbose_name': 'Sales Week Version',
+                'verbose_name_plural': 'Sales Week Versions',
+            },
+        ),
+    ]
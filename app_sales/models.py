@@ -1,10 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from app_inventory.models import LumberProduct
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from core import business_dates
 
 User = get_user_model()
 
@@ -63,14 +65,48 @@ class SalesOrder(models.Model):
     created_by = models.ForeignKey('core.CustomUser', on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Calendar date at the yard when created (see core.business_dates)
+    business_date = models.DateField(default=business_dates.business_date, editable=False, db_index=True)
     
     class Meta:
         ordering = ['-created_at']
         indexes = [models.Index(fields=['so_number']), models.Index(fields=['-created_at'])]
     
+    # Fields whose last loaded/saved value is remembered so signals can react to real changes
+    TRACKED_FIELDS = ('is_confirmed', 'customer_id', 'payment_type', 'total_amount', 'amount_paid', 'balance')
+    _saved_values = {}
+    
     def __str__(self):
         return f"{self.so_number} - {self.customer.name}"
     
+    @classmethod
+    def payment_label(cls, payment_type):
+        """Display name of a payment_type value, e.g. from .values() rows in reports"""
+        return dict(cls.PAYMENT_CHOICES).get(payment_type, payment_type)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked_fields()
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # The customer's ledger (post_save) moves in the same transaction as the order;
+        # no savepoint, so a save inside a caller's transaction stays one query
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+        self._remember_tracked_fields()
+    
+    def _remember_tracked_fields(self):
+        # Deferred fields are not in __dict__ and are not tracked
+        self._saved_values = {
+            field: self.__dict__[field] for field in self.TRACKED_FIELDS if field in self.__dict__
+        }
+    
+    def field_changed(self, field):
+        """Whether a tracked field differs from its value when last loaded or saved"""
+        return field in self._saved_values and self._saved_values[field] != getattr(self, field)
+    
     def calculate_total(self):
         """Calculate total from line items"""
         total = sum(item.subtotal for item in self.sales_order_items.all())
@@ -115,8 +151,13 @@ class Receipt(models.Model):
     amount_tendered = models.DecimalField(max_digits=12, decimal_places=2)
     change = models.DecimalField(max_digits=12, decimal_places=2)
     
+    # Shift of the cashier who took the payment (None when no shift was open)
+    shift = models.ForeignKey('CashierShift', on_delete=models.SET_NULL, null=True, blank=True, related_name='receipts')
+    
     created_by = models.ForeignKey('core.CustomUser', on_delete=models.SET_NULL, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Calendar date at the yard when created (see core.business_dates)
+    business_date = models.DateField(default=business_dates.business_date, editable=False, db_index=True)
     
     class Meta:
         ordering = ['-created_at']
@@ -125,6 +166,229 @@ class Receipt(models.Model):
         return f"{self.receipt_number} - {self.sales_order.so_number}"
 
 
+class CashierShift(models.Model):
+    """
+    A cashier's shift at the cash drawer
+    
+    Opened with a float and closed with the counted cash. The cash totals are
+    kept as running counters, incremented by CashierShifts.record_receipt()
+    on every payment, so the expected drawer amount and the variance are
+    known at close without aggregating receipts.
+    """
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('closed', 'Closed'),
+    ]
+    
+    cashier = models.ForeignKey('core.CustomUser', on_delete=models.PROTECT, related_name='cashier_shifts')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
+    
+    opening_float = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    # Running totals of the shift's receipts
+    receipt_count = models.IntegerField(default=0)
+    total_tendered = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_change = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    net_cash = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    # Set when the shift is closed
+    counted_cash = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    variance = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    notes = models.TextField(blank=True)
+    closed_by = models.ForeignKey('core.CustomUser', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
+    opened_at = models.DateTimeField(auto_now_add=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-opened_at']
+        indexes = [models.Index(fields=['cashier', '-opened_at'])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cashier'], condition=models.Q(status='open'), name='one_open_shift_per_cashier'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.cashier} shift {self.opened_at:%Y-%m-%d %H:%M} ({self.get_status_display()})"
+    
+    @property
+    def expected_cash(self):
+        """Cash that should be in the drawer: float plus cash taken minus change given"""
+        return self.opening_float + self.net_cash
+
+
+class ImmutableQuerySet(models.QuerySet):
+    """QuerySet that refuses bulk updates and deletes"""
+    
+    def update(self, **kwargs):
+        raise ValidationError(f'{self.model._meta.verbose_name_plural} cannot be changed')
+    
+    def delete(self):
+        raise ValidationError(f'{self.model._meta.verbose_name_plural} cannot be deleted')
+
+
+class DailySalesClose(models.Model):
+    """
+    End-of-day close (Z-report) of a business date
+    
+    Freezes the day's totals when the day is over; reports read closed days
+    from here instead of aggregating their orders again, so later edits to
+    the day's orders do not show in them. Rows are written once by
+    DailyClose.close_day() and never changed.
+    """
+    business_date = models.DateField(unique=True)
+    
+    # End of the closed day: every order of the day belongs to the close
+    closed_at = models.DateTimeField()
+    closed_by = models.ForeignKey('core.CustomUser', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
+    order_count = models.IntegerField(default=0)
+    receipt_count = models.IntegerField(default=0)
+    total_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_discount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    outstanding_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = ImmutableQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['-business_date']
+        verbose_name = 'Daily Sales Close'
+        verbose_name_plural = 'Daily Sales Closes'
+    
+    def __str__(self):
+        return f"Z-report {self.business_date}"
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError('A closed sales day cannot be changed')
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        raise ValidationError('A closed sales day cannot be deleted')
+
+
+class DailySalesCloseLine(models.Model):
+    """Frozen totals of a closed day for one payment type and cashier"""
+    close = models.ForeignKey(DailySalesClose, on_delete=models.PROTECT, related_name='lines')
+    payment_type = models.CharField(max_length=20, choices=SalesOrder.PAYMENT_CHOICES)
+    cashier = models.ForeignKey('core.CustomUser', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
+    order_count = models.IntegerField(default=0)
+    total_sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_discount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    outstanding_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    objects = ImmutableQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['close', 'payment_type']
+        verbose_name = 'Daily Sales Close Line'
+        verbose_name_plural = 'Daily Sales Close Lines'
+    
+    def __str__(self):
+        return f"{self.close} - {self.get_payment_type_display()}"
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError('A closed sales day cannot be changed')
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        raise ValidationError('A closed sales day cannot be deleted')
+
+
+class SalesFact(models.Model):
+    """
+    Sales rollup of one business date, customer and product
+    
+    Product rows hold the line item totals of the customer's orders of the
+    day for that product; the row without a product holds the orders'
+    totals (order count and order amount). Rows are written by
+    app_sales.cube.SalesCube, which re-aggregates a (date, customer) slice
+    whenever one of its orders changes, so product, category and customer
+    reports read a few rows per day instead of every line item.
+    """
+    business_date = models.DateField()
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='+')
+    product = models.ForeignKey(LumberProduct, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    # Category of the product when the row was written
+    category = models.ForeignKey('app_inventory.LumberCategory', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    
+    order_count = models.IntegerField(default=0)
+    line_count = models.IntegerField(default=0)
+    quantity_pieces = models.IntegerField(default=0)
+    board_feet = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Line subtotals on product rows, order total_amount on the order row
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Sum of line unit prices, for the average unit price
+    unit_price_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['-business_date']
+        verbose_name = 'Sales Fact'
+        verbose_name_plural = 'Sales Facts'
+        indexes = [
+            models.Index(fields=['business_date', 'product']),
+            models.Index(fields=['business_date', 'customer']),
+        ]
+    
+    def __str__(self):
+        return f"{self.business_date} {self.customer_id} {self.product_id or 'orders'}"
+
+
+class SalesWeekVersion(models.Model):
+    """
+    Change counter of a business week
+    
+    Bumped by app_sales.cube.SalesCube.refresh() whenever an order or line of
+    the week changes; the cached heatmap cells of a closed week are keyed by
+    it, so every process stops reading them at once.
+    """
+    # Monday of the week
+    week = models.DateField(primary_key=True)
+    version = models.IntegerField(default=1)
+    
+    class Meta:
+        verbose_name = 'Sales Week Version'
+        verbose_name_plural = 'Sales Week Versions'
+    
+    def __str__(self):
+        return f"{self.week} v{self.version}"
+
+
+class CustomerAccount(models.Model):
+    """
+    Running account of a customer: order counters and receivables ledger
+    
+    Moved by app_sales.receivables.Receivables with F() deltas in the same
+    transaction as every order save, payment and delete, so balances,
+    statements and the customer pages read one row per customer instead of
+    summing their orders.
+    """
+    customer = models.OneToOneField(Customer, on_delete=models.CASCADE, primary_key=True, related_name='account')
+    order_count = models.IntegerField(default=0)
+    credit_order_count = models.IntegerField(default=0)
+    # Sum of the orders' total_amount / amount_paid
+    total_purchases = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Sum of the balances of all orders / of credit (SOA) orders
+    outstanding_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    credit_balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Customer Account'
+        verbose_name_plural = 'Customer Accounts'
+    
+    def __str__(self):
+        return f"{self.customer_id}: {self.outstanding_balance}"
+
+
 class ShoppingCart(models.Model):
     """Shopping cart for customers"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='shopping_cart')
@@ -199,19 +463,64 @@ def create_shopping_cart(sender, instance, created, **kwargs):
 @receiver(post_save, sender=SalesOrder)
 def notify_customer_on_order_confirmation(sender, instance, created, **kwargs):
     """Notify customer when order is confirmed by admin"""
-    # Check if order is confirmed and this is not a new order
-    if not created and instance.is_confirmed:
-        # Check if confirmation exists and hasn't been notified yet
-        try:
-            from app_sales.notification_models import OrderConfirmation
-            confirmation = instance.confirmation
-            # Only notify if confirmation is still in created or confirmed status (not already ready)
-            if confirmation.status in ['created', 'confirmed']:
-                confirmation.mark_ready_for_pickup()
-        except OrderConfirmation.DoesNotExist:
-            # Order has no confirmation record yet - this shouldn't happen but handle gracefully
-            pass
-        except Exception as e:
-            # Fail silently to avoid blocking the order save
-            # But log for debugging if needed
-            pass
+    # Only react when is_confirmed flips False -> True; routine saves cost no queries
+    if created or not instance.is_confirmed or not instance.field_changed('is_confirmed'):
+        return
+    
+    from app_sales.notification_models import OrderConfirmation
+    try:
+        confirmation = OrderConfirmation.objects.get(sales_order=instance)
+    except OrderConfirmation.DoesNotExist:
+        # Order has no confirmation record yet (e.g. POS orders confirmed during creation)
+        return
+    
+    # Only notify if confirmation is still in created or confirmed status (not already ready)
+    if confirmation.status in ['created', 'confirmed']:
+        confirmation.mark_ready_for_pickup()
+
+
+# Signals to keep the customer's account in step with its orders
+@receiver(post_save, sender=SalesOrder)
+def post_order_to_customer_account(sender, instance, created, update_fields=None, **kwargs):
+    """Move the customer's account by the change in the order's amounts"""
+    from app_sales.receivables import Receivables
+    Receivables.post_order(instance, created, update_fields)
+
+
+@receiver(post_delete, sender=SalesOrder)
+def remove_order_from_customer_account(sender, instance, **kwargs):
+    """Take a deleted order off the customer's account"""
+    from app_sales.receivables import Receivables
+    Receivables.remove_order(instance)
+
+
+# Signals to keep the sales cube (app_sales.cube) in step with orders and their items
+@receiver(post_save, sender=SalesOrder)
+def refresh_cube_on_order_save(sender, instance, created, **kwargs):
+    """Re-aggregate the order's cube slice when the order is new or a field the cube reads changed"""
+    if not created and not instance.field_changed('customer_id') and not instance.field_changed('total_amount'):
+        return
+    from app_sales.cube import SalesCube
+    if instance.field_changed('customer_id'):
+        SalesCube.refresh(instance.business_date, instance._saved_values['customer_id'])
+    SalesCube.record_order(instance)
+
+
+@receiver(post_delete, sender=SalesOrder)
+def refresh_cube_on_order_delete(sender, instance, **kwargs):
+    """Drop a deleted order from the cube"""
+    from app_sales.cube import SalesCube
+    SalesCube.record_order(instance)
+
+
+@receiver(post_save, sender=SalesOrderItem)
+@receiver(post_delete, sender=SalesOrderItem)
+def refresh_cube_on_item_change(sender, instance, **kwargs):
+    """Re-aggregate the cube slice of a line's order"""
+    from app_sales.cube import SalesCube
+    try:
+        order = instance.sales_order
+    except SalesOrder.DoesNotExist:
+        # Deleted along with its order, whose own signal refreshes the slice
+        return
+    SalesCube.record_order(order)
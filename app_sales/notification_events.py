@@ -0,0 +1,94 @@
+"""
+Change feed of customer notifications for the long-poll endpoint
+
+A customer's version is the latest updated_at of its notifications, one
+read of the (customer, updated_at) index. Creating a notification or
+marking it read moves it, whichever process (web workers,
+run_task_worker, send_outbound_messages) does so, whatever the cache
+backend.
+
+Holding a request open only pays off on a server with spare threads or an
+async worker: under sync WSGI a waiting request blocks its whole worker.
+settings.NOTIFICATION_LONG_POLL_WAITERS is the number of requests a process
+may hold (default 0); without a free slot wait() returns at once and the
+client polls every BUSY_RETRY_SECONDS (see notification_views). Waiters
+re-read the version every POLL_INTERVAL seconds; publish() wakes only the
+waiters of the customers it names.
+"""
+import threading
+import time
+from django.conf import settings
+from django.db.models import Max
+from app_sales.notification_models import OrderNotification
+
+
+class NotificationEvents:
+    """Database-backed change feed of OrderNotifications per customer"""
+
+    # Changes from other processes are picked up within this many seconds
+    POLL_INTERVAL = 5.0
+
+    _lock = threading.Lock()
+    # customer_id -> [Condition, number of waiters]
+    _waiters = {}
+    _waiting = 0
+
+    @staticmethod
+    def max_waiters():
+        """Requests this process may hold open at once"""
+        return getattr(settings, 'NOTIFICATION_LONG_POLL_WAITERS', 0)
+
+    @staticmethod
+    def publish(*customer_ids):
+        """Wake this process's waiters of customers whose notifications changed"""
+        with NotificationEvents._lock:
+            for customer_id in customer_ids:
+                waiters = NotificationEvents._waiters.get(customer_id)
+                if waiters:
+                    waiters[0].notify_all()
+
+    @staticmethod
+    def version(customer_id):
+        """Opaque version of a customer's notifications; moves when one is created or updated"""
+        updated_at = OrderNotification.objects.filter(customer_id=customer_id).aggregate(
+            updated_at=Max('updated_at')
+        )['updated_at']
+        return f"{updated_at.timestamp():f}" if updated_at else '0'
+
+    @staticmethod
+    def wait(customer_id, last_version, timeout):
+        """
+        Wait until the customer's version differs from last_version
+
+        Args:
+            customer_id: Customer to watch
+            last_version: Version the caller has already seen
+            timeout: Maximum seconds to wait
+
+        Returns:
+            The current version (equal to last_version on timeout), or None
+            without waiting when max_waiters() requests are already waiting
+        """
+        with NotificationEvents._lock:
+            if NotificationEvents._waiting >= NotificationEvents.max_waiters():
+                return None
+            NotificationEvents._waiting += 1
+            waiters = NotificationEvents._waiters.setdefault(
+                customer_id, [threading.Condition(NotificationEvents._lock), 0]
+            )
+            waiters[1] += 1
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                current = NotificationEvents.version(customer_id)
+                remaining = deadline - time.monotonic()
+                if current != last_version or remaining <= 0:
+                    return current
+                with NotificationEvents._lock:
+                    waiters[0].wait(min(remaining, NotificationEvents.POLL_INTERVAL))
+        finally:
+            with NotificationEvents._lock:
+                NotificationEvents._waiting -= 1
+                waiters[1] -= 1
+                if not waiters[1]:
+                    del NotificationEvents._waiters[customer_id]
@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
 from app_sales.models import SalesOrder, Customer
 from django.contrib.auth import get_user_model
 
@@ -36,6 +39,8 @@ class OrderNotification(models.Model):
             models.Index(fields=['customer', '-created_at']),
             models.Index(fields=['is_read', '-created_at']),
             models.Index(fields=['notification_type', '-created_at']),
+            # NotificationEvents.version()
+            models.Index(fields=['customer', 'updated_at']),
         ]
     
     def __str__(self):
@@ -96,32 +101,62 @@ class OrderConfirmation(models.Model):
     def __str__(self):
         return f"{self.sales_order.so_number} - {self.get_status_display()}"
     
+    def release_pickup_slot(self):
+        """Free this order's preparation load in the pickup schedule"""
+        from app_sales.scheduling import PickupScheduler
+        if self.status in PickupScheduler.QUEUE_STATUSES and self.estimated_pickup_date:
+            PickupScheduler.release(
+                self.estimated_pickup_date, PickupScheduler.order_board_feet(self.sales_order_id)
+            )
+    
+    def ready_notification(self):
+        """Unsaved 'ready for pickup' notification for this order"""
+        return OrderNotification(
+            sales_order=self.sales_order,
+            customer=self.customer,
+            notification_type='ready_for_pickup',
+            title=f"Your Order {self.sales_order.so_number} is Ready for Pickup!",
+            message=f"Good news! Your order {self.sales_order.so_number} is now ready for pickup. "
+                   f"Please come to our store to collect your order. "
+                   f"Payment status: {'Completed' if self.is_payment_complete else 'Due on pickup'}"
+        )
+    
+    def picked_up_notification(self):
+        """Unsaved 'picked up' notification for this order"""
+        return OrderNotification(
+            sales_order=self.sales_order,
+            customer=self.customer,
+            notification_type='order_confirmed',
+            title=f"Order {self.sales_order.so_number} Picked Up",
+            message=f"Thank you! Your order {self.sales_order.so_number} has been picked up. "
+                   f"We appreciate your business!"
+        )
+    
     def confirm_order(self, estimated_pickup_date=None):
         """Confirm the order is ready"""
         from django.utils import timezone
+        from app_sales.scheduling import PickupScheduler
         self.status = 'confirmed'
         self.confirmed_at = timezone.now()
-        if estimated_pickup_date:
+        if estimated_pickup_date and estimated_pickup_date != self.estimated_pickup_date:
+            # Admin override: move the order's load to the new day
+            PickupScheduler.move(
+                self.estimated_pickup_date, estimated_pickup_date,
+                PickupScheduler.order_board_feet(self.sales_order_id)
+            )
             self.estimated_pickup_date = estimated_pickup_date
         self.save()
     
     def mark_ready_for_pickup(self):
         """Mark order as ready for pickup and create notification"""
         from django.utils import timezone
+        self.release_pickup_slot()
         self.status = 'ready_for_pickup'
         self.ready_at = timezone.now()
         self.save()
         
         # Create notification for customer
-        OrderNotification.objects.create(
-            sales_order=self.sales_order,
-            customer=self.customer,
-            notification_type='ready_for_pickup',
-            title=f"Your Order {self.sales_order.so_number} is Ready for Pickup!",
-            message=f"Good news! Your order {self.sales_order.so_number} is now ready for pickup. "
-                   f"Please come to our store to collect your order. "
-                   f"Payment status: {'Completed' if self.is_payment_complete else 'Due on pickup'}"
-        )
+        self.ready_notification().save()
 
         # Create Delivery record (Move to Delivery Queue) using delivery service
         try:
@@ -154,6 +189,7 @@ class OrderConfirmation(models.Model):
     def mark_picked_up(self):
         """Mark order as picked up by customer"""
         from django.utils import timezone
+        self.release_pickup_slot()
         self.status = 'picked_up'
         self.picked_up_at = timezone.now()
         self.save()
@@ -164,6 +200,120 @@ class OrderConfirmation(models.Model):
             delivery = Delivery.objects.get(sales_order=self.sales_order)
             delivery.status = 'delivered'
             delivery.delivered_at = timezone.now()
+            delivery.status_changed_at = delivery.delivered_at
             delivery.save()
         except Exception:
             pass
+
+
+class PickupSlot(models.Model):
+    """Preparation load booked on a pickup day - one row per day, maintained incrementally"""
+    
+    date = models.DateField(unique=True)
+    
+    # Orders in the created/confirmed queue scheduled for this day
+    order_count = models.PositiveIntegerField(default=0)
+    board_feet = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    # Per-day overrides of the yard capacity (e.g. 0 for holidays); blank uses the default
+    order_capacity = models.PositiveIntegerField(null=True, blank=True)
+    board_feet_capacity = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['date']
+    
+    def __str__(self):
+        return f"{self.date} - {self.order_count} orders, {self.board_feet} BF"
+
+
+class OrderNotificationArchive(models.Model):
+    """Read notifications moved out of OrderNotification by the retention command"""
+    
+    # ID the notification had in OrderNotification
+    original_id = models.BigIntegerField(unique=True)
+    
+    sales_order = models.ForeignKey(SalesOrder, on_delete=models.CASCADE, related_name='archived_notifications')
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='archived_notifications')
+    
+    notification_type = models.CharField(max_length=30, choices=OrderNotification.NOTIFICATION_TYPES)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    
+    created_at = models.DateTimeField()
+    read_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_notification_type_display()} - {self.customer_id} (archived)"
+
+
+class OutboundMessage(models.Model):
+    """Email/SMS copy of an OrderNotification waiting to be sent by the outbox worker"""
+    
+    CHANNEL_CHOICES = [
+        ('email', 'Email'),
+        ('sms', 'SMS'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    notification = models.ForeignKey(OrderNotification, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbound_messages')
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='outbound_messages')
+    
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(max_length=254)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'channel', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_channel_display()} to {self.recipient} - {self.get_status_display()}"
+
+
+@receiver(pre_delete, sender=OrderConfirmation)
+def release_deleted_pickup_slot(sender, instance, **kwargs):
+    """Free the pickup load of a queued order on every delete path (API, admin, cascade from its order)"""
+    instance.release_pickup_slot()
+
+
+@receiver(post_save, sender=OrderNotification)
+def publish_notification_change(sender, instance, **kwargs):
+    """Wake long-polls of this process waiting on the customer once the change is committed"""
+    from app_sales.notification_events import NotificationEvents
+    customer_id = instance.customer_id
+    transaction.on_commit(lambda: NotificationEvents.publish(customer_id))
+
+
+@receiver(post_save, sender=OrderNotification)
+def queue_outbound_messages(sender, instance, created, **kwargs):
+    """Queue email/SMS copies of new notifications for the outbox worker"""
+    if created:
+        from app_sales.outbox import Outbox
+        Outbox.enqueue([instance])
@@ -10,6 +10,7 @@ urlpatterns = [
     path('notifications/mark-all-read/', notification_views.mark_all_notifications_read, name='mark-all-notifications-read'),
     path('notifications/<int:notification_id>/mark-read/', notification_views.mark_notification_read, name='mark-notification-read'),
     path('notifications/badge-count/', notification_views.notification_badge_count, name='notification-badge-count'),
+    path('notifications/updates/', notification_views.notification_updates, name='notification-updates'),
     
     # Ready orders views
     path('ready-orders/', notification_views.customer_ready_orders, name='ready-orders'),
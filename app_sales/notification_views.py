@@ -3,11 +3,18 @@ Views for customer order notifications and status tracking
 """
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST
 from app_sales.models import Customer as SalesCustomer
 from app_sales.notification_models import OrderNotification, OrderConfirmation
 from app_sales.services import OrderConfirmationService
+from app_sales.notification_events import NotificationEvents
+
+# A held long-poll waits at most this long; when the server cannot hold it
+# (NOTIFICATION_LONG_POLL_WAITERS), the client comes back after BUSY_RETRY_SECONDS
+LONG_POLL_SECONDS = 20
+BUSY_RETRY_SECONDS = 10
 
 
 @login_required
@@ -88,15 +95,16 @@ def customer_dashboard(request):
                 'pending_payment': [],
             }
         else:
-            from django.db.models import Sum
             from app_sales.models import SalesOrder
+            from app_sales.receivables import Receivables
             
             # Get all customer orders
             customer_orders = SalesOrder.objects.filter(customer=customer)
             
-            # Calculate totals
-            order_count = customer_orders.count()
-            total_spent = customer_orders.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
+            # Totals from the customer's running account
+            account = Receivables.account(customer)
+            order_count = account.order_count
+            total_spent = account.total_purchases
             
             # Get recent orders for display
             recent_orders = customer_orders.order_by('-created_at')[:10]
@@ -177,14 +185,7 @@ def mark_all_notifications_read(request):
         if not customer:
             return JsonResponse({'count': 0})
         
-        unread = OrderNotification.objects.filter(
-            customer=customer,
-            is_read=False
-        )
-        count = unread.count()
-        
-        for notif in unread:
-            notif.mark_as_read()
+        count = OrderConfirmationService.mark_all_notifications_read(customer.id)
         
         return JsonResponse({
             'success': True,
@@ -286,3 +287,50 @@ def notification_badge_count(request):
         })
     except Exception as e:
         return JsonResponse({'count': 0, 'error': str(e)})
+
+
+def notification_updates(request):
+    """
+    Long-poll for the unread count and new notifications
+    
+    Replaces polling notification_badge_count. The client sends the version
+    and last notification id of its previous answer. When this process can
+    hold the request (NotificationEvents.max_waiters()), it waits up to
+    LONG_POLL_SECONDS for the customer's notifications to change and the
+    client comes straight back; otherwise it answers at once and sets
+    poll_after to BUSY_RETRY_SECONDS.
+    
+    Query params:
+        version: Version from the previous answer (none: answer immediately)
+        after_id: Last notification ID the client has seen
+    """
+    # 204 tells the client to stop polling
+    if not request.user.is_authenticated:
+        return HttpResponse(status=204)
+    
+    from app_sales.services import SalesService
+    customer = SalesService.get_customer_for_user(request.user)
+    if not customer:
+        return HttpResponse(status=204)
+    
+    try:
+        after_id = int(request.GET['after_id']) if request.GET.get('after_id') else None
+    except ValueError:
+        return JsonResponse({'error': 'after_id must be an integer'}, status=400)
+    
+    last_version = request.GET.get('version')
+    version = NotificationEvents.wait(customer.id, last_version, LONG_POLL_SECONDS) if last_version else None
+    if version is not None or (not last_version and NotificationEvents.max_waiters()):
+        poll_after = 0
+    else:
+        poll_after = BUSY_RETRY_SECONDS
+    if version is None:
+        version = NotificationEvents.version(customer.id)
+    
+    if version == last_version:
+        return JsonResponse({'changed': False, 'version': version, 'poll_after': poll_after})
+    
+    update = OrderConfirmationService.get_notification_updates(customer.id, after_id)
+    return JsonResponse(
+        {'changed': True, 'version': version, 'poll_after': poll_after, **update}, encoder=DjangoJSONEncoder
+    )
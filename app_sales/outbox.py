@@ -0,0 +1,245 @@
+"""
+Outbox for customer email/SMS messages
+
+OrderNotification rows are copied into OutboundMessage when they are
+created; request handlers only insert rows. The send_outbound_messages
+worker drains the outbox per channel in batches, sends each batch over a
+few parallel connections and retries failures with exponential backoff.
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from app_sales.notification_models import OutboundMessage
+
+
+class EmailAdapter:
+    """Send emails through Django's EMAIL_BACKEND, reusing one connection per batch"""
+
+    def send_batch(self, messages):
+        """
+        Send a batch of messages
+
+        Returns:
+            Dict mapping message ID -> error string, or None when sent
+        """
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as exc:
+            return {message.id: str(exc) for message in messages}
+
+        results = {}
+        try:
+            for message in messages:
+                try:
+                    EmailMessage(
+                        subject=message.subject,
+                        body=message.body,
+                        from_email=settings.DEFAULT_FROM_EMAIL,
+                        to=[message.recipient],
+                        connection=connection,
+                    ).send()
+                    results[message.id] = None
+                except Exception as exc:
+                    results[message.id] = str(exc)
+        finally:
+            connection.close()
+        return results
+
+
+class ConsoleSmsAdapter:
+    """Stand-in SMS gateway that prints messages instead of sending them"""
+
+    stream = None  # defaults to stdout
+
+    def send_batch(self, messages):
+        stream = self.stream or sys.stdout
+        for message in messages:
+            stream.write(f"SMS to {message.recipient}: {message.body}\n")
+        stream.flush()
+        return dict.fromkeys(message.id for message in messages)
+
+
+class Outbox:
+    """Queue and deliver email/SMS copies of customer notifications"""
+
+    # Notification type -> channels it goes out on
+    CHANNELS_BY_TYPE = {
+        'order_confirmed': ('email',),
+        'ready_for_pickup': ('email', 'sms'),
+        'payment_pending': ('email', 'sms'),
+        'payment_completed': ('email',),
+        'order_cancelled': ('email', 'sms'),
+        'order_delayed': ('email', 'sms'),
+    }
+
+    # Parallel connections per channel (SMTP sessions, SMS gateway rate limit)
+    CONCURRENCY = {'email': 4, 'sms': 2}
+    BATCH_SIZE = 100
+
+    # Retries back off 1, 2, 4, 8 minutes before a message is given up
+    MAX_ATTEMPTS = 5
+    RETRY_BASE_SECONDS = 60
+
+    # Messages claimed by a worker that died are handed out again after this long
+    CLAIM_TIMEOUT = timedelta(minutes=10)
+
+    SMS_MAX_LENGTH = 160
+
+    @staticmethod
+    def enqueue(notifications):
+        """
+        Queue outbound messages for newly created notifications
+
+        Args:
+            notifications: OrderNotification instances (saved)
+
+        Returns:
+            int: Number of messages queued
+        """
+        messages = []
+        for notification in notifications:
+            customer = notification.customer
+            for channel in Outbox.CHANNELS_BY_TYPE.get(notification.notification_type, ()):
+                if channel == 'email':
+                    recipient, subject, body = customer.email, notification.title, notification.message
+                else:
+                    recipient, subject = customer.phone_number, ''
+                    body = f"{notification.title} {notification.message}"[:Outbox.SMS_MAX_LENGTH]
+                if not recipient:
+                    continue
+                messages.append(OutboundMessage(
+                    notification=notification,
+                    customer=customer,
+                    channel=channel,
+                    recipient=recipient,
+                    subject=subject,
+                    body=body,
+                ))
+
+        if messages:
+            OutboundMessage.objects.bulk_create(messages)
+        return len(messages)
+
+    @staticmethod
+    def get_adapter(channel):
+        """Adapter instance for a channel, from settings.OUTBOX_ADAPTERS"""
+        adapters = getattr(settings, 'OUTBOX_ADAPTERS', {})
+        return import_string(adapters[channel])()
+
+    @staticmethod
+    def requeue_stale():
+        """Release messages whose worker never reported back"""
+        return OutboundMessage.objects.filter(
+            status='sending', claimed_at__lt=timezone.now() - Outbox.CLAIM_TIMEOUT
+        ).update(status='pending', claimed_at=None)
+
+    @staticmethod
+    @transaction.atomic
+    def claim(channel, batch_size=None):
+        """
+        Claim a batch of due messages of a channel for this worker
+
+        Returns:
+            List of OutboundMessage now in 'sending' status
+        """
+        now = timezone.now()
+        ids = list(
+            OutboundMessage.objects.select_for_update(skip_locked=True).filter(
+                channel=channel, status='pending', next_attempt_at__lte=now
+            ).order_by('id').values_list('id', flat=True)[:batch_size or Outbox.BATCH_SIZE]
+        )
+        if not ids:
+            return []
+
+        # Guarded on status so two workers never claim the same message
+        OutboundMessage.objects.filter(id__in=ids, status='pending').update(status='sending', claimed_at=now)
+        return list(OutboundMessage.objects.filter(id__in=ids, status='sending', claimed_at=now))
+
+    @staticmethod
+    def _send_chunk(adapter, chunk):
+        try:
+            return adapter.send_batch(chunk)
+        except Exception as exc:
+            return {message.id: str(exc) for message in chunk}
+
+    @staticmethod
+    def send(channel, messages):
+        """
+        Send claimed messages over up to CONCURRENCY[channel] parallel connections
+
+        Returns:
+            Dict mapping message ID -> error string, or None when sent
+        """
+        adapter = Outbox.get_adapter(channel)
+        workers = max(1, min(Outbox.CONCURRENCY.get(channel, 1), len(messages)))
+        chunks = [messages[offset::workers] for offset in range(workers)]
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for outcome in pool.map(lambda chunk: Outbox._send_chunk(adapter, chunk), chunks):
+                results.update(outcome)
+        return results
+
+    @staticmethod
+    def record(messages, results):
+        """
+        Save send outcomes with one bulk update
+
+        Returns:
+            Dict with sent/retried/failed counts
+        """
+        now = timezone.now()
+        counts = {'sent': 0, 'retried': 0, 'failed': 0}
+        for message in messages:
+            error = results.get(message.id, 'No result from adapter')
+            message.attempts += 1
+            message.claimed_at = None
+            if error is None:
+                message.status = 'sent'
+                message.sent_at = now
+                message.last_error = ''
+                counts['sent'] += 1
+            elif message.attempts >= Outbox.MAX_ATTEMPTS:
+                message.status = 'failed'
+                message.last_error = error
+                counts['failed'] += 1
+            else:
+                message.status = 'pending'
+                message.next_attempt_at = now + timedelta(
+                    seconds=Outbox.RETRY_BASE_SECONDS * 2 ** (message.attempts - 1)
+                )
+                message.last_error = error
+                counts['retried'] += 1
+
+        OutboundMessage.objects.bulk_update(
+            messages, ['status', 'attempts', 'claimed_at', 'sent_at', 'next_attempt_at', 'last_error']
+        )
+        return counts
+
+    @staticmethod
+    def process(channels=None, batch_size=None):
+        """
+        Send one batch per channel
+
+        Args:
+            channels: Channels to drain (default: all)
+            batch_size: Messages per batch (default: BATCH_SIZE)
+
+        Returns:
+            Dict mapping channel -> sent/retried/failed counts
+        """
+        Outbox.requeue_stale()
+        summary = {}
+        for channel in channels or [choice for choice, _ in OutboundMessage.CHANNEL_CHOICES]:
+            messages = Outbox.claim(channel, batch_size)
+            if messages:
+                summary[channel] = Outbox.record(messages, Outbox.send(channel, messages))
+            else:
+                summary[channel] = {'sent': 0, 'retried': 0, 'failed': 0}
+        return summary
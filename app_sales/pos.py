@@ -5,13 +5,15 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count
-from django.utils import timezone
-from datetime import timedelta
+from django.core.exceptions import ValidationError
+from datetime import datetime, timedelta
 from decimal import Decimal
-from app_sales.models import Customer, SalesOrder, SalesOrderItem, Receipt
+from app_sales.models import Customer, SalesOrder, SalesOrderItem
 from app_sales.serializers import CustomerSerializer, SalesOrderSerializer, ReceiptSerializer
 from app_sales.services import SalesService
+from app_sales.closing import DailyClose
+from app_sales.shifts import CashierShifts
+from core import business_dates
 from app_inventory.models import LumberProduct
 
 
@@ -117,21 +119,18 @@ class POSViewSet(viewsets.ViewSet):
             amount_tendered_decimal = Decimal(str(amount_tendered)).quantize(Decimal('0.01'))
             amount_to_pay = min(order_total, amount_tendered_decimal)
             
-            # Process payment
+            # Process payment; the receipt records the tendered amount and change
             so, receipt = SalesService.process_payment(
                 sales_order_id=so.id,
                 amount_paid=amount_to_pay,
-                created_by=request.user
+                created_by=request.user,
+                amount_tendered=amount_tendered_decimal
             )
             
-            # Update receipt with actual tendered amount if different
-            if Decimal(str(amount_tendered)) > amount_to_pay:
-                receipt.amount_tendered = Decimal(str(amount_tendered))
-                receipt.change = receipt.amount_tendered - order_total
+            if amount_tendered_decimal > amount_to_pay:
                 # Update sales order amount_paid to reflect full tendered amount
                 so.amount_paid = receipt.amount_tendered
                 so.balance = Decimal('0')  # Fully paid
-                receipt.save()
                 so.save()
 
             # Auto-mark as Picked Up for POS transactions (Walk-in)
@@ -168,39 +167,141 @@ class POSViewSet(viewsets.ViewSet):
     
     @action(detail=False, methods=['get'])
     def daily_report(self, request):
-        """Get daily POS report"""
-        today = timezone.now().date()
-        
-        sales_orders = SalesOrder.objects.filter(created_at__date=today)
-        receipts = Receipt.objects.filter(created_at__date=today)
+        """
+        Get daily POS report (today, or ?date=YYYY-MM-DD)
         
-        payment_summary = sales_orders.values('payment_type').annotate(
-            count=Count('id'),
-            total_amount=Sum('total_amount'),
-            total_discount=Sum('discount_amount'),
-            total_paid=Sum('amount_paid')
-        )
+        Closed days are read from their Z-report; the open day is computed live.
+        """
+        report_date = business_dates.business_date()
+        if request.query_params.get('date'):
+            try:
+                report_date = datetime.strptime(request.query_params['date'], '%Y-%m-%d').date()
+            except ValueError:
+                return Response({'error': 'date must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
         
-        total_sales = sales_orders.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0')
-        total_discount = sales_orders.aggregate(Sum('discount_amount'))['discount_amount__sum'] or Decimal('0')
-        total_paid = sales_orders.aggregate(Sum('amount_paid'))['amount_paid__sum'] or Decimal('0')
-        outstanding = sales_orders.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+        totals = DailyClose.period_totals(report_date, report_date)
         
         return Response({
-            'date': today,
+            'date': report_date,
+            'closed': totals['closed_days'] == 1,
             'transactions': {
-                'sales_orders': sales_orders.count(),
-                'receipts': receipts.count()
+                'sales_orders': totals['order_count'],
+                'receipts': totals['receipt_count']
             },
             'financial': {
-                'total_sales': float(total_sales),
-                'total_discount': float(total_discount),
-                'total_paid': float(total_paid),
-                'outstanding_balance': float(outstanding)
+                'total_sales': float(totals['total_sales']),
+                'total_discount': float(totals['total_discount']),
+                'total_paid': float(totals['total_paid']),
+                'outstanding_balance': float(totals['outstanding_balance'])
             },
-            'by_payment_type': list(payment_summary)
+            'by_payment_type': [{
+                'payment_type': line['payment_type'],
+                'count': line['order_count'],
+                'total_amount': float(line['total_sales']),
+                'total_discount': float(line['total_discount']),
+                'total_paid': float(line['total_paid'])
+            } for line in totals['by_payment_type']],
+            'by_cashier': [{
+                'cashier_id': line['cashier_id'],
+                'cashier': line['cashier'],
+                'count': line['order_count'],
+                'total_amount': float(line['total_sales']),
+                'total_paid': float(line['total_paid'])
+            } for line in totals['by_cashier']]
         })
     
+    @action(detail=False, methods=['post'])
+    def open_shift(self, request):
+        """
+        Open a cashier shift
+        
+        Expected payload:
+        {
+            "opening_float": 2000.00
+        }
+        """
+        try:
+            shift = CashierShifts.open_shift(request.user, request.data.get('opening_float', 0))
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(CashierShifts.summary(shift), status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['get'])
+    def current_shift(self, request):
+        """Running drawer totals of the cashier's open shift"""
+        shift = CashierShifts.current(request.user)
+        if shift is None:
+            return Response({'error': 'No open shift'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(CashierShifts.summary(shift))
+    
+    @action(detail=False, methods=['post'])
+    def close_shift(self, request):
+        """
+        Close the cashier's shift and show the drawer variance
+        
+        Expected payload:
+        {
+            "counted_cash": 5230.00,
+            "notes": "",
+            "shift_id": 3  (admins only, to close another cashier's shift)
+        }
+        """
+        counted_cash = request.data.get('counted_cash')
+        if counted_cash is None:
+            return Response({'error': 'counted_cash is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if request.data.get('shift_id') and request.user.is_admin():
+            shift_id = request.data['shift_id']
+        else:
+            shift = CashierShifts.current(request.user)
+            if shift is None:
+                return Response({'error': 'No open shift'}, status=status.HTTP_404_NOT_FOUND)
+            shift_id = shift.id
+        
+        try:
+            shift = CashierShifts.close_shift(
+                shift_id, counted_cash, closed_by=request.user, notes=request.data.get('notes', '')
+            )
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(CashierShifts.summary(shift))
+    
+    @action(detail=False, methods=['post'])
+    def close_day(self, request):
+        """
+        End-of-day close: freeze a finished day's totals into an immutable Z-report
+        
+        Expected payload (optional, default: yesterday):
+        {
+            "date": "2024-12-08"
+        }
+        """
+        if not (request.user.is_admin() or request.user.is_cashier()):
+            return Response({'error': 'Only cashiers and admins can close a sales day'},
+                           status=status.HTTP_403_FORBIDDEN)
+        
+        business_date = None
+        if request.data.get('date'):
+            try:
+                business_date = datetime.strptime(request.data['date'], '%Y-%m-%d').date()
+            except ValueError:
+                return Response({'error': 'date must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            close = DailyClose.close_day(business_date, closed_by=request.user)
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'date': close.business_date,
+            'closed_at': close.closed_at,
+            'sales_orders': close.order_count,
+            'receipts': close.receipt_count,
+            'total_sales': float(close.total_sales),
+            'total_paid': float(close.total_paid),
+            'outstanding_balance': float(close.outstanding_balance)
+        }, status=status.HTTP_201_CREATED)
+    
     @action(detail=False, methods=['get'])
     def pending_payments(self, request):
         """Get sales orders pending payment"""
@@ -0,0 +1,292 @@
+"""
+Customer accounts and receivables: running ledger and aging
+
+CustomerAccount holds each customer's order counts, purchases, payments and
+outstanding and credit (SOA) balances. Every order save, payment and delete
+moves it by the change in the order's amounts with one F() UPDATE, in the
+order's transaction (see the SalesOrder signals), so balances, statements
+and account summaries read one row per customer.
+
+Aging splits the open credit orders of every customer into 0-30, 31-60,
+61-90 and 90+ day buckets by business date, with conditional sums in one
+grouped query instead of loading the orders.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, Min, Q, Sum, Value, When
+from django.db.models.functions import Round
+from django.utils import timezone
+from app_sales.models import Customer, CustomerAccount, SalesOrder
+from core import business_dates
+
+CENT = Decimal('0.01')
+
+# Order fields the ledger depends on: model field name -> attribute
+LEDGER_FIELDS = {
+    'customer': 'customer_id',
+    'payment_type': 'payment_type',
+    'total_amount': 'total_amount',
+    'amount_paid': 'amount_paid',
+    'balance': 'balance',
+}
+
+# An order's balance as posted: SQLite keeps unrounded decimals, the ledger cents
+BALANCE = Round('balance', 2)
+CREDIT = Q(payment_type='credit')
+
+# Ledger columns recomputed from the orders by rebuild()
+LEDGER_AGGREGATES = {
+    'order_count': Count('id'),
+    'credit_order_count': Count('id', filter=CREDIT),
+    'total_purchases': Sum(Round('total_amount', 2), default=Decimal('0')),
+    'total_paid': Sum(Round('amount_paid', 2), default=Decimal('0')),
+    'outstanding_balance': Sum(BALANCE, default=Decimal('0')),
+    'credit_balance': Sum(BALANCE, filter=CREDIT, default=Decimal('0')),
+}
+COUNTERS = ('order_count', 'credit_order_count')
+
+# (key, label, first day, last day) of the aging buckets
+BUCKETS = (
+    ('days_0_30', '0-30', 0, 30),
+    ('days_31_60', '31-60', 31, 60),
+    ('days_61_90', '61-90', 61, 90),
+    ('days_over_90', '90+', 91, None),
+)
+
+
+class Receivables:
+    """Maintain the customer ledger and report receivables"""
+
+    @staticmethod
+    def _cents(value):
+        # Rounded like the stored column, e.g. after apply_discount()
+        return Decimal(str(value or 0)).quantize(CENT)
+
+    @staticmethod
+    def _postings(values):
+        """Amounts an order with these field values adds to its customer's ledger"""
+        credit = values['payment_type'] == 'credit'
+        balance = Receivables._cents(values['balance'])
+        return {
+            'order_count': 1,
+            'credit_order_count': 1 if credit else 0,
+            'total_purchases': Receivables._cents(values['total_amount']),
+            'total_paid': Receivables._cents(values['amount_paid']),
+            'outstanding_balance': balance,
+            'credit_balance': balance if credit else Decimal('0'),
+        }
+
+    @staticmethod
+    def _apply(customer_id, changes, create=True):
+        """
+        Add amounts to a customer's ledger with one UPDATE
+
+        A customer without a ledger row yet gets one computed from its orders
+        (which already include the change); with create=False the change is
+        dropped instead.
+        """
+        changes = {field: amount for field, amount in changes.items() if amount}
+        if not changes:
+            return
+        updated = CustomerAccount.objects.filter(customer_id=customer_id).update(
+            updated_at=timezone.now(), **{field: F(field) + amount for field, amount in changes.items()}
+        )
+        if updated or not create:
+            return
+        try:
+            Receivables.rebuild([customer_id])
+        except IntegrityError:
+            # Created concurrently; recompute on top of it
+            Receivables.rebuild([customer_id])
+
+    @staticmethod
+    def post_order(order, created, update_fields=None):
+        """
+        Move the ledger by the change in an order since it was loaded
+
+        Args:
+            order: Saved SalesOrder
+            created: Whether the order was just inserted
+            update_fields: Fields written by save(update_fields=...), if limited
+        """
+        if update_fields is not None and not set(update_fields) & set(LEDGER_FIELDS):
+            return
+        saved = order._saved_values
+        if not created and any(attname not in saved for attname in LEDGER_FIELDS.values()):
+            # Loaded with deferred fields, so the previous amounts are unknown
+            Receivables.rebuild({order.customer_id, saved.get('customer_id', order.customer_id)})
+            return
+
+        current = {
+            attname: getattr(order, attname) if update_fields is None or name in update_fields else saved[attname]
+            for name, attname in LEDGER_FIELDS.items()
+        }
+        deltas = defaultdict(lambda: defaultdict(int))
+        for values, sign in ((None if created else saved, -1), (current, 1)):
+            if values is None:
+                continue
+            for field, amount in Receivables._postings(values).items():
+                deltas[values['customer_id']][field] += sign * amount
+        for customer_id, changes in deltas.items():
+            Receivables._apply(customer_id, changes)
+
+    @staticmethod
+    def remove_order(order):
+        """Take a deleted order off its customer's ledger"""
+        values = {attname: order._saved_values.get(attname, getattr(order, attname)) for attname in LEDGER_FIELDS.values()}
+        changes = {field: -amount for field, amount in Receivables._postings(values).items()}
+        # The ledger row may be going away with the customer (cascade): never recreate it
+        Receivables._apply(values['customer_id'], changes, create=False)
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(customer_ids=None):
+        """
+        Recompute ledger rows from the orders
+
+        Args:
+            customer_ids: Customers to recompute (default: all)
+
+        Returns:
+            Dict with the number of accounts and of rows that were corrected
+        """
+        orders = SalesOrder.objects.all()
+        accounts = CustomerAccount.objects.select_for_update()
+        if customer_ids is not None:
+            orders = orders.filter(customer_id__in=customer_ids)
+            accounts = accounts.filter(customer_id__in=customer_ids)
+
+        totals = {
+            row.pop('customer_id'): {
+                field: amount if field in COUNTERS else Receivables._cents(amount) for field, amount in row.items()
+            }
+            for row in orders.values('customer_id').annotate(**LEDGER_AGGREGATES).order_by()
+        }
+        existing = {account.customer_id: account for account in accounts}
+        stale = [customer_id for customer_id in existing if customer_id not in totals]
+        CustomerAccount.objects.filter(customer_id__in=stale).delete()
+
+        now = timezone.now()
+        changed = []
+        new = []
+        for customer_id, row in totals.items():
+            account = existing.get(customer_id)
+            if account is None:
+                new.append(CustomerAccount(customer_id=customer_id, **row))
+            elif any(getattr(account, field) != amount for field, amount in row.items()):
+                for field, amount in row.items():
+                    setattr(account, field, amount)
+                account.updated_at = now
+                changed.append(account)
+        CustomerAccount.objects.bulk_update(changed, [*LEDGER_AGGREGATES, 'updated_at'], batch_size=500)
+        CustomerAccount.objects.bulk_create(new, batch_size=500)
+
+        return {'accounts': len(totals), 'corrected': len(changed) + len(new) + len(stale)}
+
+    @staticmethod
+    def account(customer):
+        """A customer's account row; an empty, unsaved one for a customer without orders"""
+        try:
+            return customer.account
+        except CustomerAccount.DoesNotExist:
+            return CustomerAccount(customer=customer)
+
+    @staticmethod
+    def outstanding_credit():
+        """Total open credit (SOA) balance and number of customers owing it, from the ledger"""
+        totals = CustomerAccount.objects.filter(credit_balance__gt=0).aggregate(
+            total=Sum('credit_balance', default=Decimal('0')), customers=Count('customer')
+        )
+        return totals['total'], totals['customers']
+
+    @staticmethod
+    def aging(as_of=None, min_age=0, customer_id=None):
+        """
+        Open credit balances per customer in 0-30/31-60/61-90/90+ day buckets
+
+        Args:
+            as_of: Business date the ages are counted from (default: today)
+            min_age: Only orders at least this many days old
+            customer_id: Only this customer
+
+        Returns:
+            Dict with the bucket totals and one row per customer (balance,
+            buckets, order count, oldest order), largest balance first
+        """
+        as_of = as_of or business_dates.business_date()
+        orders = SalesOrder.objects.filter(
+            payment_type='credit', balance__gt=0, business_date__lte=as_of - timedelta(days=min_age)
+        )
+        if customer_id:
+            orders = orders.filter(customer_id=customer_id)
+
+        buckets = {}
+        for key, _, first_day, last_day in BUCKETS:
+            condition = Q(business_date__lte=as_of - timedelta(days=first_day))
+            if last_day is not None:
+                condition &= Q(business_date__gte=as_of - timedelta(days=last_day))
+            buckets[key] = Sum(
+                Case(When(condition, then=BALANCE), default=Value(Decimal('0'))),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )
+        rows = orders.values('customer_id', 'customer__name').annotate(
+            order_count=Count('id'),
+            oldest_date=Min('business_date'),
+            total=Sum(BALANCE),
+            **buckets,
+        ).order_by('-total')
+
+        customers = [{
+            'customer_id': row['customer_id'],
+            'customer_name': row['customer__name'],
+            'balance': float(Decimal(row['total']).quantize(CENT)),
+            'buckets': {key: float(Decimal(row[key]).quantize(CENT)) for key, *_ in BUCKETS},
+            'order_count': row['order_count'],
+            'oldest_date': row['oldest_date'],
+            'days_old': (as_of - row['oldest_date']).days,
+        } for row in rows]
+
+        return {
+            'as_of': as_of,
+            'min_age': min_age,
+            'bucket_labels': {key: label for key, label, *_ in BUCKETS},
+            'total_outstanding': sum(row['balance'] for row in customers),
+            'buckets': {key: sum(row['buckets'][key] for row in customers) for key, *_ in BUCKETS},
+            'customer_count': len(customers),
+            'order_count': sum(row['order_count'] for row in customers),
+            'customers': customers,
+        }
+
+    @staticmethod
+    def statement(customer_id, as_of=None):
+        """
+        Statement of account of a customer: ledger balances and credit aging
+
+        Args:
+            customer_id: Customer ID
+            as_of: Business date the ages are counted from (default: today)
+
+        Returns:
+            Dict with the customer, ledger balances and aging buckets
+
+        Raises:
+            Customer.DoesNotExist: If the customer does not exist
+        """
+        customer = Customer.objects.select_related('account').get(id=customer_id)
+        account = Receivables.account(customer)
+        aging = Receivables.aging(as_of, customer_id=customer.id)
+        oldest = aging['customers'][0] if aging['customers'] else None
+
+        return {
+            'customer_id': customer.id,
+            'customer_name': customer.name,
+            'as_of': aging['as_of'],
+            'outstanding_balance': float(account.outstanding_balance),
+            'credit_balance': float(account.credit_balance),
+            'open_credit_orders': aging['order_count'],
+            'oldest_date': oldest['oldest_date'] if oldest else None,
+            'days_old': oldest['days_old'] if oldest else 0,
+            'buckets': aging['buckets'],
+        }
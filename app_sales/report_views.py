@@ -5,9 +5,9 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.utils import timezone
 from datetime import timedelta
 from app_sales.reporting import SalesReports
+from core import business_dates
 
 
 class SalesReportViewSet(viewsets.ViewSet):
@@ -83,9 +83,24 @@ class SalesReportViewSet(viewsets.ViewSet):
     def sales_trend(self, request):
         """Get sales trend over period"""
         days = int(request.query_params.get('days', 30))
+        max_points = int(request.query_params.get('max_points', 0)) or None
         
-        trend = SalesReports.sales_trend(days=days)
+        trend = SalesReports.sales_trend(days=days, max_points=max_points)
         return Response({
             'period_days': days,
             'data': trend
         })
+    
+    @action(detail=False, methods=['get'])
+    def monthly_summary(self, request):
+        """Get monthly sales summary (?year=&month=, default: current month)"""
+        today = business_dates.business_date()
+        try:
+            year = int(request.query_params.get('year', today.year))
+            month = int(request.query_params.get('month', today.month))
+        except ValueError:
+            return Response({'error': 'year and month must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= month <= 12:
+            return Response({'error': 'month must be between 1 and 12'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(SalesReports.monthly_sales_summary(year, month))
@@ -2,11 +2,14 @@
 Sales reporting and analytics
 """
 from decimal import Decimal
-from django.db.models import Sum, Count, Q, Avg
-from django.db.models.functions import TruncDate
+from django.db.models import Sum, Q, F
 from django.utils import timezone
 from datetime import timedelta, date
-from app_sales.models import SalesOrder, SalesOrderItem, Customer, Receipt
+from app_sales.models import SalesOrder, Receipt
+from app_sales.closing import DailyClose
+from app_sales.cube import SalesCube
+from core import business_dates
+from core.stats import downsample
 
 
 class SalesReports:
@@ -17,6 +20,9 @@ class SalesReports:
         """
         Get daily sales summary
         
+        A closed day is read from its end-of-day close; an open day is
+        aggregated live.
+        
         Args:
             sales_date: Date to report on (default: today)
             
@@ -24,30 +30,74 @@ class SalesReports:
             Dict with daily sales data
         """
         if not sales_date:
-            sales_date = timezone.now().date()
+            sales_date = business_dates.business_date()
         
-        orders = SalesOrder.objects.filter(created_at__date=sales_date)
+        totals = DailyClose.period_totals(sales_date, sales_date)
         
-        total_sales = orders.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0')
-        total_discount = orders.aggregate(Sum('discount_amount'))['discount_amount__sum'] or Decimal('0')
-        total_paid = orders.aggregate(Sum('amount_paid'))['amount_paid__sum'] or Decimal('0')
-        outstanding = orders.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+        return {
+            'date': sales_date,
+            'closed': totals['closed_days'] == 1,
+            'total_sales': float(totals['total_sales']),
+            'total_discount': float(totals['total_discount']),
+            'net_sales': float(totals['total_sales'] - totals['total_discount']),
+            'total_paid': float(totals['total_paid']),
+            'outstanding_balance': float(totals['outstanding_balance']),
+            'transactions': totals['order_count'],
+            'by_payment_type': [{
+                'payment_type': line['payment_type'],
+                'count': line['order_count'],
+                'total': line['total_sales'],
+                'paid': line['total_paid']
+            } for line in totals['by_payment_type']]
+        }
+    
+    @staticmethod
+    def monthly_sales_summary(year, month):
+        """
+        Get monthly sales summary with a per-day breakdown
         
-        payment_breakdown = orders.values('payment_type').annotate(
-            count=Count('id'),
-            total=Sum('total_amount'),
-            paid=Sum('amount_paid')
-        )
+        Closed days come from their end-of-day close; only open days (normally
+        today) are aggregated from orders.
+        
+        Args:
+            year: Year
+            month: Month (1-12)
+            
+        Returns:
+            Dict with monthly totals, payment type and cashier breakdowns and daily rows
+        """
+        start_date = date(year, month, 1)
+        end_date = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+        totals = DailyClose.period_totals(start_date, end_date)
+        
+        def amounts(row):
+            return {
+                'total_sales': float(row['total_sales']),
+                'total_discount': float(row['total_discount']),
+                'total_paid': float(row['total_paid']),
+                'outstanding_balance': float(row['outstanding_balance'])
+            }
         
         return {
-            'date': sales_date,
-            'total_sales': float(total_sales),
-            'total_discount': float(total_discount),
-            'net_sales': float(total_sales - total_discount),
-            'total_paid': float(total_paid),
-            'outstanding_balance': float(outstanding),
-            'transactions': orders.count(),
-            'by_payment_type': list(payment_breakdown)
+            'year': year,
+            'month': month,
+            'closed_days': totals['closed_days'],
+            'transactions': totals['order_count'],
+            'receipts': totals['receipt_count'],
+            **amounts(totals),
+            'net_sales': float(totals['total_sales'] - totals['total_discount']),
+            'by_payment_type': [
+                {'payment_type': line['payment_type'], 'count': line['order_count'], **amounts(line)}
+                for line in totals['by_payment_type']
+            ],
+            'by_cashier': [
+                {'cashier_id': line['cashier_id'], 'cashier': line['cashier'], 'count': line['order_count'], **amounts(line)}
+                for line in totals['by_cashier']
+            ],
+            'daily': [
+                {'date': day['business_date'], 'closed': day['closed'], 'count': day['order_count'], **amounts(day)}
+                for day in DailyClose.daily_totals(start_date, end_date)
+            ]
         }
     
     @staticmethod
@@ -62,22 +112,20 @@ class SalesReports:
         Returns:
             List of top customers with sales data
         """
-        cutoff_date = timezone.now() - timedelta(days=days)
-        
-        customers = Customer.objects.filter(
-            sales_orders__created_at__gte=cutoff_date
+        customers = SalesCube.order_facts(SalesCube.since(days)).values(
+            'customer_id', 'customer__name', 'customer__phone_number'
         ).annotate(
-            total_spent=Sum('sales_orders__total_amount'),
-            transaction_count=Count('sales_orders')
+            total_spent=Sum('revenue'),
+            transaction_count=Sum('order_count')
         ).order_by('-total_spent')[:limit]
         
         return [{
-            'customer_id': c.id,
-            'customer_name': c.name,
-            'phone': c.phone_number,
-            'total_spent': float(c.total_spent),
-            'transaction_count': c.transaction_count,
-            'avg_transaction': float(c.total_spent / c.transaction_count) if c.transaction_count > 0 else 0
+            'customer_id': c['customer_id'],
+            'customer_name': c['customer__name'],
+            'phone': c['customer__phone_number'],
+            'total_spent': float(c['total_spent']),
+            'transaction_count': c['transaction_count'],
+            'avg_transaction': float(c['total_spent'] / c['transaction_count']) if c['transaction_count'] > 0 else 0
         } for c in customers]
     
     @staticmethod
@@ -92,15 +140,13 @@ class SalesReports:
         Returns:
             List of top items with sales data
         """
-        cutoff_date = timezone.now() - timedelta(days=days)
-        
-        items = SalesOrderItem.objects.filter(
-            sales_order__created_at__gte=cutoff_date
-        ).values('product__id', 'product__name', 'product__sku').annotate(
+        items = SalesCube.product_facts(SalesCube.since(days)).values(
+            'product__id', 'product__name', 'product__sku'
+        ).annotate(
             total_pieces=Sum('quantity_pieces'),
             total_bf=Sum('board_feet'),
-            total_revenue=Sum('subtotal'),
-            transaction_count=Count('sales_order')
+            total_revenue=Sum('revenue'),
+            transaction_count=Sum('line_count')
         ).order_by('-total_revenue')[:limit]
         
         return list(items)
@@ -116,15 +162,13 @@ class SalesReports:
         Returns:
             Dict with income by category
         """
-        cutoff_date = timezone.now() - timedelta(days=days)
-        
-        categories = SalesOrderItem.objects.filter(
-            sales_order__created_at__gte=cutoff_date
-        ).values('product__category__name').annotate(
-            total_revenue=Sum('subtotal'),
-            total_items=Count('id'),
+        categories = SalesCube.product_facts(SalesCube.since(days)).values(
+            product__category__name=F('category__name')
+        ).annotate(
+            total_revenue=Sum('revenue'),
+            total_items=Sum('line_count'),
             total_pieces=Sum('quantity_pieces'),
-            avg_item_value=Avg('subtotal')
+            avg_item_value=Sum('revenue') / Sum('line_count')
         ).order_by('-total_revenue')
         
         return list(categories)
@@ -180,14 +224,14 @@ class SalesReports:
         query = SalesOrder.objects.filter(payment_type='credit', balance__gt=0).select_related('customer')
         
         if days:
-            cutoff_date = timezone.now() - timedelta(days=days)
-            query = query.filter(created_at__gte=cutoff_date)
+            query = query.filter(business_date__gte=business_dates.business_date() - timedelta(days=days))
         
-        total_outstanding = query.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+        # The listed orders give the totals; no separate aggregate and count passes
+        orders = list(query.order_by('-balance'))
         
         return {
-            'total_outstanding': float(total_outstanding),
-            'orders_count': query.count(),
+            'total_outstanding': float(sum((so.balance for so in orders), Decimal('0'))),
+            'orders_count': len(orders),
             'orders': [{
                 'so_number': so.so_number,
                 'customer_id': so.customer.id,
@@ -196,30 +240,26 @@ class SalesReports:
                 'amount_paid': float(so.amount_paid),
                 'balance': float(so.balance),
                 'created_at': so.created_at
-            } for so in query.order_by('-balance')]
+            } for so in orders]
         }
     
     @staticmethod
-    def sales_trend(days=30):
+    def sales_trend(days=30, max_points=None):
         """
         Get sales trend over period
         
         Args:
             days: Period in days
+            max_points: Downsample to at most this many points (default: one per day)
             
         Returns:
             List of daily sales data
         """
-        cutoff_date = timezone.now() - timedelta(days=days)
+        today = business_dates.business_date()
         
-        sales = SalesOrder.objects.filter(
-            created_at__gte=cutoff_date
-        ).annotate(
-            date=TruncDate('created_at')
-        ).values('date').annotate(
-            total=Sum('total_amount'),
-            count=Count('id'),
-            avg=Avg('total_amount')
-        ).order_by('date')
-        
-        return list(sales)
+        return downsample([{
+            'date': day['business_date'],
+            'total': day['total_sales'],
+            'count': day['order_count'],
+            'avg': day['total_sales'] / day['order_count']
+        } for day in DailyClose.daily_totals(today - timedelta(days=days), today)], max_points)
@@ -0,0 +1,80 @@
+"""
+Retention of read customer notifications
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from app_sales.notification_models import OrderNotification, OrderNotificationArchive
+
+
+class NotificationArchiver:
+    """Move old read notifications from OrderNotification to OrderNotificationArchive"""
+
+    DEFAULT_RETENTION_DAYS = 90
+    DEFAULT_BATCH_SIZE = 1000
+
+    ARCHIVED_FIELDS = ('sales_order_id', 'customer_id', 'notification_type', 'title', 'message',
+                       'created_at', 'read_at')
+
+    @staticmethod
+    def eligible(days=DEFAULT_RETENTION_DAYS):
+        """Read notifications created more than days ago"""
+        cutoff = timezone.now() - timedelta(days=days)
+        return OrderNotification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+    @staticmethod
+    @transaction.atomic
+    def archive_batch(days=DEFAULT_RETENTION_DAYS, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Archive one batch of eligible notifications in a single transaction
+
+        Args:
+            days: Keep read notifications newer than this many days
+            batch_size: Maximum notifications to move
+
+        Returns:
+            int: Number of notifications archived
+        """
+        rows = list(
+            NotificationArchiver.eligible(days).order_by('id').values('id', *NotificationArchiver.ARCHIVED_FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        OrderNotificationArchive.objects.bulk_create(
+            [
+                OrderNotificationArchive(
+                    original_id=row['id'], **{field: row[field] for field in NotificationArchiver.ARCHIVED_FIELDS}
+                )
+                for row in rows
+            ],
+            ignore_conflicts=True  # never archive the same notification twice
+        )
+        OrderNotification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        return len(rows)
+
+    @staticmethod
+    def archive(days=DEFAULT_RETENTION_DAYS, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+        """
+        Archive eligible notifications batch by batch
+
+        Each batch commits on its own, so locks stay short and an
+        interrupted run can simply be started again.
+
+        Args:
+            days: Keep read notifications newer than this many days
+            batch_size: Notifications moved per transaction
+            max_batches: Stop after this many batches (default: until done)
+
+        Returns:
+            Dict with archived count and number of batches
+        """
+        archived = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = NotificationArchiver.archive_batch(days, batch_size)
+            if not count:
+                break
+            archived += count
+            batches += 1
+        return {'archived': archived, 'batches': batches}
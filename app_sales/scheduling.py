@@ -0,0 +1,234 @@
+"""
+Capacity-aware pickup scheduling for sales orders
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils.dateparse import parse_date
+from app_sales.models import SalesOrderItem
+from app_sales.notification_models import OrderConfirmation, PickupSlot
+from core import business_dates
+
+
+class PickupScheduler:
+    """Assign pickup dates from the yard's daily preparation capacity"""
+
+    # Orders and board feet the yard can prepare per day (PickupSlot rows may override per day)
+    DAILY_ORDER_CAPACITY = 20
+    DAILY_BOARD_FEET_CAPACITY = Decimal('5000')
+
+    # Earliest pickup is the day after the order, searching this many days ahead
+    MIN_LEAD_DAYS = 1
+    HORIZON_DAYS = 60
+
+    # OrderConfirmation statuses that still need preparation
+    QUEUE_STATUSES = ('created', 'confirmed')
+
+    @staticmethod
+    def _capacity(slot):
+        """(orders, board feet) capacity of a day, from its PickupSlot values or the defaults"""
+        orders = slot.get('order_capacity') if slot else None
+        board_feet = slot.get('board_feet_capacity') if slot else None
+        return (
+            PickupScheduler.DAILY_ORDER_CAPACITY if orders is None else orders,
+            PickupScheduler.DAILY_BOARD_FEET_CAPACITY if board_feet is None else board_feet,
+        )
+
+    @staticmethod
+    def _has_room(slot, board_feet):
+        """Whether one more order of board_feet fits on a day"""
+        order_capacity, bf_capacity = PickupScheduler._capacity(slot)
+        order_count = slot['order_count'] if slot else 0
+        booked_bf = slot['board_feet'] if slot else Decimal('0')
+
+        if order_count >= order_capacity or bf_capacity <= 0:
+            return False
+        # An order larger than a whole day's capacity takes an otherwise empty day
+        return booked_bf + board_feet <= bf_capacity or order_count == 0
+
+    @staticmethod
+    def order_board_feet(sales_order_id):
+        """Total board feet of a sales order's items"""
+        return SalesOrderItem.objects.filter(sales_order_id=sales_order_id).aggregate(
+            total=Sum('board_feet', default=Decimal('0'))
+        )['total']
+
+    @staticmethod
+    def book(day, board_feet, orders=1):
+        """
+        Add load to a day's counter, regardless of capacity
+
+        Args:
+            day: Pickup date (date or ISO string)
+            board_feet: Board feet to add
+            orders: Number of orders to add
+        """
+        if isinstance(day, str):
+            day = parse_date(day)
+        board_feet = Decimal(str(board_feet or 0))
+
+        changes = {'order_count': F('order_count') + orders, 'board_feet': F('board_feet') + board_feet}
+        if PickupSlot.objects.filter(date=day).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                PickupSlot.objects.create(date=day, order_count=orders, board_feet=board_feet)
+        except IntegrityError:
+            # Another order created the day's row first
+            PickupSlot.objects.filter(date=day).update(**changes)
+
+    @staticmethod
+    def release(day, board_feet, orders=1):
+        """Remove load from a day's counter (never below zero)"""
+        if day is None:
+            return
+        board_feet = Decimal(str(board_feet or 0))
+        PickupSlot.objects.filter(date=day).update(
+            order_count=Greatest(F('order_count') - orders, Value(0)),
+            board_feet=Greatest(F('board_feet') - board_feet, Value(Decimal('0'))),
+        )
+
+    @staticmethod
+    def release_many(confirmations):
+        """
+        Free the load of many orders leaving the preparation queue
+
+        Board feet come from one grouped query and each pickup day gets a
+        single UPDATE.
+
+        Args:
+            confirmations: OrderConfirmations in their pre-transition status
+        """
+        queued = [
+            confirmation for confirmation in confirmations
+            if confirmation.status in PickupScheduler.QUEUE_STATUSES and confirmation.estimated_pickup_date
+        ]
+        if not queued:
+            return
+
+        board_feet = dict(
+            SalesOrderItem.objects.filter(
+                sales_order_id__in=[confirmation.sales_order_id for confirmation in queued]
+            ).values('sales_order_id').annotate(total=Sum('board_feet')).values_list('sales_order_id', 'total').order_by()
+        )
+        per_day = defaultdict(lambda: [0, Decimal('0')])
+        for confirmation in queued:
+            load = per_day[confirmation.estimated_pickup_date]
+            load[0] += 1
+            load[1] += board_feet.get(confirmation.sales_order_id) or Decimal('0')
+
+        for day, (orders, total_bf) in per_day.items():
+            PickupScheduler.release(day, total_bf, orders=orders)
+
+    @staticmethod
+    @transaction.atomic
+    def reserve(board_feet, earliest=None):
+        """
+        Book an order on the earliest day with spare capacity
+
+        Reads the booked days of the search horizon in one query and
+        increments the chosen day's counter, so the cost does not grow with
+        the size of the preparation queue.
+
+        Args:
+            board_feet: Board feet of the order
+            earliest: First acceptable pickup date (default: today + MIN_LEAD_DAYS)
+
+        Returns:
+            date: Assigned pickup date
+        """
+        board_feet = Decimal(str(board_feet or 0))
+        first_day = earliest or business_dates.business_date() + timedelta(days=PickupScheduler.MIN_LEAD_DAYS)
+        last_day = first_day + timedelta(days=PickupScheduler.HORIZON_DAYS)
+
+        booked = {
+            slot['date']: slot
+            for slot in PickupSlot.objects.select_for_update().filter(
+                date__gte=first_day, date__lt=last_day
+            ).values('date', 'order_count', 'board_feet', 'order_capacity', 'board_feet_capacity')
+        }
+
+        day = first_day
+        while day < last_day and not PickupScheduler._has_room(booked.get(day), board_feet):
+            day += timedelta(days=1)
+
+        PickupScheduler.book(day, board_feet)
+        return day
+
+    @staticmethod
+    def move(old_day, new_day, board_feet):
+        """Move an order's load from one day to another"""
+        if old_day == new_day:
+            return
+        PickupScheduler.release(old_day, board_feet)
+        if new_day:
+            PickupScheduler.book(new_day, board_feet)
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild():
+        """
+        Recompute every day's counter from the created/confirmed queue
+
+        Returns:
+            Dict with the number of days and orders booked
+        """
+        queue = OrderConfirmation.objects.filter(
+            status__in=PickupScheduler.QUEUE_STATUSES, estimated_pickup_date__isnull=False
+        ).values('estimated_pickup_date').annotate(
+            orders=Count('id', distinct=True),
+            total_bf=Sum('sales_order__sales_order_items__board_feet', default=Decimal('0')),
+        ).order_by()
+
+        PickupSlot.objects.update(order_count=0, board_feet=0)
+        slots = [
+            PickupSlot(date=row['estimated_pickup_date'], order_count=row['orders'], board_feet=row['total_bf'])
+            for row in queue
+        ]
+        PickupSlot.objects.bulk_create(
+            slots, update_conflicts=True, unique_fields=['date'], update_fields=['order_count', 'board_feet']
+        )
+
+        return {
+            'days': len(slots),
+            'orders': sum(slot.order_count for slot in slots),
+        }
+
+    @staticmethod
+    def schedule(days=14):
+        """
+        Get booked load against capacity for the coming days
+
+        Args:
+            days: Number of days from today
+
+        Returns:
+            List of dicts, one per day
+        """
+        first_day = business_dates.business_date()
+        booked = {
+            slot['date']: slot
+            for slot in PickupSlot.objects.filter(
+                date__gte=first_day, date__lt=first_day + timedelta(days=days)
+            ).values('date', 'order_count', 'board_feet', 'order_capacity', 'board_feet_capacity')
+        }
+
+        result = []
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            slot = booked.get(day)
+            order_capacity, bf_capacity = PickupScheduler._capacity(slot)
+            board_feet = slot['board_feet'] if slot else Decimal('0')
+            result.append({
+                'date': day.isoformat(),
+                'order_count': slot['order_count'] if slot else 0,
+                'board_feet': float(board_feet),
+                'order_capacity': order_capacity,
+                'board_feet_capacity': float(bf_capacity),
+                'bf_utilization': round(float(board_feet / bf_capacity * 100), 1) if bf_capacity else 0,
+                'has_room': PickupScheduler._has_room(slot, Decimal('0')),
+            })
+        return result
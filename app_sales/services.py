@@ -9,6 +9,10 @@ from app_sales.models import Customer, SalesOrder, SalesOrderItem, Receipt
 from app_inventory.models import LumberProduct, Inventory
 from app_inventory.services import InventoryService
 from app_sales.notification_models import OrderNotification, OrderConfirmation
+from app_sales.scheduling import PickupScheduler
+from app_sales.outbox import Outbox
+from app_sales.shifts import CashierShifts
+from app_sales.receivables import Receivables
 
 
 class SalesService:
@@ -83,6 +87,7 @@ class SalesService:
         so.save()
         
         total_amount = Decimal('0')
+        total_board_feet = Decimal('0')
         
         # Create line items and deduct stock
         for item_data in items:
@@ -119,6 +124,7 @@ class SalesService:
             )
             
             total_amount += subtotal
+            total_board_feet += board_feet
         
         # Set total amount
         so.total_amount = total_amount
@@ -135,14 +141,13 @@ class SalesService:
         so.save()
         
         # Create order confirmation (without initial notification)
-        # Notification will be sent when admin actually confirms the order
-        from datetime import datetime, timedelta
-        estimated_pickup_date = (datetime.now() + timedelta(days=3)).date()
+        # Notification will be sent when admin actually confirms the order.
+        # The pickup date is the earliest day with spare yard capacity.
         OrderConfirmationService.create_order_confirmation(
             sales_order_id=so.id,
-            estimated_pickup_date=estimated_pickup_date,
             created_by=created_by,
-            send_notification=False  # Don't notify yet, wait for admin confirmation
+            send_notification=False,  # Don't notify yet, wait for admin confirmation
+            board_feet=total_board_feet
         )
         
         return so
@@ -170,10 +175,13 @@ class SalesService:
         if so.is_confirmed:
             raise ValidationError("Cannot update a confirmed order")
             
+        old_board_feet = PickupScheduler.order_board_feet(so.id)
+        
         # Delete existing order items
         so.sales_order_items.all().delete()
         
         total_amount = Decimal('0')
+        total_board_feet = Decimal('0')
         
         # Create new line items
         for item_data in items:
@@ -199,7 +207,15 @@ class SalesService:
                 subtotal=subtotal,
             )
             total_amount += subtotal
+            total_board_feet += board_feet
             
+        # Keep the booked pickup day's load in step with the new items
+        pickup_date = OrderConfirmation.objects.filter(
+            sales_order=so, status__in=PickupScheduler.QUEUE_STATUSES
+        ).values_list('estimated_pickup_date', flat=True).first()
+        if pickup_date:
+            PickupScheduler.book(pickup_date, total_board_feet - old_board_feet, orders=0)
+        
         # Update order totals and save
         so.total_amount = total_amount
         so.save()
@@ -228,14 +244,17 @@ class SalesService:
     
     @staticmethod
     @transaction.atomic
-    def process_payment(sales_order_id, amount_paid, created_by=None):
+    def process_payment(sales_order_id, amount_paid, created_by=None, amount_tendered=None):
         """
         Process payment for sales order
         
+        The receipt is added to the running totals of the cashier's open shift.
+        
         Args:
             sales_order_id: SalesOrder ID
             amount_paid: Amount paid by customer (will be ADDED to existing amount_paid)
             created_by: User processing payment
+            amount_tendered: Cash handed over when more than amount_paid (the rest is change)
             
         Returns:
             Tuple: (SalesOrder, Receipt)
@@ -255,11 +274,15 @@ class SalesService:
         
         so.save()
         
+        tendered = max(Decimal(str(amount_tendered)), payment_amount) if amount_tendered is not None else payment_amount
+        shift = CashierShifts.current(created_by)
+        
         # Create receipt for THIS payment (not total)
         receipt = Receipt.objects.create(
             sales_order=so,
-            amount_tendered=payment_amount,
-            change=Decimal('0'),  # No change for partial payments
+            amount_tendered=tendered,
+            change=tendered - payment_amount,
+            shift=shift,
             created_by=created_by
         )
         
@@ -267,6 +290,8 @@ class SalesService:
         receipt.receipt_number = SalesService._generate_receipt_number()
         receipt.save()
         
+        CashierShifts.record_receipt(receipt)
+        
         # Mark payment in confirmation if exists
         try:
             OrderConfirmationService.mark_payment_received(sales_order_id=sales_order_id)
@@ -294,31 +319,22 @@ class SalesService:
         Returns:
             Dict: Customer info, total purchases, outstanding balance
         """
-        from django.db.models import Sum, Q
+        customer = Customer.objects.select_related('account').get(id=customer_id)
         
-        customer = Customer.objects.get(id=customer_id)
-        
-        sales_orders = SalesOrder.objects.filter(customer=customer)
-        
-        total_purchases = sales_orders.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0')
-        total_paid = sales_orders.aggregate(Sum('amount_paid'))['amount_paid__sum'] or Decimal('0')
-        outstanding_balance = sales_orders.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
-        
-        # Filter for credit/SOA orders
-        credit_orders = sales_orders.filter(payment_type='credit')
-        credit_balance = credit_orders.aggregate(Sum('balance'))['balance__sum'] or Decimal('0')
+        # Running counters kept with every order and payment; no aggregates over the orders
+        account = Receivables.account(customer)
         
         return {
             'customer_id': customer.id,
             'customer_name': customer.name,
             'email': customer.email,
             'phone': customer.phone_number,
-            'total_purchases': float(total_purchases),
-            'total_paid': float(total_paid),
-            'outstanding_balance': float(outstanding_balance),
-            'credit_balance': float(credit_balance),
-            'total_orders': sales_orders.count(),
-            'credit_orders': credit_orders.count()
+            'total_purchases': float(account.total_purchases),
+            'total_paid': float(account.total_paid),
+            'outstanding_balance': float(account.outstanding_balance),
+            'credit_balance': float(account.credit_balance),
+            'total_orders': account.order_count,
+            'credit_orders': account.credit_order_count
         }
     
     @staticmethod
@@ -374,21 +390,32 @@ class OrderConfirmationService:
     
     @staticmethod
     @transaction.atomic
-    def create_order_confirmation(sales_order_id, estimated_pickup_date=None, created_by=None, send_notification=True):
+    def create_order_confirmation(sales_order_id, estimated_pickup_date=None, created_by=None, send_notification=True,
+                                  board_feet=None):
         """
         Create order confirmation after sales order is created
         
         Args:
             sales_order_id: ID of the sales order
             estimated_pickup_date: Date when customer can pick up order
+                (default: earliest day with spare yard capacity)
             created_by: User creating the confirmation
             send_notification: Whether to send initial 'order created' notification (default: True)
+            board_feet: Order board feet, if already known (saves a query)
             
         Returns:
             OrderConfirmation: Created confirmation record
         """
         sales_order = SalesOrder.objects.get(id=sales_order_id)
         
+        # Book the order's preparation load in the pickup schedule
+        if board_feet is None:
+            board_feet = PickupScheduler.order_board_feet(sales_order.id)
+        if estimated_pickup_date:
+            PickupScheduler.book(estimated_pickup_date, board_feet)
+        else:
+            estimated_pickup_date = PickupScheduler.reserve(board_feet)
+        
         # Create confirmation record
         confirmation = OrderConfirmation.objects.create(
             sales_order=sales_order,
@@ -495,6 +522,28 @@ class OrderConfirmationService:
         notification.mark_as_read()
         return notification
     
+    @staticmethod
+    @transaction.atomic
+    def mark_all_notifications_read(customer_id):
+        """
+        Mark all unread notifications of a customer as read with one UPDATE
+        
+        Args:
+            customer_id: ID of the customer
+            
+        Returns:
+            int: Number of notifications marked as read
+        """
+        now = timezone.now()
+        count = OrderNotification.objects.filter(customer_id=customer_id, is_read=False).update(
+            is_read=True, read_at=now, updated_at=now
+        )
+        if count:
+            # Queryset updates bypass post_save, so wake waiting long-polls here
+            from app_sales.notification_events import NotificationEvents
+            transaction.on_commit(lambda: NotificationEvents.publish(customer_id))
+        return count
+    
     @staticmethod
     @transaction.atomic
     def mark_order_picked_up(sales_order_id):
@@ -511,13 +560,250 @@ class OrderConfirmationService:
         confirmation.mark_picked_up()
         
         # Create pickup notification
-        OrderNotification.objects.create(
-            sales_order=confirmation.sales_order,
-            customer=confirmation.customer,
-            notification_type='order_confirmed',
-            title=f"Order {confirmation.sales_order.so_number} Picked Up",
-            message=f"Thank you! Your order {confirmation.sales_order.so_number} has been picked up. "
-                   f"We appreciate your business!"
-        )
+        confirmation.picked_up_notification().save()
         
         return confirmation
+    
+    @staticmethod
+    def get_notification_updates(customer_id, after_id=None, limit=20):
+        """
+        Get the unread count and notifications created after after_id
+        
+        Args:
+            customer_id: ID of the customer
+            after_id: Last notification ID the client has seen (None: only the count)
+            limit: Maximum number of new notifications to return
+            
+        Returns:
+            Dict with unread_count, new notifications and last_id
+        """
+        notifications = OrderNotification.objects.filter(customer_id=customer_id)
+        unread_count = notifications.filter(is_read=False).count()
+        
+        if after_id is None:
+            new = []
+            last_id = notifications.order_by('-id').values_list('id', flat=True).first() or 0
+        else:
+            new = list(notifications.filter(id__gt=after_id).order_by('-id').values(
+                'id', 'notification_type', 'title', 'message', 'created_at', 'sales_order__so_number'
+            )[:limit])
+            last_id = new[0]['id'] if new else after_id
+        
+        return {
+            'unread_count': unread_count,
+            'notifications': new,
+            'last_id': last_id,
+        }
+    
+    @staticmethod
+    def _publish_after_commit(confirmations):
+        """Wake waiting long-polls for notifications created without post_save (bulk_create)"""
+        from app_sales.notification_events import NotificationEvents
+        customer_ids = {confirmation.customer_id for confirmation in confirmations}
+        transaction.on_commit(lambda: NotificationEvents.publish(*customer_ids))
+    
+    @staticmethod
+    def _bulk_result():
+        return {'success': 0, 'failed': 0, 'errors': [], 'updated_ids': [], 'failures': []}
+    
+    @staticmethod
+    def _add_failure(result, sales_order_id, error, label=None):
+        result['failed'] += 1
+        result['errors'].append(f"{label or f'Order {sales_order_id}'}: {error}")
+        result['failures'].append({'sales_order_id': sales_order_id, 'error': error})
+    
+    @staticmethod
+    def _parse_ids(sales_order_ids, result):
+        """Unique integer IDs, recording invalid ones as failures"""
+        ids = []
+        for sales_order_id in sales_order_ids:
+            try:
+                ids.append(int(sales_order_id))
+            except (TypeError, ValueError):
+                OrderConfirmationService._add_failure(result, sales_order_id, 'Invalid sales order ID')
+        return list(dict.fromkeys(ids))
+    
+    @staticmethod
+    def _load_confirmations(sales_order_ids, allowed_statuses, result):
+        """
+        Fetch confirmations for sales_order_ids in one query, recording
+        missing ones and ones not in allowed_statuses as failures
+        """
+        ids = OrderConfirmationService._parse_ids(sales_order_ids, result)
+        
+        found = {
+            confirmation.sales_order_id: confirmation
+            for confirmation in OrderConfirmation.objects.filter(
+                sales_order_id__in=ids
+            ).select_related('sales_order', 'customer')
+        }
+        
+        confirmations = []
+        for sales_order_id in ids:
+            confirmation = found.get(sales_order_id)
+            if confirmation is None:
+                OrderConfirmationService._add_failure(result, sales_order_id, 'Order confirmation not found')
+            elif confirmation.status not in allowed_statuses:
+                OrderConfirmationService._add_failure(
+                    result, sales_order_id, f'Order is already {confirmation.get_status_display()}',
+                    label=confirmation.sales_order.so_number
+                )
+            else:
+                confirmations.append(confirmation)
+        return confirmations
+    
+    @staticmethod
+    @transaction.atomic
+    def bulk_mark_ready(sales_order_ids, updated_by=None):
+        """
+        Mark many orders as ready for pickup with set-based writes
+        
+        Same outcome as confirm_order_ready for each order: the confirmation
+        moves to ready_for_pickup, the customer gets a 'ready for pickup'
+        notification and the order enters the delivery queue.
+        
+        Args:
+            sales_order_ids: Sales order IDs
+            updated_by: User performing the update (recorded on delivery logs)
+            
+        Returns:
+            Dict with success/failure counts
+        """
+        result = OrderConfirmationService._bulk_result()
+        confirmations = OrderConfirmationService._load_confirmations(
+            sales_order_ids, PickupScheduler.QUEUE_STATUSES, result
+        )
+        if not confirmations:
+            return result
+        
+        PickupScheduler.release_many(confirmations)
+        
+        now = timezone.now()
+        OrderConfirmation.objects.filter(
+            id__in=[confirmation.id for confirmation in confirmations]
+        ).update(status='ready_for_pickup', ready_at=now, updated_at=now)
+        for confirmation in confirmations:
+            confirmation.status = 'ready_for_pickup'
+            confirmation.ready_at = now
+        
+        notifications = OrderNotification.objects.bulk_create(
+            [confirmation.ready_notification() for confirmation in confirmations]
+        )
+        Outbox.enqueue(notifications)
+        OrderConfirmationService._publish_after_commit(confirmations)
+        
+        # Move the orders to the delivery queue
+        from app_delivery.services import DeliveryService
+        try:
+            with transaction.atomic():
+                DeliveryService.create_deliveries_for_orders(
+                    [confirmation.sales_order for confirmation in confirmations], created_by=updated_by
+                )
+        except Exception:
+            # Same as the single-order flow: never block the confirmation on the delivery queue
+            pass
+        
+        result['success'] = len(confirmations)
+        result['updated_ids'] = [confirmation.sales_order_id for confirmation in confirmations]
+        return result
+    
+    @staticmethod
+    @transaction.atomic
+    def bulk_mark_picked_up(sales_order_ids):
+        """
+        Mark many orders as picked up with set-based writes
+        
+        Same outcome as mark_order_picked_up for each order: the confirmation
+        moves to picked_up, its delivery is marked delivered and the customer
+        gets a 'picked up' notification.
+        
+        Args:
+            sales_order_ids: Sales order IDs
+            
+        Returns:
+            Dict with success/failure counts
+        """
+        result = OrderConfirmationService._bulk_result()
+        confirmations = OrderConfirmationService._load_confirmations(
+            sales_order_ids, ['created', 'confirmed', 'ready_for_pickup'], result
+        )
+        if not confirmations:
+            return result
+        
+        PickupScheduler.release_many(confirmations)
+        
+        now = timezone.now()
+        order_ids = [confirmation.sales_order_id for confirmation in confirmations]
+        OrderConfirmation.objects.filter(
+            id__in=[confirmation.id for confirmation in confirmations]
+        ).update(status='picked_up', picked_up_at=now, updated_at=now)
+        for confirmation in confirmations:
+            confirmation.status = 'picked_up'
+            confirmation.picked_up_at = now
+        
+        # Remove the orders from the delivery queue
+        from app_delivery.models import Delivery
+        Delivery.objects.filter(sales_order_id__in=order_ids).exclude(status='delivered').update(
+            status='delivered', delivered_at=now, status_changed_at=now, updated_at=now
+        )
+        
+        notifications = OrderNotification.objects.bulk_create(
+            [confirmation.picked_up_notification() for confirmation in confirmations]
+        )
+        Outbox.enqueue(notifications)
+        OrderConfirmationService._publish_after_commit(confirmations)
+        
+        result['success'] = len(confirmations)
+        result['updated_ids'] = order_ids
+        return result
+    
+    @staticmethod
+    @transaction.atomic
+    def bulk_confirm_orders(sales_order_ids, confirmed_by=None):
+        """
+        Confirm many sales orders and mark them ready for pickup
+        
+        Saving a confirmed SalesOrder one at a time fires
+        notify_customer_on_order_confirmation, which marks it ready for
+        pickup. Here the orders are confirmed with one UPDATE (no signals)
+        and bulk_mark_ready produces the same customer-visible outcome.
+        
+        Args:
+            sales_order_ids: Sales order IDs
+            confirmed_by: Admin confirming the orders
+            
+        Returns:
+            Dict with success/failure counts and the number marked ready
+        """
+        result = OrderConfirmationService._bulk_result()
+        ids = OrderConfirmationService._parse_ids(sales_order_ids, result)
+        
+        orders = dict(SalesOrder.objects.filter(id__in=ids).values_list('id', 'is_confirmed').order_by())
+        to_confirm = []
+        for sales_order_id in ids:
+            if sales_order_id not in orders:
+                OrderConfirmationService._add_failure(result, sales_order_id, 'Sales order not found')
+            elif orders[sales_order_id]:
+                OrderConfirmationService._add_failure(result, sales_order_id, 'Order is already confirmed')
+            else:
+                to_confirm.append(sales_order_id)
+        
+        if to_confirm:
+            now = timezone.now()
+            SalesOrder.objects.filter(id__in=to_confirm, is_confirmed=False).update(
+                is_confirmed=True, confirmed_at=now, confirmed_by=confirmed_by, updated_at=now
+            )
+            # Orders without a confirmation record are confirmed but have nothing to mark ready
+            ready = OrderConfirmationService.bulk_mark_ready(
+                list(OrderConfirmation.objects.filter(
+                    sales_order_id__in=to_confirm, status__in=PickupScheduler.QUEUE_STATUSES
+                ).values_list('sales_order_id', flat=True)),
+                updated_by=confirmed_by
+            )
+            result['ready'] = ready['success']
+        else:
+            result['ready'] = 0
+        
+        result['success'] = len(to_confirm)
+        result['updated_ids'] = to_confirm
+        return result
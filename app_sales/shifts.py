@@ -0,0 +1,125 @@
+"""
+Cashier shifts and cash drawer reconciliation
+"""
+from decimal import Decimal, InvalidOperation
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from app_sales.models import CashierShift, Receipt
+
+
+class CashierShifts:
+    """Open, track and close cashier shifts"""
+
+    @staticmethod
+    def _amount(value, name):
+        try:
+            amount = Decimal(str(value)).quantize(Decimal('0.01'))
+        except (InvalidOperation, ValueError):
+            raise ValidationError(f'{name} must be a number')
+        if amount < 0:
+            raise ValidationError(f'{name} cannot be negative')
+        return amount
+
+    @staticmethod
+    def current(cashier):
+        """The cashier's open shift, or None"""
+        if cashier is None or not cashier.is_authenticated:
+            return None
+        return CashierShift.objects.filter(cashier=cashier, status='open').first()
+
+    @staticmethod
+    def open_shift(cashier, opening_float=0):
+        """
+        Open a shift for a cashier
+
+        Args:
+            cashier: User opening the drawer
+            opening_float: Cash in the drawer at the start
+
+        Returns:
+            CashierShift
+
+        Raises:
+            ValidationError: If the cashier already has an open shift
+        """
+        opening_float = CashierShifts._amount(opening_float, 'opening_float')
+        try:
+            with transaction.atomic():
+                return CashierShift.objects.create(cashier=cashier, opening_float=opening_float)
+        except IntegrityError:
+            raise ValidationError('You already have an open shift')
+
+    @staticmethod
+    def record_receipt(receipt):
+        """
+        Add a receipt to its shift's running totals
+
+        One UPDATE with F() expressions, so concurrent payments never lose an
+        increment. A receipt whose shift was closed meanwhile is detached.
+        """
+        if not receipt.shift_id:
+            return
+        updated = CashierShift.objects.filter(id=receipt.shift_id, status='open').update(
+            receipt_count=F('receipt_count') + 1,
+            total_tendered=F('total_tendered') + receipt.amount_tendered,
+            total_change=F('total_change') + receipt.change,
+            net_cash=F('net_cash') + receipt.amount_tendered - receipt.change,
+        )
+        if not updated:
+            Receipt.objects.filter(id=receipt.id).update(shift=None)
+            receipt.shift_id = None
+
+    @staticmethod
+    def close_shift(shift_id, counted_cash, closed_by=None, notes=''):
+        """
+        Close a shift with the cash counted in the drawer
+
+        The variance (counted - expected) is computed from the running totals.
+
+        Args:
+            shift_id: CashierShift ID
+            counted_cash: Cash counted at close
+            closed_by: User closing the shift
+            notes: Explanation of a variance
+
+        Returns:
+            CashierShift
+
+        Raises:
+            ValidationError: If the shift is not open
+        """
+        counted_cash = CashierShifts._amount(counted_cash, 'counted_cash')
+        with transaction.atomic():
+            shift = CashierShift.objects.select_for_update().filter(id=shift_id).first()
+            if shift is None or shift.status != 'open':
+                raise ValidationError('Shift is not open')
+            shift.counted_cash = counted_cash
+            shift.variance = counted_cash - shift.expected_cash
+            shift.notes = notes
+            shift.status = 'closed'
+            shift.closed_by = closed_by
+            shift.closed_at = timezone.now()
+            shift.save(update_fields=['counted_cash', 'variance', 'notes', 'status', 'closed_by', 'closed_at'])
+        return shift
+
+    @staticmethod
+    def summary(shift):
+        """Drawer figures of a shift"""
+        return {
+            'shift_id': shift.id,
+            'cashier': shift.cashier.username,
+            'status': shift.status,
+            'opened_at': shift.opened_at,
+            'closed_at': shift.closed_at,
+            'opening_float': float(shift.opening_float),
+            'receipts': shift.receipt_count,
+            'total_tendered': float(shift.total_tendered),
+            'total_change': float(shift.total_change),
+            'net_cash': float(shift.net_cash),
+            'expected_cash': float(shift.expected_cash),
+            'counted_cash': float(shift.counted_cash) if shift.counted_cash is not None else None,
+            'variance': float(shift.variance) if shift.variance is not None else None,
+            'notes': shift.notes,
+        }
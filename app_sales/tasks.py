@@ -0,0 +1,44 @@
+"""
+Background tasks of the sales app (run by core's run_task_worker)
+"""
+from core.task_queue import task
+
+
+@task(concurrency=1)
+def rebuild_pickup_schedule():
+    """Recompute the pickup slot counters from the preparation queue"""
+    from app_sales.scheduling import PickupScheduler
+    return PickupScheduler.rebuild()
+
+
+@task(concurrency=1)
+def archive_notifications(days=None, batch_size=None):
+    """Move old read notifications to the archive table"""
+    from app_sales.retention import NotificationArchiver
+    return NotificationArchiver.archive(
+        days=days or NotificationArchiver.DEFAULT_RETENTION_DAYS,
+        batch_size=batch_size or NotificationArchiver.DEFAULT_BATCH_SIZE,
+    )
+
+
+@task(concurrency=1, max_attempts=5)
+def send_outbound_messages(channels=None, max_batches=10):
+    """Drain due outbox messages, at most max_batches batches per channel"""
+    from app_sales.outbox import Outbox
+    totals = {}
+    for _ in range(max_batches):
+        summary = Outbox.process(channels)
+        for channel, counts in summary.items():
+            channel_totals = totals.setdefault(channel, {'sent': 0, 'retried': 0, 'failed': 0})
+            for key, value in counts.items():
+                channel_totals[key] += value
+        if not any(sum(counts.values()) for counts in summary.values()):
+            break
+    return totals
+
+
+@task(concurrency=1)
+def close_sales_days():
+    """End-of-day close of every finished business day that is still open"""
+    from app_sales.closing import DailyClose
+    return [close.business_date.isoformat() for close in DailyClose.close_pending()]
@@ -136,3 +136,972 @@ class CheckoutTestCase(TestCase):
         item = so.sales_order_items.first()
         self.assertEqual(float(item.unit_price), 280.00)
         self.assertEqual(float(item.subtotal), 560.00)
+
+
+class FulfillmentReportsTestCase(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from django.utils import timezone
+        from datetime import timedelta
+        from app_sales.notification_models import OrderConfirmation
+
+        cache.clear()
+        customer = Customer.objects.create(name="Pipeline Customer", phone_number="09170000000")
+        now = timezone.now()
+        for number, prep_hours in (("1", 2), ("2", 4), ("3", None)):
+            so = SalesOrder.objects.create(customer=customer, so_number=f"SO-F{number}", payment_type='cash')
+            confirmation = OrderConfirmation.objects.create(sales_order=so, customer=customer)
+            created_at = now - timedelta(hours=6)
+            changes = {'created_at': created_at, 'confirmed_at': created_at + timedelta(hours=1)}
+            if prep_hours:
+                changes.update(status='ready_for_pickup', ready_at=created_at + timedelta(hours=1 + prep_hours))
+            OrderConfirmation.objects.filter(id=confirmation.id).update(**changes)
+
+    def test_pipeline_latency(self):
+        from app_sales.fulfillment import FulfillmentReports
+
+        report = FulfillmentReports.pipeline_latency(days=7)
+
+        self.assertEqual(report['stages']['confirmation']['p50'], 1.0)
+        self.assertEqual(report['stages']['preparation']['count'], 2)
+        self.assertEqual(report['stages']['preparation']['p50'], 3.0)
+        self.assertEqual(report['throughput']['created'], 3)
+        self.assertEqual(report['throughput']['ready'], 2)
+        self.assertEqual(report['backlog']['awaiting_preparation'], 1)
+        self.assertEqual(report['backlog']['awaiting_pickup'], 2)
+
+    def test_days_are_business_dates(self):
+        from datetime import date, timedelta
+        from unittest import mock
+        from app_sales.fulfillment import FulfillmentReports
+        from app_sales.notification_models import OrderConfirmation
+        from core import business_dates
+
+        # Just after the yard's midnight, while UTC is still on the previous day
+        day = date(2025, 3, 10)
+        midnight = business_dates.day_start(day)
+        customer = Customer.objects.first()
+        so = SalesOrder.objects.create(customer=customer, so_number="SO-F4", payment_type='cash')
+        confirmation = OrderConfirmation.objects.create(sales_order=so, customer=customer)
+        OrderConfirmation.objects.filter(id=confirmation.id).update(
+            created_at=midnight + timedelta(minutes=10), confirmed_at=midnight + timedelta(minutes=40)
+        )
+
+        with mock.patch('django.utils.timezone.now', return_value=midnight + timedelta(hours=1)):
+            report = FulfillmentReports.pipeline_latency(days=2)
+
+        self.assertEqual([(row['date'], row['created']) for row in report['daily']],
+                         [((day - timedelta(days=1)).isoformat(), 0), (day.isoformat(), 1)])
+        self.assertEqual(report['stages']['confirmation']['p50'], 0.5)
+
+
+class PickupSchedulerTestCase(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from app_inventory.models import Inventory
+        from app_sales.notification_models import PickupSlot
+        from core import business_dates
+
+        self.user = User.objects.create_user(username="cashier", password="testpass123")
+        self.customer = Customer.objects.create(name="Yard Customer", phone_number="09170000001")
+        self.product = LumberProduct.objects.create(
+            name="Scheduled Lumber",
+            category=LumberCategory.objects.create(name="Scheduling"),
+            thickness=2,
+            width=4,
+            length=12,  # 8 BF per piece
+            price_per_board_foot=10.0,
+            sku="SCHED-SKU"
+        )
+        Inventory.objects.create(product=self.product, quantity_pieces=1000, total_board_feet=8000)
+
+        self.tomorrow = business_dates.business_date() + timedelta(days=1)
+        self.day_after = self.tomorrow + timedelta(days=1)
+        # Tomorrow only has room for one more order of up to 100 BF
+        PickupSlot.objects.create(date=self.tomorrow, order_count=1, board_feet=100,
+                                  order_capacity=3, board_feet_capacity=200)
+
+    def create_order(self, pieces):
+        """Create an order and return its OrderConfirmation"""
+        from app_sales.services import SalesService
+        from app_sales.notification_models import OrderConfirmation
+
+        so = SalesService.create_sales_order(
+            self.customer.id, [{'product_id': self.product.id, 'quantity_pieces': pieces}], created_by=self.user
+        )
+        return OrderConfirmation.objects.get(sales_order=so)
+
+    def test_assigns_earliest_day_with_spare_capacity(self):
+        from app_sales.notification_models import PickupSlot
+
+        small = self.create_order(10)   # 80 BF fits tomorrow
+        large = self.create_order(20)   # 160 BF does not
+        third = self.create_order(1)    # tomorrow is now at its order capacity
+
+        self.assertEqual(small.estimated_pickup_date, self.tomorrow)
+        self.assertEqual(large.estimated_pickup_date, self.day_after)
+        self.assertEqual(third.estimated_pickup_date, self.tomorrow)
+
+        slot = PickupSlot.objects.get(date=self.tomorrow)
+        self.assertEqual((slot.order_count, slot.board_feet), (3, 188))
+
+    def test_preparing_an_order_frees_its_slot(self):
+        from app_sales.notification_models import PickupSlot
+        from app_sales.scheduling import PickupScheduler
+
+        self.create_order(10).mark_ready_for_pickup()
+
+        slot = PickupSlot.objects.get(date=self.tomorrow)
+        self.assertEqual((slot.order_count, slot.board_feet), (1, 100))
+
+        # The seeded load has no queued orders behind it, so a rebuild clears it
+        self.assertEqual(PickupScheduler.rebuild(), {'days': 0, 'orders': 0})
+        self.assertEqual(PickupSlot.objects.get(date=self.tomorrow).order_count, 0)
+
+    def test_schedule_starts_on_the_business_date(self):
+        from datetime import date, timedelta
+        from unittest import mock
+        from app_sales.scheduling import PickupScheduler
+        from core import business_dates
+
+        # Just after the yard's midnight, while UTC is still on the previous day
+        midnight = business_dates.day_start(date(2025, 3, 10))
+        with mock.patch('django.utils.timezone.now', return_value=midnight + timedelta(hours=1)):
+            schedule = PickupScheduler.schedule(days=1)
+
+        self.assertEqual(schedule[0]['date'], '2025-03-10')
+
+    def test_deleting_an_order_frees_its_slot(self):
+        from app_sales.notification_models import PickupSlot
+
+        order_id = self.create_order(10).sales_order_id
+        self.client.force_login(self.user)
+
+        self.assertEqual(self.client.delete(f'/api/sales-orders/{order_id}/').status_code, 204)
+
+        slot = PickupSlot.objects.get(date=self.tomorrow)
+        self.assertEqual((slot.order_count, slot.board_feet), (1, 100))
+
+    def test_reserve_does_not_scan_the_queue(self):
+        from app_sales.scheduling import PickupScheduler
+
+        # savepoint, horizon read, counter update, release
+        with self.assertNumQueries(4):
+            PickupScheduler.reserve(50)
+
+
+class BulkOrderConfirmationTestCase(TestCase):
+    def setUp(self):
+        from app_sales.notification_models import OrderConfirmation
+
+        self.admin = User.objects.create_user(username="yardadmin", password="testpass123")
+        self.customer = Customer.objects.create(name="Bulk Customer", email="bulk@example.com", phone_number="09170000002")
+        self.orders = []
+        for number in range(4):
+            so = SalesOrder.objects.create(customer=self.customer, so_number=f"SO-B{number}", payment_type='cash')
+            OrderConfirmation.objects.create(sales_order=so, customer=self.customer)
+            self.orders.append(so)
+
+    def test_bulk_confirm_matches_single_confirmation(self):
+        from app_delivery.models import Delivery
+        from app_sales.notification_models import OrderConfirmation, OrderNotification
+        from app_sales.services import OrderConfirmationService
+
+        # The single-order flow: saving a confirmed order fires the signal
+        single = self.orders[0]
+        single.is_confirmed = True
+        single.save()
+
+        ids = [so.id for so in self.orders[1:]] + [single.id, 999999]
+        result = OrderConfirmationService.bulk_confirm_orders(ids, confirmed_by=self.admin)
+
+        self.assertEqual((result['success'], result['failed'], result['ready']), (3, 2, 3))
+        self.assertEqual(SalesOrder.objects.filter(is_confirmed=True).count(), 4)
+        self.assertEqual(OrderConfirmation.objects.filter(status='ready_for_pickup').count(), 4)
+        self.assertEqual(Delivery.objects.filter(status='pending').count(), 4)
+        self.assertEqual(len(set(Delivery.objects.values_list('delivery_number', flat=True))), 4)
+
+        notifications = OrderNotification.objects.filter(notification_type='ready_for_pickup')
+        self.assertEqual(notifications.count(), 4)
+        self.assertEqual(
+            notifications.get(sales_order=self.orders[1]).title, "Your Order SO-B1 is Ready for Pickup!"
+        )
+
+    def test_bulk_mark_picked_up_in_constant_queries(self):
+        from app_delivery.models import Delivery
+        from app_sales.notification_models import OrderNotification
+        from app_sales.services import OrderConfirmationService
+
+        ids = [so.id for so in self.orders]
+        OrderConfirmationService.bulk_mark_ready(ids)
+
+        # savepoint, confirmations, confirmation UPDATE, delivery UPDATE, notification INSERT,
+        # outbox INSERT, release
+        with self.assertNumQueries(7):
+            result = OrderConfirmationService.bulk_mark_picked_up(ids)
+
+        self.assertEqual(result['success'], 4)
+        self.assertEqual(Delivery.objects.filter(status='delivered').count(), 4)
+        self.assertEqual(OrderNotification.objects.filter(title__endswith="Picked Up").count(), 4)
+        self.assertEqual(OrderConfirmationService.bulk_mark_picked_up(ids[:1])['failed'], 1)
+
+
+class OrderConfirmationSignalTestCase(TestCase):
+    def setUp(self):
+        from app_sales.notification_models import OrderConfirmation
+
+        customer = Customer.objects.create(name="Signal Customer", phone_number="09170000003")
+        so = SalesOrder.objects.create(customer=customer, so_number="SO-S1", payment_type='cash')
+        OrderConfirmation.objects.create(sales_order=so, customer=customer)
+        self.order = SalesOrder.objects.get(id=so.id)
+
+    def test_routine_save_runs_no_extra_queries(self):
+        # Amounts move the customer account; an edit that touches none runs only the UPDATE
+        self.order.notes = 'Deliver to the side gate'
+        with self.assertNumQueries(1):
+            self.order.save()
+
+    def test_confirming_marks_order_ready_once(self):
+        from app_sales.notification_models import OrderConfirmation, OrderNotification
+
+        self.order.is_confirmed = True
+        self.order.save()
+        self.assertEqual(OrderConfirmation.objects.get(sales_order=self.order).status, 'ready_for_pickup')
+
+        # Saving an already-confirmed order does not touch the confirmation again
+        with self.assertNumQueries(1):
+            self.order.save()
+        self.assertEqual(OrderNotification.objects.filter(sales_order=self.order).count(), 1)
+
+
+class NotificationUpdatesTestCase(TestCase):
+    def setUp(self):
+        from app_sales.notification_models import OrderNotification
+
+        self.user = User.objects.create_user(
+            username="streamer", email="stream@example.com", password="testpass123", user_type='customer'
+        )
+        self.customer = Customer.objects.create(name="Stream Customer", email="stream@example.com")
+        self.order = SalesOrder.objects.create(customer=self.customer, so_number="SO-E1", payment_type='cash')
+        self.first = OrderNotification.objects.create(
+            sales_order=self.order, customer=self.customer, notification_type='order_confirmed',
+            title="First", message="First"
+        )
+
+    def test_version_follows_the_database(self):
+        from django.test import override_settings
+        from app_sales.notification_events import NotificationEvents
+        from app_sales.notification_models import OrderNotification
+        from app_sales.services import OrderConfirmationService
+
+        with self.assertNumQueries(1):
+            version = NotificationEvents.version(self.customer.id)
+        with override_settings(NOTIFICATION_LONG_POLL_WAITERS=1):
+            self.assertEqual(NotificationEvents.wait(self.customer.id, version, timeout=0.01), version)
+
+            # As written by another process: no publish() in this one
+            OrderNotification.objects.bulk_create([OrderNotification(
+                sales_order=self.order, customer=self.customer, notification_type='order_ready',
+                title="Second", message="Second"
+            )])
+            changed = NotificationEvents.wait(self.customer.id, version, timeout=0.01)
+        self.assertNotEqual(changed, version)
+
+        OrderConfirmationService.mark_all_notifications_read(self.customer.id)
+        self.assertNotEqual(NotificationEvents.version(self.customer.id), changed)
+
+    def test_waiters_are_bounded(self):
+        from django.test import override_settings
+        from app_sales.notification_events import NotificationEvents
+
+        version = NotificationEvents.version(self.customer.id)
+        # Sync WSGI default: never hold a request
+        self.assertIsNone(NotificationEvents.wait(self.customer.id, version, timeout=5))
+
+        NotificationEvents._waiting += 1
+        try:
+            with override_settings(NOTIFICATION_LONG_POLL_WAITERS=1):
+                self.assertIsNone(NotificationEvents.wait(self.customer.id, version, timeout=5))
+        finally:
+            NotificationEvents._waiting -= 1
+
+    def test_long_poll_returns_count_and_new_notifications(self):
+        from django.test import override_settings
+        from app_sales.notification_events import NotificationEvents
+        from app_sales.notification_views import BUSY_RETRY_SECONDS
+
+        self.client.force_login(self.user)
+        data = self.client.get(reverse('notification-updates')).json()
+        self.assertEqual((data['changed'], data['unread_count'], data['last_id']), (True, 1, self.first.id))
+
+        data = self.client.get(
+            reverse('notification-updates'), {'version': 'stale', 'after_id': self.first.id - 1}
+        ).json()
+        self.assertEqual(data['version'], NotificationEvents.version(self.customer.id))
+        self.assertEqual([item['title'] for item in data['notifications']], ["First"])
+        # Not held under sync WSGI, so the client backs off
+        self.assertEqual(data['poll_after'], BUSY_RETRY_SECONDS)
+
+        with override_settings(NOTIFICATION_LONG_POLL_WAITERS=1):
+            data = self.client.get(reverse('notification-updates'), {'version': 'stale'}).json()
+        self.assertEqual((data['changed'], data['poll_after']), (True, 0))
+
+    def test_long_poll_declines_users_without_customer(self):
+        self.client.force_login(User.objects.create_user(username="staff", password="testpass123"))
+
+        self.assertEqual(self.client.get(reverse('notification-updates')).status_code, 204)
+
+
+class NotificationRetentionTestCase(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from app_sales.notification_models import OrderNotification
+
+        self.customer = Customer.objects.create(name="Retention Customer", phone_number="09170000004")
+        order = SalesOrder.objects.create(customer=self.customer, so_number="SO-R1", payment_type='cash')
+        for number in range(5):
+            OrderNotification.objects.create(
+                sales_order=order, customer=self.customer, notification_type='order_confirmed',
+                title=f"Notice {number}", message="..."
+            )
+        # Three old notifications, two of them read
+        old = list(OrderNotification.objects.order_by('id').values_list('id', flat=True)[:3])
+        OrderNotification.objects.filter(id__in=old).update(created_at=timezone.now() - timedelta(days=120))
+        OrderNotification.objects.filter(id__in=old[:2]).update(is_read=True)
+
+    def test_mark_all_read_in_one_update(self):
+        from app_sales.services import OrderConfirmationService
+
+        # savepoint, UPDATE, release
+        with self.assertNumQueries(3):
+            count = OrderConfirmationService.mark_all_notifications_read(self.customer.id)
+
+        self.assertEqual(count, 3)
+        self.assertFalse(self.customer.notifications.filter(is_read=False).exists())
+
+    def test_archives_old_read_notifications_in_batches(self):
+        from app_sales.notification_models import OrderNotificationArchive
+        from app_sales.retention import NotificationArchiver
+
+        self.assertEqual(NotificationArchiver.archive(days=90, batch_size=1), {'archived': 2, 'batches': 2})
+
+        self.assertEqual(self.customer.notifications.count(), 3)
+        self.assertEqual(
+            list(OrderNotificationArchive.objects.order_by('original_id').values_list('title', flat=True)),
+            ["Notice 0", "Notice 1"]
+        )
+
+
+class FailingSmsAdapter:
+    """Outbox adapter for tests that rejects every message"""
+
+    def send_batch(self, messages):
+        raise ConnectionError("Gateway unavailable")
+
+
+class OutboxTestCase(TestCase):
+    def setUp(self):
+        from app_sales.notification_models import OrderNotification
+
+        self.customer = Customer.objects.create(
+            name="Outbox Customer", email="outbox@example.com", phone_number="09170000005"
+        )
+        self.order = SalesOrder.objects.create(customer=self.customer, so_number="SO-O1", payment_type='cash')
+        OrderNotification.objects.create(
+            sales_order=self.order, customer=self.customer, notification_type='ready_for_pickup',
+            title="Ready", message="Your order is ready"
+        )
+
+    def test_notifications_are_queued_per_channel(self):
+        from app_sales.notification_models import OutboundMessage
+
+        self.assertEqual(
+            sorted(OutboundMessage.objects.values_list('channel', 'recipient')),
+            [('email', "outbox@example.com"), ('sms', "09170000005")]
+        )
+
+    def test_worker_sends_and_retries(self):
+        from django.core import mail
+        from django.test import override_settings
+        from app_sales.notification_models import OutboundMessage
+        from app_sales.outbox import Outbox
+
+        adapters = {'email': 'app_sales.outbox.EmailAdapter', 'sms': 'app_sales.tests.FailingSmsAdapter'}
+        with override_settings(OUTBOX_ADAPTERS=adapters):
+            summary = Outbox.process()
+
+        self.assertEqual(summary['email'], {'sent': 1, 'retried': 0, 'failed': 0})
+        self.assertEqual(summary['sms'], {'sent': 0, 'retried': 1, 'failed': 0})
+        self.assertEqual([message.to for message in mail.outbox], [["outbox@example.com"]])
+
+        sms = OutboundMessage.objects.get(channel='sms')
+        self.assertEqual((sms.status, sms.attempts, sms.last_error), ('pending', 1, "Gateway unavailable"))
+        # Not due again until the backoff has passed
+        self.assertEqual(Outbox.claim('sms'), [])
+
+
+class LedgerExportTestCase(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from decimal import Decimal
+        from django.utils import timezone
+        from app_sales.models import SalesOrderItem
+        from core import business_dates
+
+        category = LumberCategory.objects.create(name="Export Category")
+        self.products = [
+            LumberProduct.objects.create(
+                name=f"Export Lumber {index}", category=category, thickness=2, width=4, length=10,
+                price_per_board_foot=10, sku=f"EXP-{index}"
+            )
+            for index in range(2)
+        ]
+        self.customers = [
+            Customer.objects.create(name=name, phone_number="09170000000") for name in ("Ana", "Ben")
+        ]
+        for number, (customer, product, days_ago) in enumerate(
+            [(self.customers[0], self.products[0], 0), (self.customers[1], self.products[1], 0),
+             (self.customers[0], self.products[1], 40)]
+        ):
+            so = SalesOrder.objects.create(
+                customer=customer, so_number=f"SO-EXP{number}", payment_type='cash', total_amount=Decimal('66.70')
+            )
+            SalesOrderItem.objects.create(
+                sales_order=so, product=product, quantity_pieces=1, board_feet=Decimal('6.67'),
+                unit_price=Decimal('10'), subtotal=Decimal('66.70')
+            )
+            created_at = timezone.now() - timedelta(days=days_ago)
+            SalesOrder.objects.filter(id=so.id).update(
+                created_at=created_at, business_date=business_dates.business_date(created_at)
+            )
+
+        self.client.force_login(User.objects.create_user(username="accounting", password="pass1234"))
+
+    def test_csv_streams_filtered_order_lines(self):
+        from core import business_dates
+
+        response = self.client.get('/api/sales-orders/export/', {
+            'customer': self.customers[0].id, 'date_from': business_dates.business_date().isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('SO Number,Order Date,Customer ID'))
+        self.assertIn('SO-EXP0', lines[1])
+        self.assertIn('66.70', lines[1])
+
+    def test_ndjson_one_object_per_line(self):
+        import json
+
+        response = self.client.get('/api/sales-orders/export/', {'output': 'ndjson', 'product': self.products[1].id})
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['so_number'] for row in rows], ['SO-EXP1', 'SO-EXP2'])
+        self.assertEqual(rows[0]['subtotal'], '66.70')
+        self.assertEqual(rows[0]['customer'], 'Ben')
+
+    def test_order_totals_once_and_orders_without_lines(self):
+        import json
+        from decimal import Decimal
+        from app_sales.models import SalesOrderItem
+
+        order = SalesOrder.objects.get(so_number="SO-EXP0")
+        SalesOrderItem.objects.create(
+            sales_order=order, product=self.products[1], quantity_pieces=1, board_feet=Decimal('6.67'),
+            unit_price=Decimal('10'), subtotal=Decimal('66.70')
+        )
+        SalesOrder.objects.create(customer=self.customers[1], so_number="SO-EMPTY", payment_type='cash')
+
+        response = self.client.get('/api/sales-orders/export/', {'output': 'ndjson'})
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['so_number'] for row in rows], ['SO-EXP0', 'SO-EXP0', 'SO-EXP1', 'SO-EXP2', 'SO-EMPTY'])
+        self.assertEqual([row['order_total'] for row in rows[:2]], ['66.70', None])
+        self.assertEqual([row['subtotal'] for row in rows[:2]], ['66.70', '66.70'])
+        self.assertEqual(rows[-1]['order_total'], '0.00')
+        self.assertIsNone(rows[-1]['product_id'])
+
+    def test_invalid_filter_is_rejected(self):
+        response = self.client.get('/api/sales-orders/export/', {'date_from': '01/02/2024'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DailyCloseTestCase(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from decimal import Decimal
+        from django.utils import timezone
+        from core import business_dates
+
+        self.cashier = User.objects.create_user(username="cashier1", password="pass1234", role='cashier')
+        customer = Customer.objects.create(name="Close Customer", phone_number="09170000000")
+        self.today = business_dates.business_date()
+        self.yesterday = self.today - timedelta(days=1)
+        self.two_days_ago = self.today - timedelta(days=2)
+        for number, (day, payment_type, total, paid) in enumerate([
+            (self.two_days_ago, 'cash', '100.00', '100.00'),
+            (self.two_days_ago, 'credit', '250.00', '0.00'),
+            (self.yesterday, 'cash', '80.00', '80.00'),
+            (self.today, 'cash', '40.00', '40.00'),
+        ]):
+            so = SalesOrder.objects.create(
+                customer=customer, so_number=f"SO-Z{number}", payment_type=payment_type, created_by=self.cashier,
+                total_amount=Decimal(total), amount_paid=Decimal(paid), balance=Decimal(total) - Decimal(paid)
+            )
+            created_at = timezone.now() if day == self.today else business_dates.day_start(day) + timedelta(hours=12)
+            SalesOrder.objects.filter(id=so.id).update(created_at=created_at, business_date=day)
+
+    def test_close_pending_freezes_finished_days(self):
+        from decimal import Decimal
+        from app_sales.closing import DailyClose
+        from app_sales.models import DailySalesClose
+
+        closes = DailyClose.close_pending()
+
+        self.assertEqual([close.business_date for close in closes], [self.two_days_ago, self.yesterday])
+        close = closes[0]
+        self.assertEqual(close.order_count, 2)
+        self.assertEqual(close.total_sales, Decimal('350.00'))
+        self.assertEqual(close.outstanding_balance, Decimal('250.00'))
+        self.assertEqual(sorted(close.lines.values_list('payment_type', flat=True)), ['cash', 'credit'])
+        self.assertEqual(DailyClose.close_pending(), [])
+
+    def test_closes_are_immutable(self):
+        from django.core.exceptions import ValidationError
+        from app_sales.closing import DailyClose
+        from app_sales.models import DailySalesClose
+
+        close = DailyClose.close_day(self.yesterday)
+        with self.assertRaises(ValidationError):
+            DailyClose.close_day(self.yesterday)
+        close.total_sales = 0
+        with self.assertRaises(ValidationError):
+            close.save()
+        with self.assertRaises(ValidationError):
+            DailySalesClose.objects.update(total_sales=0)
+        with self.assertRaises(ValidationError):
+            close.delete()
+
+    def test_reports_read_closed_days_from_the_close(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from app_sales.closing import DailyClose
+        from app_sales.reporting import SalesReports
+
+        DailyClose.close_pending()
+        with CaptureQueriesContext(connection) as queries:
+            summary = SalesReports.daily_sales_summary(self.two_days_ago)
+        self.assertFalse(any('app_sales_salesorder' in query['sql'] for query in queries))
+        self.assertTrue(summary['closed'])
+        self.assertEqual(summary['total_sales'], 350.0)
+        self.assertEqual(summary['transactions'], 2)
+
+        totals = DailyClose.period_totals(self.two_days_ago, self.today)
+        self.assertEqual((totals['closed_days'], totals['order_count']), (2, 4))
+        self.assertEqual(float(totals['total_sales']), 470.0)
+        self.assertEqual(totals['by_cashier'][0]['cashier'], 'cashier1')
+        self.assertEqual(
+            [(day['business_date'], day['closed']) for day in DailyClose.daily_totals(self.two_days_ago, self.today)],
+            [(self.two_days_ago, True), (self.yesterday, True), (self.today, False)]
+        )
+
+    def test_closed_days_are_frozen(self):
+        from decimal import Decimal
+        from app_sales.closing import DailyClose
+
+        DailyClose.close_day(self.yesterday)
+        order = SalesOrder.objects.get(business_date=self.yesterday)
+        order.amount_paid, order.balance = Decimal('0.00'), Decimal('80.00')
+        order.save()
+        SalesOrder.objects.create(
+            customer=order.customer, so_number="SO-ZLATE", payment_type='cash', total_amount=Decimal('5.00'),
+            business_date=self.yesterday
+        )
+
+        totals = DailyClose.period_totals(self.yesterday, self.yesterday)
+        self.assertEqual((totals['order_count'], totals['total_sales']), (1, Decimal('80.00')))
+        self.assertEqual((totals['total_paid'], totals['outstanding_balance']), (Decimal('80.00'), Decimal('0.00')))
+        self.assertEqual(DailyClose.daily_totals(self.yesterday, self.yesterday)[0]['total_sales'], Decimal('80.00'))
+
+    def test_close_pending_catches_up_days_before_the_latest_close(self):
+        from app_sales.closing import DailyClose
+
+        DailyClose.close_day(self.yesterday)
+
+        closes = DailyClose.close_pending()
+
+        self.assertEqual([close.business_date for close in closes], [self.two_days_ago])
+        self.assertEqual(closes[0].order_count, 2)
+
+    def test_today_cannot_be_closed_before_it_is_over(self):
+        from django.core.exceptions import ValidationError
+        from app_sales.closing import DailyClose
+        from app_sales.models import DailySalesClose
+
+        with self.assertRaises(ValidationError):
+            DailyClose.close_day(self.today)
+        self.assertEqual(DailyClose.close_day().business_date, self.yesterday)
+        self.assertFalse(DailySalesClose.objects.filter(business_date=self.today).exists())
+
+    def test_pos_close_day_endpoint(self):
+        self.client.force_login(self.cashier)
+
+        response = self.client.post('/api/pos/close_day/', {'date': self.yesterday.isoformat()})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['sales_orders'], 1)
+        self.assertEqual(self.client.post('/api/pos/close_day/', {'date': self.yesterday.isoformat()}).status_code, 400)
+
+        report = self.client.get('/api/pos/daily_report/', {'date': self.yesterday.isoformat()}).json()
+        self.assertTrue(report['closed'])
+        self.assertEqual(report['financial']['total_sales'], 80.0)
+        self.assertEqual(self.client.post('/api/pos/close_day/', {'date': self.today.isoformat()}).status_code, 400)
+
+
+class CashierShiftTestCase(TestCase):
+    def setUp(self):
+        from app_inventory.models import Inventory
+
+        self.cashier = User.objects.create_user(username="drawer1", password="pass1234", role='cashier')
+        self.client.force_login(self.cashier)
+        product = LumberProduct.objects.create(
+            name="Shift Lumber", category=LumberCategory.objects.create(name="Shift Category"),
+            thickness=2, width=6, length=10, price_per_board_foot=10, sku="SHIFT-1"
+        )
+        Inventory.objects.create(product=product, quantity_pieces=100, total_board_feet=1000)
+        self.customer = Customer.objects.create(name="Shift Customer", phone_number="09170000000")
+        self.checkout = {
+            'customer_id': self.customer.id, 'items': [{'product_id': product.id, 'quantity_pieces': 1}],
+            'payment_type': 'cash',
+        }
+
+    def test_running_totals_and_variance(self):
+        from app_sales.models import CashierShift, Receipt
+
+        response = self.client.post('/api/pos/open_shift/', {'opening_float': '1000'}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            self.client.post('/api/pos/open_shift/', {}, content_type='application/json').status_code, 400
+        )
+
+        # One piece of 2x6x10 is 10 board feet, 100.00
+        self.client.post('/api/pos/quick_checkout/', {**self.checkout, 'amount_tendered': 150}, content_type='application/json')
+        self.client.post('/api/pos/quick_checkout/', {**self.checkout, 'amount_tendered': 100}, content_type='application/json')
+
+        shift = CashierShift.objects.get()
+        self.assertEqual(shift.receipt_count, 2)
+        self.assertEqual(shift.total_tendered, 250)
+        self.assertEqual(shift.total_change, 50)
+        self.assertEqual(shift.net_cash, 200)
+        self.assertEqual(Receipt.objects.filter(shift=shift).count(), 2)
+        self.assertEqual(self.client.get('/api/pos/current_shift/').json()['expected_cash'], 1200.0)
+
+        response = self.client.post(
+            '/api/pos/close_shift/', {'counted_cash': '1190.00', 'notes': 'Short'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['variance'], -10.0)
+        self.assertEqual(self.client.get('/api/pos/current_shift/').status_code, 404)
+
+    def test_payment_without_open_shift_has_no_shift(self):
+        from app_sales.models import Receipt
+
+        response = self.client.post('/api/pos/quick_checkout/', {**self.checkout, 'amount_tendered': 100}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(Receipt.objects.get().shift)
+
+
+class SalesCubeTestCase(TestCase):
+    def setUp(self):
+        from app_inventory.models import Inventory
+        from app_sales.services import SalesService
+
+        self.products = [
+            LumberProduct.objects.create(
+                name=f"Cube Lumber {index}", category=LumberCategory.objects.create(name=f"Cube Category {index}"),
+                thickness=2, width=6, length=10, price_per_board_foot=10, sku=f"CUBE-{index}"
+            )
+            for index in range(2)
+        ]
+        for product in self.products:
+            Inventory.objects.create(product=product, quantity_pieces=100, total_board_feet=1000)
+        self.customers = [
+            Customer.objects.create(name=name, phone_number="09170000000") for name in ("Cora", "Dan")
+        ]
+        first, second = self.products
+        self.orders = [
+            SalesService.create_sales_order(customer.id, [
+                {'product_id': product.id, 'quantity_pieces': pieces} for product, pieces in lines
+            ], order_source='customer_order')
+            for customer, lines in [
+                (self.customers[0], [(first, 2), (second, 1)]),
+                (self.customers[0], [(first, 1)]),
+                (self.customers[1], [(second, 3)]),
+            ]
+        ]
+
+    def facts(self):
+        from app_sales.models import SalesFact
+
+        return list(SalesFact.objects.order_by('customer_id', 'product_id').values_list(
+            'business_date', 'customer_id', 'product_id', 'category_id', 'order_count', 'line_count',
+            'quantity_pieces', 'board_feet', 'revenue', 'unit_price_total'
+        ))
+
+    def test_reports_read_the_rollup(self):
+        from app_sales.reporting import SalesReports
+
+        # One fact per customer and product, plus one order row per customer
+        self.assertEqual(len(self.facts()), 5)
+
+        with self.assertNumQueries(1):
+            items = SalesReports.top_items(days=30)
+        # One piece of 2x6x10 is 10 board feet, 100.00
+        self.assertEqual(
+            [(item['product__id'], item['total_pieces'], item['transaction_count'], item['total_revenue'])
+             for item in items],
+            [(self.products[1].id, 4, 2, 400), (self.products[0].id, 3, 2, 300)],
+        )
+
+        customers = SalesReports.top_customers(days=30)
+        self.assertEqual(
+            [(customer['customer_id'], customer['transaction_count'], customer['total_spent']) for customer in customers],
+            [(self.customers[0].id, 2, 400.0), (self.customers[1].id, 1, 300.0)],
+        )
+        self.assertEqual(
+            {row['product__category__name']: row['total_items'] for row in SalesReports.income_by_category(days=30)},
+            {'Cube Category 0': 2, 'Cube Category 1': 2},
+        )
+
+    def test_edits_keep_the_rollup_equal_to_a_rebuild(self):
+        from app_sales.cube import SalesCube
+        from app_sales.services import SalesService
+
+        SalesService.update_sales_order(self.orders[0].id, [{'product_id': self.products[1].id, 'quantity_pieces': 2}])
+        incremental = self.facts()
+
+        self.assertEqual(SalesCube.rebuild(), {'facts': 5})
+        self.assertEqual(self.facts(), incremental)
+
+    def test_model_writes_keep_the_rollup_equal_to_a_rebuild(self):
+        from decimal import Decimal
+        from app_sales.cube import SalesCube
+
+        order = self.orders[0]
+        order.sales_order_items.filter(product=self.products[1]).get().delete()
+        order.customer = self.customers[1]
+        order.total_amount = Decimal('200.00')
+        order.save()
+        self.orders[2].delete()
+        incremental = self.facts()
+
+        self.assertEqual(SalesCube.rebuild(), {'facts': 4})
+        self.assertEqual(self.facts(), incremental)
+
+
+class SalesHeatmapTestCase(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.core.cache import cache
+        from app_sales.models import SalesOrderItem
+        from core import business_dates
+
+        cache.clear()
+        customer = Customer.objects.create(name="Heatmap Customer", phone_number="09170000000")
+        product = LumberProduct.objects.create(
+            name="Heatmap Lumber", category=LumberCategory.objects.create(name="Heatmap Category"),
+            thickness=2, width=6, length=10, price_per_board_foot=10, sku="HEAT-1"
+        )
+        today = business_dates.business_date()
+        self.this_monday = today - timedelta(days=today.weekday())
+        last_monday = self.this_monday - timedelta(weeks=1)
+        for number, (day, hour, source) in enumerate([
+            (last_monday, 9, 'point_of_sale'), (last_monday, 9, 'point_of_sale'),
+            (self.this_monday, 14, 'customer_order'),
+        ]):
+            so = SalesOrder.objects.create(
+                customer=customer, so_number=f"SO-H{number}", payment_type='cash', order_source=source
+            )
+            SalesOrderItem.objects.create(
+                sales_order=so, product=product, quantity_pieces=1, board_feet=10, unit_price=100, subtotal=100
+            )
+            SalesOrder.objects.filter(id=so.id).update(
+                created_at=business_dates.day_start(day) + timedelta(hours=hour, minutes=30)
+            )
+
+    def test_cells_by_weekday_and_hour(self):
+        from app_sales.heatmap import SalesHeatmap
+
+        report = SalesHeatmap.heatmap(weeks=2)
+
+        self.assertEqual(report['hours'], list(range(9, 15)))
+        walk_ins = report['sources']['point_of_sale']
+        self.assertEqual(walk_ins['grid'][0][9], {'orders': 2, 'revenue': 200.0, 'board_feet': 20.0, 'level': 4})
+        self.assertEqual(walk_ins['orders'], 2)
+        self.assertEqual(report['sources']['customer_order']['grid'][0][14]['orders'], 1)
+
+    def test_closed_weeks_are_cached(self):
+        from app_sales.heatmap import SalesHeatmap
+        from app_sales.models import SalesOrderItem
+        from core import business_dates
+
+        SalesHeatmap.heatmap(weeks=2)
+        # A write that skips the signals, so last week's version stays
+        SalesOrderItem.objects.filter(
+            sales_order__created_at__lt=business_dates.day_start(self.this_monday)
+        ).update(subtotal=0)
+
+        # Week versions, then only the current week is queried again
+        with self.assertNumQueries(2):
+            report = SalesHeatmap.heatmap(weeks=2)
+        self.assertEqual(report['sources']['point_of_sale']['revenue'], 200.0)
+
+    def test_editing_a_past_week_moves_its_version(self):
+        from app_sales.heatmap import SalesHeatmap
+        from core import business_dates
+
+        SalesHeatmap.heatmap(weeks=2)
+        order = SalesOrder.objects.get(so_number="SO-H0")
+        SalesOrder.objects.filter(id=order.id).update(business_date=business_dates.business_date(order.created_at))
+        self.client.force_login(User.objects.create_user(username="cashier", password="pass1234"))
+
+        # Deleting through the API bumps the week's version; nothing is deleted from the cache
+        self.assertEqual(self.client.delete(f'/api/sales-orders/{order.id}/').status_code, 204)
+
+        report = SalesHeatmap.heatmap(weeks=2)
+        self.assertEqual(report['sources']['point_of_sale']['orders'], 1)
+
+    def test_dashboard_partial(self):
+        self.client.force_login(User.objects.create_user(username="manager", password="pass1234"))
+
+        response = self.client.get('/dashboard/sales_heatmap/', {'weeks': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'title="2 orders')
+
+
+class ReceivablesTestCase(TestCase):
+    def setUp(self):
+        from app_inventory.models import Inventory
+        from app_sales.services import SalesService
+
+        product = LumberProduct.objects.create(
+            name="Receivables Lumber", category=LumberCategory.objects.create(name="Receivables Category"),
+            thickness=2, width=6, length=10, price_per_board_foot=10, sku="AR-1"
+        )
+        Inventory.objects.create(product=product, quantity_pieces=100, total_board_feet=1000)
+        self.customers = [
+            Customer.objects.create(name=name, phone_number="09170000000") for name in ("Ella", "Finn")
+        ]
+        # One piece of 2x6x10 is 10 board feet, 100.00
+        self.orders = [
+            SalesService.create_sales_order(customer.id, [{'product_id': product.id, 'quantity_pieces': pieces}],
+                                            payment_type=payment_type)
+            for customer, pieces, payment_type in [
+                (self.customers[0], 1, 'credit'),
+                (self.customers[0], 2, 'credit'),
+                (self.customers[0], 3, 'cash'),
+                (self.customers[1], 4, 'credit'),
+            ]
+        ]
+
+    def accounts(self):
+        from app_sales.models import CustomerAccount
+
+        return list(CustomerAccount.objects.order_by('customer_id').values_list(
+            'customer_id', 'outstanding_balance', 'credit_balance'
+        ))
+
+    def test_ledger_follows_orders_and_payments(self):
+        from app_sales.receivables import Receivables
+        from app_sales.services import SalesService
+
+        ella, finn = self.customers
+        self.assertEqual(self.accounts(), [(ella.id, 600, 300), (finn.id, 400, 400)])
+
+        SalesService.process_payment(self.orders[1].id, 150)
+        SalesService.process_payment(self.orders[2].id, 300)
+        self.assertEqual(self.accounts(), [(ella.id, 150, 150), (finn.id, 400, 400)])
+
+        # Moving an order to another customer and deleting one
+        order = SalesOrder.objects.get(id=self.orders[0].id)
+        order.customer = finn
+        order.save()
+        SalesOrder.objects.get(id=self.orders[3].id).delete()
+        self.assertEqual(self.accounts(), [(ella.id, 50, 50), (finn.id, 100, 100)])
+
+        # Saves with deferred fields fall back to recomputing the account
+        order = SalesOrder.objects.only('id', 'customer').get(id=self.orders[0].id)
+        order.notes = 'Deferred'
+        order.save(update_fields=['notes'])
+        order.balance = 0
+        order.save(update_fields=['balance'])
+        self.assertEqual(self.accounts(), [(ella.id, 50, 50), (finn.id, 0, 0)])
+
+        incremental = self.accounts()
+        self.assertEqual(Receivables.rebuild(), {'accounts': 2, 'corrected': 0})
+        self.assertEqual(self.accounts(), incremental)
+
+    def test_aging_buckets_in_one_query(self):
+        from datetime import timedelta
+        from app_sales.receivables import Receivables
+        from core import business_dates
+
+        today = business_dates.business_date()
+        for order, age in zip(self.orders, (95, 45, 45, 10)):
+            SalesOrder.objects.filter(id=order.id).update(business_date=today - timedelta(days=age))
+
+        with self.assertNumQueries(1):
+            aging = Receivables.aging()
+        ella, finn = self.customers
+        self.assertEqual(aging['total_outstanding'], 700.0)
+        self.assertEqual(aging['buckets'], {
+            'days_0_30': 400.0, 'days_31_60': 200.0, 'days_61_90': 0.0, 'days_over_90': 100.0,
+        })
+        self.assertEqual(
+            [(row['customer_id'], row['balance'], row['order_count'], row['days_old']) for row in aging['customers']],
+            [(finn.id, 400.0, 1, 10), (ella.id, 300.0, 2, 95)],
+        )
+
+        overdue = Receivables.aging(min_age=30)
+        self.assertEqual([row['customer_id'] for row in overdue['customers']], [ella.id])
+
+        statement = Receivables.statement(ella.id)
+        self.assertEqual(
+            (statement['outstanding_balance'], statement['credit_balance'], statement['open_credit_orders']),
+            (600.0, 300.0, 2),
+        )
+        self.assertEqual(statement['buckets']['days_over_90'], 100.0)
+
+    def test_account_counters_and_summary(self):
+        from app_sales.models import CustomerAccount
+        from app_sales.receivables import Receivables
+        from app_sales.services import SalesService
+
+        ella, finn = self.customers
+        SalesService.process_payment(self.orders[2].id, 300)
+        order = SalesOrder.objects.get(id=self.orders[3].id)
+        order.payment_type = 'partial'
+        order.save()
+
+        counters = ('order_count', 'credit_order_count', 'total_purchases', 'total_paid')
+        incremental = list(CustomerAccount.objects.order_by('customer_id').values_list('customer_id', *counters))
+        self.assertEqual(incremental, [(ella.id, 3, 2, 600, 300), (finn.id, 1, 0, 400, 0)])
+
+        with self.assertNumQueries(1):
+            summary = SalesService.get_customer_account_summary(ella.id)
+        self.assertEqual(
+            (summary['total_orders'], summary['credit_orders'], summary['total_purchases'], summary['total_paid'],
+             summary['outstanding_balance'], summary['credit_balance']),
+            (3, 2, 600.0, 300.0, 300.0, 300.0),
+        )
+
+        # Drift from a queryset update is repaired by a rebuild
+        SalesOrder.objects.filter(id=self.orders[3].id).update(amount_paid=100, balance=300)
+        self.assertEqual(Receivables.rebuild(), {'accounts': 2, 'corrected': 1})
+        self.assertEqual(
+            CustomerAccount.objects.values_list('total_paid', 'outstanding_balance').get(customer=finn),
+            (100, 300),
+        )
@@ -11,6 +11,10 @@ from decimal import Decimal
 from app_sales.models import Customer, SalesOrder, SalesOrderItem, Receipt
 from app_sales.serializers import CustomerSerializer, SalesOrderSerializer, SalesOrderItemSerializer, ReceiptSerializer
 from app_sales.services import SalesService, OrderConfirmationService
+from app_sales.receivables import Receivables
+from core import business_dates
+from core.data_exports import DataExports
+from core.report_engine import Column
 
 
 class CustomerViewSet(viewsets.ModelViewSet):
@@ -25,6 +29,12 @@ class CustomerViewSet(viewsets.ModelViewSet):
         summary = SalesService.get_customer_account_summary(pk)
         return Response(summary)
     
+    @action(detail=True, methods=['get'])
+    def statement(self, request, pk=None):
+        """Get customer statement of account (ledger balances and credit aging)"""
+        customer = self.get_object()
+        return Response(Receivables.statement(customer.id))
+    
 
 class SalesOrderViewSet(viewsets.ModelViewSet):
     """API endpoint for sales orders"""
@@ -83,6 +93,23 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'])
+    def bulk_confirm(self, request):
+        """
+        Confirm many sales orders (admin only) and notify their customers
+        
+        Expected payload:
+        {
+            "sales_order_ids": [1, 2, 3]
+        }
+        """
+        sales_order_ids = request.data.get('sales_order_ids', [])
+        if not sales_order_ids:
+            return Response({'error': 'sales_order_ids is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = OrderConfirmationService.bulk_confirm_orders(sales_order_ids, confirmed_by=request.user)
+        return Response(result)
+    
     @action(detail=False, methods=['post'])
     def create_order(self, request):
         """
@@ -165,8 +192,8 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def today_sales(self, request):
         """Get today's sales"""
-        today = timezone.now().date()
-        orders = SalesOrder.objects.filter(created_at__date=today)
+        today = business_dates.business_date()
+        orders = SalesOrder.objects.filter(business_date=today)
         
         total = orders.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0')
         
@@ -180,8 +207,8 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def payment_type_summary(self, request):
         """Get sales summary by payment type"""
-        today = timezone.now().date()
-        orders = SalesOrder.objects.filter(created_at__date=today)
+        today = business_dates.business_date()
+        orders = SalesOrder.objects.filter(business_date=today)
         
         summary = orders.values('payment_type').annotate(
             count=Count('id'),
@@ -190,6 +217,51 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
         )
         
         return Response(list(summary))
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream order lines as CSV or NDJSON
+        
+        One row per item, order fields repeated; the order's money columns are
+        only on its first line, and an order without lines gets one row with
+        empty item columns.
+        
+        Query params: output (csv/ndjson), date_from, date_to, customer, product
+        """
+        params = request.query_params
+        try:
+            output = DataExports.output(params)
+            orders = SalesOrder.objects.order_by('id', 'sales_order_items__id')
+            orders = DataExports.filter_dates(orders, params)
+            orders = DataExports.filter_ids(orders, params, {
+                'customer': 'customer_id',
+                'product': 'sales_order_items__product_id',
+            })
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        columns = [
+            Column('SO Number', 'so_number'),
+            Column('Order Date', 'created_at', fmt='datetime', key='order_date'),
+            Column('Customer ID', 'customer_id', fmt='int'),
+            Column('Customer', 'customer__name', key='customer'),
+            Column('Payment Type', 'payment_type'),
+            Column('Order Total', 'total_amount', fmt='money', key='order_total'),
+            Column('Discount', 'discount_amount', fmt='money'),
+            Column('Amount Paid', 'amount_paid', fmt='money'),
+            Column('Balance', 'balance', fmt='money'),
+            Column('Product ID', 'sales_order_items__product_id', fmt='int', key='product_id'),
+            Column('Product', 'sales_order_items__product__name', key='product'),
+            Column('Pieces', 'sales_order_items__quantity_pieces', fmt='int', key='quantity_pieces'),
+            Column('Board Feet', 'sales_order_items__board_feet', fmt='number', key='board_feet'),
+            Column('Unit Price', 'sales_order_items__unit_price', fmt='money', key='unit_price'),
+            Column('Subtotal', 'sales_order_items__subtotal', fmt='money', key='subtotal'),
+        ]
+        return DataExports.response(
+            orders, columns, output, 'sales_order_lines',
+            group_by='id', once={'order_total', 'discount_amount', 'amount_paid', 'balance'},
+        )
 
 
 class ReceiptViewSet(viewsets.ModelViewSet):
@@ -235,8 +307,8 @@ class ReceiptViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def today_receipts(self, request):
         """Get today's receipts"""
-        today = timezone.now().date()
-        receipts = Receipt.objects.filter(created_at__date=today)
+        today = business_dates.business_date()
+        receipts = Receipt.objects.filter(business_date=today)
         
         total = receipts.aggregate(Sum('sales_order__total_amount'))['sales_order__total_amount__sum'] or Decimal('0')
         
@@ -261,3 +333,38 @@ class ReceiptViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
         except Receipt.DoesNotExist:
             return Response({'error': 'Receipt not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream receipts as CSV or NDJSON
+        
+        Query params: output (csv/ndjson), date_from, date_to, customer,
+        product (receipts of orders containing the product)
+        """
+        params = request.query_params
+        try:
+            output = DataExports.output(params)
+            receipts = Receipt.objects.order_by('id')
+            receipts = DataExports.filter_dates(receipts, params)
+            receipts = DataExports.filter_ids(receipts, params, {'customer': 'sales_order__customer_id'})
+            if params.get('product'):
+                # Subquery rather than a join, so a receipt is listed once
+                receipts = receipts.filter(sales_order_id__in=SalesOrderItem.objects.filter(
+                    product_id=DataExports.parse_id(params['product'], 'product')
+                ).values('sales_order_id'))
+        except ValidationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        columns = [
+            Column('Receipt Number', 'receipt_number'),
+            Column('Date', 'created_at', fmt='datetime'),
+            Column('SO Number', 'sales_order__so_number', key='so_number'),
+            Column('Customer ID', 'sales_order__customer_id', fmt='int', key='customer_id'),
+            Column('Customer', 'sales_order__customer__name', key='customer'),
+            Column('Order Total', 'sales_order__total_amount', fmt='money', key='order_total'),
+            Column('Amount Tendered', 'amount_tendered', fmt='money'),
+            Column('Change', 'change', fmt='money'),
+            Column('Created By', 'created_by__username', key='created_by'),
+        ]
+        return DataExports.response(receipts, columns, output, 'receipts')
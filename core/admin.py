@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from core.models import CustomUser
+from django.utils import timezone
+from core.models import BackgroundTask, CustomUser, ReportExport
 
 
 @admin.register(CustomUser)
@@ -10,3 +11,26 @@ class CustomUserAdmin(BaseUserAdmin):
     )
     list_display = ('username', 'email', 'first_name', 'last_name', 'role', 'is_active')
     list_filter = BaseUserAdmin.list_filter + ('role',)
+
+
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task_name', 'status', 'priority', 'attempts', 'run_at', 'finished_at', 'locked_by')
+    list_filter = ('status', 'task_name')
+    search_fields = ('task_name', 'error')
+    readonly_fields = ('started_at', 'finished_at', 'locked_by', 'result', 'error', 'created_at')
+    actions = ['run_again']
+
+    def run_again(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='queued', run_at=timezone.now(), attempts=0, error='', locked_by=''
+        )
+        self.message_user(request, f"{updated} task(s) queued again.")
+    run_again.short_description = "Queue selected tasks again"
+
+
+@admin.register(ReportExport)
+class ReportExportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'report_type', 'status', 'size', 'requested_by', 'created_at', 'last_accessed_at')
+    list_filter = ('status', 'report_type')
+    readonly_fields = ('key', 'params', 'file', 'size', 'error', 'task', 'created_at', 'finished_at', 'last_accessed_at')
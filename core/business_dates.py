@@ -0,0 +1,26 @@
+"""
+Business dates: calendar days in the yard's time zone
+
+Timestamps are stored in UTC, but a sales day runs from midnight to midnight
+at the yard (settings.BUSINESS_TIME_ZONE). Models that are reported per day
+store that date in an indexed business_date column, so daily queries filter
+on a plain date instead of wrapping created_at in a date function.
+"""
+from datetime import datetime, time
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.utils import timezone
+
+
+def business_timezone():
+    return ZoneInfo(getattr(settings, 'BUSINESS_TIME_ZONE', settings.TIME_ZONE))
+
+
+def business_date(value=None):
+    """Business date of an aware datetime (default: now); also the business_date field default"""
+    return timezone.localtime(value or timezone.now(), business_timezone()).date()
+
+
+def day_start(day):
+    """Aware datetime of the yard's midnight starting a business date"""
+    return timezone.make_aware(datetime.combine(day, time.min), business_timezone())
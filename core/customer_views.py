@@ -2,9 +2,10 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Sum, Count
+from django.db.models import Q
 from app_inventory.models import LumberProduct, LumberCategory, Inventory
 from app_sales.models import Customer as SalesCustomer, SalesOrder
+from app_sales.receivables import Receivables
 from app_sales.services import SalesService
 
 
@@ -65,11 +66,9 @@ def customer_browse_products(request):
         sales_customer = SalesService.get_customer_for_user(request.user)
         if sales_customer:
             sales_orders = sales_customer.sales_orders.all().order_by("-created_at")[:5]
-            stats = sales_customer.sales_orders.aggregate(
-                total=Sum("total_amount"), count=Count("id")
-            )
-            total_spent = stats["total"] or 0
-            order_count = stats["count"] or 0
+            account = Receivables.account(sales_customer)
+            total_spent = account.total_purchases
+            order_count = account.order_count
     except:
         pass
 
@@ -134,11 +133,9 @@ def customer_my_orders(request):
         sales_customer = SalesService.get_customer_for_user(request.user)
         if sales_customer:
             sales_orders = sales_customer.sales_orders.all().order_by("-created_at")
-            stats = sales_customer.sales_orders.aggregate(
-                total=Sum("total_amount"), count=Count("id")
-            )
-            total_spent = stats["total"] or 0
-            order_count = stats["count"] or 0
+            account = Receivables.account(sales_customer)
+            total_spent = account.total_purchases
+            order_count = account.order_count
     except:
         pass
 
@@ -201,11 +198,9 @@ def customer_profile(request):
     try:
         sales_customer = SalesService.get_customer_for_user(request.user)
         if sales_customer:
-            stats = sales_customer.sales_orders.aggregate(
-                total=Sum("total_amount"), count=Count("id")
-            )
-            total_spent = stats["total"] or 0
-            order_count = stats["count"] or 0
+            account = Receivables.account(sales_customer)
+            total_spent = account.total_purchases
+            order_count = account.order_count
     except:
         pass
 
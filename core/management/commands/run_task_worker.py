@@ -0,0 +1,90 @@
+"""
+Management command to run queued background tasks
+Usage: python manage.py run_task_worker [--processes 4] [--interval 2] [--once]
+
+Runs @task functions from the apps' tasks modules in a process pool.
+Start one or more of these alongside the web server; --once drains what
+is due and exits (handy from cron).
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from core.task_queue import TaskQueue, _execute, _init_worker_process
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=2,
+            help='Tasks run in parallel by this worker (default: 2)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2,
+            help='Seconds between queue polls when idle (default: 2)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no task is due instead of polling'
+        )
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes < 1:
+            raise CommandError('--processes must be at least 1')
+
+        tasks = TaskQueue.load_tasks()
+        worker_id = TaskQueue.worker_id()
+        self.stdout.write(f'Worker {worker_id}: {len(tasks)} task type(s), {processes} process(es)')
+
+        # Children must open their own database connections
+        connections.close_all()
+        in_flight = {}
+        totals = {'succeeded': 0, 'failed': 0}
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker_process) as pool:
+            try:
+                while True:
+                    TaskQueue.requeue_stale()
+                    for task_row in TaskQueue.claim(processes - len(in_flight), worker_id):
+                        future = pool.submit(_execute, task_row.task_name, task_row.args, task_row.kwargs)
+                        in_flight[future] = task_row
+
+                    if not in_flight:
+                        if options['once']:
+                            break
+                        time.sleep(options['interval'])
+                        continue
+
+                    done, _ = wait(in_flight, timeout=options['interval'], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task_row = in_flight.pop(future)
+                        self.record(task_row, future, totals)
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping; waiting for running tasks')
+                for future, task_row in in_flight.items():
+                    self.record(task_row, future, totals)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['succeeded']} task(s) succeeded, {totals['failed']} failed or will retry"
+        ))
+
+    def record(self, task_row, future, totals):
+        """Store the outcome of a finished pool future"""
+        try:
+            result = future.result()
+        except Exception as exc:
+            TaskQueue.fail(task_row, f'{type(exc).__name__}: {exc}')
+            totals['failed'] += 1
+            self.stdout.write(self.style.WARNING(f'{task_row.task_name} #{task_row.id} failed: {exc}'))
+            return
+        if TaskQueue.record(task_row, result):
+            totals['succeeded'] += 1
+        else:
+            totals['failed'] += 1
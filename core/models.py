@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
+from django.core.serializers.json import DjangoJSONEncoder
 
 # Role choices for users
 ROLE_CHOICES = [
@@ -97,3 +98,81 @@ class CustomerProfile(models.Model):
 
     def __str__(self):
         return f"{self.user.get_full_name()} - Customer"
+
+
+class BackgroundTask(models.Model):
+    """A unit of work queued for the run_task_worker command (see core.task_queue)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    # Dotted path of the @task function, e.g. 'app_sales.tasks.rebuild_pickup_schedule'
+    task_name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder)
+    kwargs = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    priority = models.SmallIntegerField(default=0, help_text='Higher runs first')
+    run_at = models.DateTimeField(help_text='Not started before this time')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+
+    locked_by = models.CharField(max_length=100, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+            models.Index(fields=['task_name', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} #{self.pk} - {self.get_status_display()}"
+
+
+class ReportExport(models.Model):
+    """A rendered report file, shared by every request with the same report, parameters and data"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
+    # sha256 of report type, parameters and data version (see core.report_exports)
+    key = models.CharField(max_length=64, unique=True)
+    report_type = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='report_exports/', blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    requested_by = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='report_exports'
+    )
+    task = models.ForeignKey(BackgroundTask, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_accessed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'last_accessed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type} export #{self.pk} - {self.get_status_display()}"
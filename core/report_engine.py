@@ -0,0 +1,607 @@
+"""
+Report rendering engine for PDF, CSV and XLSX exports
+
+A report is a title plus a sequence of blocks (KPI summaries, tables,
+detail grids, headings and notes). Table rows are read lazily, usually
+from a queryset's .iterator(), and every renderer consumes them as it
+writes, so CSV and XLSX memory stays flat however many rows a report has:
+
+    report = Report('Stock Levels Report', [
+        Section('Inventory', [
+            Column('Product', 'product__name', width=2.2),
+            Column('Pieces', 'quantity_pieces', fmt='int'),
+            Column('Board Feet', 'total_board_feet', fmt='number'),
+        ], Inventory.objects.values('product__name', 'quantity_pieces', 'total_board_feet').iterator()),
+    ])
+    render(report, 'xlsx', stream)
+
+PDF tables are split into LongTables of PDF_CHUNK_ROWS rows with the
+header repeated on every page, and the flowable list handed to ReportLab is
+filled on demand. ReportLab still keeps every finished page until the
+document is saved, so PDF memory grows with the page count: a PDF holds
+at most PDF_MAX_ROWS table rows and ends the table with a note pointing
+to the CSV/XLSX export, which has them all.
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4, landscape, letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import LongTable, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+CURRENCY = '₱'
+PRIMARY_COLOR = '#1e3a8a'
+PDF_CHUNK_ROWS = 250
+# Table rows per PDF (about 20 MB of finished pages at 40k rows)
+PDF_MAX_ROWS = 5000
+
+
+class Column:
+    """
+    A report column
+
+    Args:
+        label: Header text
+        value: Dict key or attribute path ('customer__name' works on both), or callable(row)
+        width: PDF width in inches
+        fmt: None (text), 'int', 'number', 'money', 'percent', 'date' or 'datetime'
+        decimals: Decimal places of 'number' (default 2)
+        align: PDF alignment (default: RIGHT for numbers, LEFT otherwise)
+        max_length: Truncate text in the PDF to this many characters
+        key: Name used in totals (default: value when it is a string, else label)
+    """
+
+    NUMERIC = ('int', 'number', 'money', 'percent')
+
+    def __init__(self, label, value, width=1.2, fmt=None, decimals=2, align=None, max_length=None,
+                 key=None, date_format='%Y-%m-%d'):
+        self.label = label
+        self.value = value
+        self.width = width
+        self.fmt = fmt
+        self.decimals = decimals
+        self.align = align or ('RIGHT' if fmt in self.NUMERIC else 'LEFT')
+        self.max_length = max_length
+        self.key = key or (value if isinstance(value, str) else label)
+        self.date_format = date_format
+
+    def get(self, row):
+        """Raw value of this column in a row"""
+        if callable(self.value):
+            return self.value(row)
+        if isinstance(row, dict):
+            return row.get(self.value)
+        value = row
+        for part in self.value.split('__'):
+            value = getattr(value, part, None)
+            if value is None:
+                break
+        return value
+
+    def text(self, value):
+        """Value formatted for display (PDF)"""
+        if value is None or value == '':
+            return '-'
+        if self.fmt == 'money':
+            return f"{CURRENCY}{float(value):,.2f}"
+        if self.fmt == 'number':
+            return f"{float(value):,.{self.decimals}f}"
+        if self.fmt == 'int':
+            return f"{int(value):,}"
+        if self.fmt == 'percent':
+            return f"{float(value):.1f}%"
+        if self.fmt in ('date', 'datetime') and isinstance(value, (date, datetime)):
+            if isinstance(value, datetime) and timezone.is_aware(value):
+                value = timezone.localtime(value)
+            return value.strftime(self.date_format)
+        text = str(value)
+        if self.max_length and len(text) > self.max_length:
+            text = text[:self.max_length]
+        return text
+
+    def data(self, value):
+        """Value for spreadsheets: numbers stay numbers, dates become ISO text"""
+        if value is None:
+            return ''
+        if self.fmt in self.NUMERIC:
+            if self.fmt == 'int':
+                return int(value)
+            return round(Decimal(str(value)), 2 if self.fmt != 'number' else self.decimals)
+        if isinstance(value, datetime):
+            if timezone.is_aware(value):
+                value = timezone.localtime(value)
+            return value.strftime('%Y-%m-%d %H:%M:%S')
+        if isinstance(value, date):
+            return value.isoformat()
+        return str(value)
+
+
+class Summary:
+    """A row of headline figures: list of (label, value, fmt) tuples"""
+
+    def __init__(self, items, color=PRIMARY_COLOR, heading=None):
+        self.items = [item if len(item) == 3 else (*item, None) for item in items]
+        self.color = color
+        self.heading = heading
+
+    def columns(self):
+        return [Column(label, label, fmt=fmt, align='CENTER') for label, _, fmt in self.items]
+
+
+class Section:
+    """
+    A table of rows under an optional heading
+
+    Args:
+        heading: Text above the table (or None)
+        columns: List of Column
+        rows: Iterable of dicts or objects, read once
+        totals: Dict of column key -> total for a closing bold row; the first
+            column shows 'TOTAL' unless the dict has a value for it
+        color: Header background colour
+        empty_message: Shown instead of an empty table
+    """
+
+    def __init__(self, heading, columns, rows, totals=None, color=PRIMARY_COLOR, empty_message=None):
+        self.heading = heading
+        self.columns = columns
+        self.rows = rows
+        self.totals = totals
+        self.color = color
+        self.empty_message = empty_message
+
+
+class Details:
+    """Label/value pairs laid out in a grid of `per_row` pairs"""
+
+    def __init__(self, pairs, per_row=2):
+        self.pairs = pairs
+        self.per_row = per_row
+
+
+class Heading:
+    """A sub-heading, optionally starting a new PDF page"""
+
+    def __init__(self, text, page_break=False):
+        self.text = text
+        self.page_break = page_break
+
+
+class Note:
+    """A line of text"""
+
+    def __init__(self, text, bold=False, small=False):
+        self.text = text
+        self.bold = bold
+        self.small = small
+
+
+class Report:
+    """
+    A renderable report
+
+    Args:
+        title: Report title
+        blocks: Iterable of Summary/Section/Details/Heading/Note (may be a generator)
+        subtitle: Line under the title (the generation time is always shown)
+        header: Line above the title, e.g. the company name
+        orientation: 'landscape' or 'portrait'
+        filename: File name without extension
+    """
+
+    def __init__(self, title, blocks, subtitle='', header=None, orientation='landscape', filename='report'):
+        self.title = title
+        self.blocks = blocks
+        self.subtitle = subtitle
+        self.header = header
+        self.orientation = orientation
+        self.filename = filename
+        self.generated_at = timezone.localtime()
+
+    def info_line(self):
+        line = f"Generated: {self.generated_at.strftime('%Y-%m-%d %H:%M:%S')}"
+        return f"{line} | {self.subtitle}" if self.subtitle else line
+
+
+def render(report, output, stream):
+    """Write a report in the given output format ('pdf', 'csv' or 'xlsx') to a binary stream"""
+    renderers = {'pdf': render_pdf, 'csv': render_csv, 'xlsx': render_xlsx}
+    if output not in renderers:
+        raise ValueError(f"Unknown report output '{output}'. Valid: {', '.join(renderers)}")
+    renderers[output](report, stream)
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# PDF
+
+class _LazyFlowables(list):
+    """
+    Flowable list for SimpleDocTemplate.build() that is filled from a generator
+
+    ReportLab consumes flowables from the front of the list and only looks a
+    few items ahead, so keeping a short buffer filled is enough.
+    """
+
+    LOOKAHEAD = 4
+
+    def __init__(self, flowables):
+        super().__init__()
+        self._source = iter(flowables)
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self.LOOKAHEAD:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+class PdfStyles:
+    """Paragraph and table styles shared by every PDF report"""
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        self.normal = styles['Normal']
+        self.header = ParagraphStyle(
+            'ReportHeader', parent=styles['Heading1'], fontSize=20,
+            textColor=colors.HexColor(PRIMARY_COLOR), spaceAfter=4, alignment=TA_CENTER,
+        )
+        self.title = ParagraphStyle(
+            'ReportTitle', parent=styles['Heading1'], fontSize=18,
+            textColor=colors.HexColor(PRIMARY_COLOR), spaceAfter=6, alignment=TA_CENTER,
+        )
+        self.subtitle = ParagraphStyle(
+            'ReportSubtitle', parent=styles['Normal'], fontSize=9,
+            textColor=colors.grey, spaceAfter=12, alignment=TA_CENTER,
+        )
+        self.heading = ParagraphStyle(
+            'ReportHeading', parent=styles['Heading2'], fontSize=12,
+            textColor=colors.HexColor(PRIMARY_COLOR), spaceBefore=10, spaceAfter=6, keepWithNext=1,
+        )
+        self.small = ParagraphStyle('ReportSmall', parent=styles['Normal'], fontSize=8, textColor=colors.grey)
+
+    @staticmethod
+    def table(color, columns, has_totals=False):
+        commands = [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(color)),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')]),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]
+        for index, column in enumerate(columns):
+            commands.append(('ALIGN', (index, 1), (index, -1), column.align))
+        if has_totals:
+            commands += [
+                ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e5e7eb')),
+                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ]
+        return TableStyle(commands)
+
+
+def _pdf_section(section, styles, max_rows):
+    """Flowables of a table section; returns the number of rows laid out (at most max_rows)"""
+    if section.heading:
+        yield Paragraph(section.heading, styles.heading)
+
+    columns = section.columns
+    widths = [column.width * inch for column in columns]
+    header = [column.label for column in columns]
+    rows = iter(section.rows)
+    empty = True
+    laid_out = 0
+    for chunk in _chunks(islice(rows, max_rows), PDF_CHUNK_ROWS):
+        empty = False
+        laid_out += len(chunk)
+        data = [header] + [[column.text(column.get(row)) for column in columns] for row in chunk]
+        table = LongTable(data, colWidths=widths, repeatRows=1)
+        table.setStyle(PdfStyles.table(section.color, columns))
+        yield table
+    truncated = next(rows, None) is not None
+    if truncated:
+        yield Paragraph(
+            f"<b>Only the first {PDF_MAX_ROWS:,} rows of this report fit in a PDF; "
+            f"export it as CSV or XLSX for all rows.</b>", styles.normal
+        )
+
+    if section.totals is not None:
+        totals = [
+            columns[0].text(section.totals.get(columns[0].key, 'TOTAL')) if index == 0
+            else column.text(section.totals[column.key]) if column.key in section.totals else ''
+            for index, column in enumerate(columns)
+        ]
+        table = Table([header, totals], colWidths=widths) if empty else Table([totals], colWidths=widths)
+        if empty:
+            table.setStyle(PdfStyles.table(section.color, columns, has_totals=True))
+        else:
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#e5e7eb')),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ] + [('ALIGN', (index, 0), (index, 0), column.align) for index, column in enumerate(columns)]))
+        yield table
+    elif empty and not truncated and section.empty_message:
+        yield Paragraph(section.empty_message, styles.normal)
+    elif empty:
+        table = Table([header], colWidths=widths)
+        table.setStyle(PdfStyles.table(section.color, columns))
+        yield table
+    yield Spacer(1, 0.2 * inch)
+    return laid_out
+
+
+def _pdf_flowables(report, styles):
+    if report.header:
+        yield Paragraph(report.header, styles.header)
+    yield Paragraph(report.title, styles.title)
+    yield Paragraph(report.info_line(), styles.subtitle)
+
+    remaining = PDF_MAX_ROWS
+    for block in report.blocks:
+        if isinstance(block, Section):
+            remaining -= yield from _pdf_section(block, styles, remaining)
+        elif isinstance(block, Summary):
+            if block.heading:
+                yield Paragraph(block.heading, styles.heading)
+            columns = block.columns()
+            table = Table(
+                [[label for label, _, _ in block.items],
+                 [column.text(value) for column, (_, value, _) in zip(columns, block.items)]],
+                colWidths=[min(2.0, 10.0 / len(columns)) * inch] * len(columns),
+            )
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(block.color)),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 9),
+                ('FONTSIZE', (0, 1), (-1, 1), 10),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor('#eff6ff')),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor(block.color)),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ]))
+            yield table
+            yield Spacer(1, 0.2 * inch)
+        elif isinstance(block, Details):
+            rows = []
+            for pairs in _chunks(block.pairs, block.per_row):
+                row = []
+                for label, value in pairs:
+                    row += [f"{label}:", '-' if value in (None, '') else str(value)]
+                rows.append(row + [''] * (block.per_row * 2 - len(row)))
+            table = Table(rows, colWidths=[1.1 * inch, 2.2 * inch] * block.per_row)
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f3f4f6')),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ] + [('FONTNAME', (index, 0), (index, -1), 'Helvetica-Bold') for index in range(0, block.per_row * 2, 2)]))
+            yield table
+            yield Spacer(1, 0.1 * inch)
+        elif isinstance(block, Heading):
+            if block.page_break:
+                yield PageBreak()
+            yield Paragraph(block.text, styles.heading)
+        elif isinstance(block, Note):
+            text = escape(block.text)
+            yield Paragraph(f"<b>{text}</b>" if block.bold else text, styles.small if block.small else styles.normal)
+            yield Spacer(1, 0.1 * inch)
+
+
+def render_pdf(report, stream):
+    """Write a report as PDF"""
+    pagesize = landscape(A4) if report.orientation == 'landscape' else letter
+    doc = SimpleDocTemplate(
+        stream, pagesize=pagesize, topMargin=0.5 * inch, bottomMargin=0.5 * inch, title=report.title,
+    )
+    doc.build(_LazyFlowables(_pdf_flowables(report, PdfStyles())))
+
+
+# CSV
+
+def iter_report_rows(report):
+    """
+    The report as plain spreadsheet rows (lists of values)
+
+    Shared by the CSV and XLSX renderers. Each block is followed by a blank
+    row. The second item of every yielded pair says whether the row is a
+    header.
+    """
+    yield [report.title], True
+    yield [report.info_line()], False
+    yield [], False
+
+    for block in report.blocks:
+        if isinstance(block, Section):
+            if block.heading:
+                yield [block.heading], True
+            yield [column.label for column in block.columns], True
+            for row in block.rows:
+                yield [column.data(column.get(row)) for column in block.columns], False
+            if block.totals is not None:
+                yield [
+                    block.totals.get(column.key, 'TOTAL') if index == 0
+                    else column.data(block.totals.get(column.key))
+                    for index, column in enumerate(block.columns)
+                ], True
+            yield [], False
+        elif isinstance(block, Summary):
+            if block.heading:
+                yield [block.heading], True
+            columns = block.columns()
+            yield [label for label, _, _ in block.items], True
+            yield [column.data(value) for column, (_, value, _) in zip(columns, block.items)], False
+            yield [], False
+        elif isinstance(block, Details):
+            for label, value in block.pairs:
+                yield [label, '' if value is None else str(value)], False
+            yield [], False
+        elif isinstance(block, Heading):
+            yield [block.text], True
+        elif isinstance(block, Note):
+            yield [block.text], False
+
+
+class Echo:
+    """File-like object whose write() returns what it was given (for csv.writer streaming)"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(report):
+    """Yield the report as CSV text, one line at a time"""
+    writer = csv.writer(Echo())
+    yield '\ufeff'  # lets Excel detect UTF-8
+    for row, _ in iter_report_rows(report):
+        yield writer.writerow(row)
+
+
+def render_csv(report, stream):
+    """Write a report as CSV"""
+    for line in iter_csv(report):
+        stream.write(line.encode('utf-8'))
+
+
+# XLSX
+
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Cell styles: 0 normal, 1 bold, 2 number with two decimals
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+        '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+        '</styleSheet>'
+    ),
+}
+
+
+def _xlsx_column(index):
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def _xlsx_cell(ref, value, bold):
+    if isinstance(value, bool):
+        value = str(value)
+    style = ' s="1"' if bold else ''
+    if isinstance(value, int):
+        return f'<c r="{ref}"{style}><v>{value}</v></c>'
+    if isinstance(value, (Decimal, float)):
+        return f'<c r="{ref}" s="{1 if bold else 2}"><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML.sub('', str(value)))
+    return f'<c r="{ref}" t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def render_xlsx(report, stream):
+    """Write a report as a single-sheet XLSX workbook, streaming the sheet XML"""
+    sheet_name = escape(re.sub(r'[\[\]:*?/\\]', ' ', report.title)[:31] or 'Report')
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        workbook.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+
+        with workbook.open('xl/worksheets/sheet1.xml', 'w') as raw:
+            sheet = io.TextIOWrapper(raw, encoding='utf-8')
+            sheet.write(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            for number, (row, bold) in enumerate(iter_report_rows(report), start=1):
+                cells = ''.join(
+                    _xlsx_cell(f'{_xlsx_column(index)}{number}', value, bold)
+                    for index, value in enumerate(row) if value != ''
+                )
+                sheet.write(f'<row r="{number}">{cells}</row>')
+            sheet.write('</sheetData></worksheet>')
+            sheet.flush()
+            sheet.detach()
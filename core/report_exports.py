@@ -0,0 +1,271 @@
+"""
+Background rendering and caching of report files
+
+Export views hand their parameters to ReportExports.respond(). The file
+(PDF, CSV or XLSX, see core.report_engine) is rendered by the
+run_task_worker command and stored under a hash of the report type,
+parameters and a version of the data it reads, so identical requests are
+served from disk until the data changes. The least recently
+downloaded files are evicted once the cache exceeds
+settings.REPORT_EXPORT_MAX_BYTES.
+"""
+import hashlib
+import json
+import tempfile
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.http import FileResponse, JsonResponse
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from core.models import ReportExport
+from core import business_dates, report_engine
+from core.report_engine import CONTENT_TYPES
+
+
+class ReportExports:
+    """Request, render, serve and evict cached report files"""
+
+    # Report type -> report builder (params -> core.report_engine.Report), user check and
+    # the tables whose (row count, latest value of field) make up the data version
+    INVENTORY_SOURCES = [
+        ('app_inventory.Inventory', 'last_updated'), ('app_inventory.StockTransaction', 'id'),
+        ('app_inventory.LumberProduct', 'updated_at'), ('app_inventory.LumberCategory', 'id'),
+    ]
+    INVENTORY_PERMISSION = 'app_inventory.management_views.is_admin_or_inventory_manager'
+    REPORTS = {
+        'sales_orders': {
+            'report': 'app_sales.sales_pdf_views.build_sales_orders_report',
+            'sources': [('app_sales.SalesOrder', 'updated_at'), ('app_sales.SalesOrderItem', 'id'),
+                        ('app_sales.Customer', 'updated_at')],
+        },
+        'sales_report': {
+            'report': 'app_sales.report_pdf_views.build_sales_report',
+            'sources': [('app_sales.SalesOrder', 'updated_at'), ('app_sales.SalesOrderItem', 'id'),
+                        ('app_sales.SalesFact', 'id'), ('app_sales.Customer', 'updated_at'),
+                        ('app_inventory.LumberProduct', 'updated_at')],
+        },
+        'inventory_report': {
+            'report': 'app_inventory.management_views.build_inventory_report',
+            'permission': INVENTORY_PERMISSION,
+            'sources': INVENTORY_SOURCES,
+        },
+        'inventory_levels': {
+            'report': 'app_inventory.management_views.build_inventory_levels_report',
+            'permission': INVENTORY_PERMISSION,
+            'sources': INVENTORY_SOURCES,
+        },
+        'stock_transactions': {
+            'report': 'app_inventory.management_views.build_stock_transactions_report',
+            'permission': INVENTORY_PERMISSION,
+            'sources': INVENTORY_SOURCES,
+        },
+        'products_catalog': {
+            'report': 'app_inventory.management_views.build_products_catalog_report',
+            'permission': INVENTORY_PERMISSION,
+            'sources': INVENTORY_SOURCES,
+        },
+        'category_summary': {
+            'report': 'app_inventory.management_views.build_category_summary_report',
+            'permission': INVENTORY_PERMISSION,
+            'sources': INVENTORY_SOURCES,
+        },
+        'round_wood_inventory': {
+            'report': 'app_round_wood.inventory_pdf_views.build_inventory_report',
+            'sources': [('app_round_wood.RoundWoodInventory', 'last_updated'), ('app_round_wood.WoodType', 'updated_at')],
+        },
+    }
+
+    DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+    @staticmethod
+    def data_version(report_type):
+        """
+        Fingerprint of the data a report reads
+
+        One COUNT/MAX query per source table; any insert, delete or
+        update of a tracked row changes it. Today's date is included so
+        reports with relative periods ("last 30 days") roll over daily.
+        """
+        parts = [business_dates.business_date().isoformat()]
+        for model_label, field in ReportExports.REPORTS[report_type]['sources']:
+            stats = apps.get_model(model_label).objects.aggregate(rows=Count('pk'), latest=Max(field))
+            parts.append(f"{model_label}:{stats['rows']}:{stats['latest']}")
+        return '|'.join(parts)
+
+    @staticmethod
+    def cache_key(report_type, params):
+        """Content address of a report: sha256 of type, parameters and data version"""
+        payload = json.dumps(
+            [report_type, params, ReportExports.data_version(report_type)], sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def has_permission(report_type, user):
+        permission = ReportExports.REPORTS[report_type].get('permission')
+        return permission is None or import_string(permission)(user)
+
+    @staticmethod
+    def request(report_type, params, user=None):
+        """
+        Get the export for these parameters, queueing a render when there is none
+
+        Args:
+            report_type: Key of REPORTS
+            params: Dict of report parameters (strings)
+            user: Requesting user
+
+        Returns:
+            ReportExport: Ready, or queued/running
+        """
+        from core.tasks import render_report_export
+
+        key = ReportExports.cache_key(report_type, params)
+        export = ReportExport.objects.filter(key=key).first()
+        if export is None:
+            try:
+                with transaction.atomic():
+                    export = ReportExport.objects.create(
+                        key=key, report_type=report_type, params=params,
+                        requested_by=user if user and user.is_authenticated else None,
+                    )
+            except IntegrityError:
+                # The same report was requested at the same moment
+                return ReportExport.objects.get(key=key)
+        elif export.status == 'ready' and export.file and export.file.storage.exists(export.file.name):
+            ReportExport.objects.filter(id=export.id).update(last_accessed_at=timezone.now())
+            return export
+        elif export.status in ('queued', 'running'):
+            return export
+        else:
+            # Failed earlier, or the file was removed from disk
+            export.status = 'queued'
+            export.error = ''
+            export.save(update_fields=['status', 'error'])
+
+        export.task = render_report_export.enqueue(export.id)
+        export.save(update_fields=['task'])
+        return export
+
+    @staticmethod
+    def render(export_id):
+        """
+        Render an export's file (run by the worker)
+
+        Returns:
+            Dict with the export id and file size
+        """
+        export = ReportExport.objects.get(id=export_id)
+        if export.status == 'ready':
+            return {'export_id': export.id, 'size': export.size}
+
+        ReportExport.objects.filter(id=export.id).update(status='running')
+        output = ReportExports.output(export)
+        # Rendered to a temporary file so large reports never sit in memory
+        with tempfile.TemporaryFile() as content:
+            try:
+                report = import_string(ReportExports.REPORTS[export.report_type]['report'])(export.params)
+                report_engine.render(report, output, content)
+            except Exception as exc:
+                ReportExport.objects.filter(id=export.id).update(
+                    status='failed', error=str(exc), finished_at=timezone.now()
+                )
+                raise
+
+            export.size = content.tell()
+            content.seek(0)
+            export.file.save(f'{export.key}.{output}', File(content), save=False)
+        export.status = 'ready'
+        export.finished_at = timezone.now()
+        export.save(update_fields=['file', 'size', 'status', 'finished_at'])
+
+        ReportExports.evict()
+        return {'export_id': export.id, 'size': export.size}
+
+    @staticmethod
+    def evict(max_bytes=None):
+        """
+        Delete the least recently used files beyond the size budget
+
+        Args:
+            max_bytes: Cache size limit (default: settings.REPORT_EXPORT_MAX_BYTES)
+
+        Returns:
+            int: Number of exports evicted
+        """
+        if max_bytes is None:
+            max_bytes = getattr(settings, 'REPORT_EXPORT_MAX_BYTES', ReportExports.DEFAULT_MAX_BYTES)
+
+        kept = 0
+        evicted = []
+        for export in ReportExport.objects.filter(status='ready').order_by('-last_accessed_at', '-id').only(
+            'id', 'file', 'size'
+        ):
+            kept += export.size
+            if kept > max_bytes:
+                evicted.append(export)
+
+        for export in evicted:
+            if export.file:
+                export.file.delete(save=False)
+        ReportExport.objects.filter(id__in=[export.id for export in evicted]).delete()
+        return len(evicted)
+
+    @staticmethod
+    def output(export):
+        """File format of an export ('pdf', 'csv' or 'xlsx')"""
+        output = export.params.get('output', 'pdf')
+        return output if output in CONTENT_TYPES else 'pdf'
+
+    @staticmethod
+    def filename(export):
+        stamp = timezone.localtime(export.finished_at or export.created_at).strftime('%Y%m%d_%H%M%S')
+        return f"{export.report_type}_{stamp}.{ReportExports.output(export)}"
+
+    @staticmethod
+    def serve(export):
+        """Download response for a ready export"""
+        return FileResponse(
+            export.file.open('rb'), as_attachment=True,
+            filename=ReportExports.filename(export), content_type=CONTENT_TYPES[ReportExports.output(export)]
+        )
+
+    @staticmethod
+    def status_payload(export):
+        payload = {
+            'export_id': export.id,
+            'report_type': export.report_type,
+            'status': export.status,
+            'status_url': reverse('report-export-status', args=[export.id]),
+        }
+        if export.status == 'ready':
+            payload['download_url'] = reverse('report-export-download', args=[export.id])
+            payload['size'] = export.size
+        elif export.status == 'failed':
+            payload['error'] = export.error
+        return payload
+
+    @staticmethod
+    def respond(request, report_type, params):
+        """
+        Response of an export view
+
+        A cached file is downloaded straight away. Otherwise JSON clients get
+        202 with the export id; browsers get a page that waits for the worker
+        and then starts the download.
+        """
+        output = request.GET.get('output', 'pdf')
+        params = {**params, 'output': output if output in CONTENT_TYPES else 'pdf'}
+        export = ReportExports.request(report_type, params, request.user)
+        if export.status == 'ready':
+            return ReportExports.serve(export)
+
+        payload = ReportExports.status_payload(export)
+        if 'application/json' in request.headers.get('Accept', ''):
+            return JsonResponse(payload, status=202)
+        return render(request, 'reports/export_pending.html', {'export': payload}, status=202)
@@ -0,0 +1,149 @@
+"""
+Small statistics helpers shared by the reporting modules
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to pure Python
+    np = None
+
+
+def percentiles(values, percents=(50, 90, 99)):
+    """
+    Linear-interpolated percentiles of a sequence of numbers
+
+    Uses NumPy when it is installed, otherwise an equivalent pure Python
+    implementation (same 'linear' method as numpy.percentile).
+
+    Args:
+        values: Sequence of numbers
+        percents: Percentiles to compute (0-100)
+
+    Returns:
+        Dict mapping 'p<percent>' to the value, or None when values is empty
+    """
+    keys = [f'p{percent}' for percent in percents]
+    if len(values) == 0:
+        return dict.fromkeys(keys)
+
+    if np is not None:
+        results = np.percentile(np.asarray(values, dtype=float), percents)
+        return {key: float(result) for key, result in zip(keys, results)}
+
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    results = {}
+    for key, percent in zip(keys, percents):
+        rank = last * percent / 100
+        low = int(rank)
+        high = min(low + 1, last)
+        results[key] = ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+    return results
+
+
+def summarize(values, percents=(50, 90, 99), digits=2):
+    """Count, mean and percentiles of a sequence of numbers, rounded for reports"""
+    summary = {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), digits) if len(values) else None,
+    }
+    for key, value in percentiles(values, percents).items():
+        summary[key] = round(value, digits) if value is not None else None
+    return summary
+
+
+def _x_value(value):
+    """Numeric position of an x value (dates and datetimes are placed on a day scale)"""
+    if hasattr(value, 'timestamp'):
+        return value.timestamp() / 86400
+    if hasattr(value, 'toordinal'):
+        return value.toordinal()
+    return float(value)
+
+
+def _lttb_indexes(xs, ys, max_points):
+    """Indexes kept by Largest-Triangle-Three-Buckets (first and last always kept)"""
+    n = len(xs)
+    every = (n - 2) / (max_points - 2)
+    kept = [0]
+    for bucket in range(max_points - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        # The next bucket's average is the third corner of the triangle
+        next_start, next_end = end, min(int((bucket + 2) * every) + 1, n)
+        a = kept[-1]
+        if np is not None:
+            avg_x = xs[next_start:next_end].mean()
+            avg_y = ys[next_start:next_end].mean()
+            areas = np.abs(
+                (xs[a] - avg_x) * (ys[start:end] - ys[a]) - (xs[a] - xs[start:end]) * (avg_y - ys[a])
+            )
+            kept.append(start + int(areas.argmax()))
+        else:
+            avg_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+            avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+            kept.append(max(
+                range(start, end),
+                key=lambda i: abs((xs[a] - avg_x) * (ys[i] - ys[a]) - (xs[a] - xs[i]) * (avg_y - ys[a])),
+            ))
+    kept.append(n - 1)
+    return kept
+
+
+def _minmax_indexes(ys, max_points):
+    """Indexes of the lowest and highest point of each bucket, in order"""
+    n = len(ys)
+    buckets = max(max_points // 2, 1)
+    if np is not None:
+        bucket = np.arange(n) * buckets // n
+        # Sorted by (bucket, y): each bucket's first entry is its minimum, its last the maximum
+        order = np.lexsort((ys, bucket))
+        bounds = np.searchsorted(bucket[order], np.arange(buckets))
+        lows = order[bounds]
+        highs = order[np.append(bounds[1:], n) - 1]
+        return sorted(set(lows.tolist()) | set(highs.tolist()))
+    groups = {}
+    for i in range(n):
+        groups.setdefault(i * buckets // n, []).append(i)
+    kept = set()
+    for indexes in groups.values():
+        # Same ties as the NumPy path: first lowest, last highest
+        kept.add(min(indexes, key=lambda i: (ys[i], i)))
+        kept.add(max(indexes, key=lambda i: (ys[i], i)))
+    return sorted(kept)
+
+
+def downsample(points, max_points, x='date', y='total', method='lttb'):
+    """
+    Reduce a chart series to at most max_points points
+
+    The bucket size follows from the series length and max_points. 'lttb'
+    (Largest-Triangle-Three-Buckets) keeps the points that best preserve the
+    line's visual shape; 'minmax' keeps each bucket's lowest and highest
+    point, so peaks and troughs are never dropped. Vectorized with NumPy
+    when it is installed.
+
+    Args:
+        points: List of dicts ordered by x
+        max_points: Maximum number of points to return, at least 3 (None or 0: no limit)
+        x: Key of the x value (number, date or datetime)
+        y: Key of the value that drives the selection
+        method: 'lttb' or 'minmax'
+
+    Returns:
+        List of the selected dicts, in order (the input when already short enough)
+    """
+    if not max_points or len(points) <= max(max_points, 3):
+        return points
+    max_points = max(max_points, 3)
+
+    ys = [float(point[y] or 0) for point in points]
+    if np is not None:
+        ys = np.asarray(ys, dtype=float)
+    if method == 'minmax':
+        kept = _minmax_indexes(ys, max_points)
+    else:
+        xs = [_x_value(point[x]) for point in points]
+        if np is not None:
+            xs = np.asarray(xs, dtype=float)
+        kept = _lttb_indexes(xs, ys, max_points)
+    return [points[i] for i in kept]
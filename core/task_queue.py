@@ -0,0 +1,232 @@
+"""
+Database-backed background task queue
+
+Functions decorated with @task in an app's tasks.py can be queued with
+.enqueue(); the run_task_worker command runs them in a process pool,
+retries failures with exponential backoff and stores their results on the
+BackgroundTask row. No broker is needed, the queue is a table.
+
+    # app_sales/tasks.py
+    @task(concurrency=1)
+    def rebuild_pickup_schedule():
+        return PickupScheduler.rebuild()
+
+    rebuild_pickup_schedule.enqueue()
+"""
+import os
+import socket
+import traceback
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules, import_string
+from core.models import BackgroundTask
+
+# Task name -> Task, filled as tasks modules are imported
+registry = {}
+
+
+class Task:
+    """A function that can be run by the worker"""
+
+    def __init__(self, func, name, max_attempts, concurrency, retry_base_seconds):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.concurrency = concurrency
+        self.retry_base_seconds = retry_base_seconds
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, run_at=None, priority=0, **kwargs):
+        """Queue a call of this task; arguments must be JSON serializable"""
+        return TaskQueue.enqueue(self.name, args=args, kwargs=kwargs, run_at=run_at, priority=priority)
+
+    def retry_delay(self, attempts):
+        """Backoff before the next attempt after `attempts` failures"""
+        return timedelta(seconds=self.retry_base_seconds * 2 ** (attempts - 1))
+
+
+def task(func=None, *, max_attempts=3, concurrency=None, retry_base_seconds=30):
+    """
+    Register a function as a background task
+
+    Args:
+        max_attempts: Runs before the task is marked failed
+        concurrency: Maximum instances running at once across all workers (None: no cap)
+        retry_base_seconds: First retry delay, doubled on every further failure
+    """
+    def register(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        registry[name] = Task(func, name, max_attempts, concurrency, retry_base_seconds)
+        return registry[name]
+
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    """Look up a registered task, importing its module if needed"""
+    if name not in registry:
+        import_string(name)
+    return registry[name]
+
+
+def _init_worker_process():
+    """Process pool initializer: make Django usable in the child"""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _execute(name, args, kwargs):
+    """Run a task in a pool process"""
+    from django.db import close_old_connections
+    close_old_connections()
+    try:
+        return get_task(name)(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+class TaskQueue:
+    """Enqueue, claim and complete BackgroundTask rows"""
+
+    # A running task whose worker has not reported back for this long is queued again
+    STALE_AFTER = timedelta(hours=1)
+
+    @staticmethod
+    def enqueue(name, args=(), kwargs=None, run_at=None, priority=0):
+        """
+        Queue a task by name
+
+        Args:
+            name: Registered task name (dotted path)
+            args: Positional arguments (JSON serializable)
+            kwargs: Keyword arguments (JSON serializable)
+            run_at: Earliest start time (default: now)
+            priority: Higher runs first
+
+        Returns:
+            BackgroundTask: The queued row
+        """
+        registered = get_task(name)
+        return BackgroundTask.objects.create(
+            task_name=name,
+            args=list(args),
+            kwargs=kwargs or {},
+            run_at=run_at or timezone.now(),
+            priority=priority,
+            max_attempts=registered.max_attempts,
+        )
+
+    @staticmethod
+    def load_tasks():
+        """Import every installed app's tasks module so their tasks are registered"""
+        autodiscover_modules('tasks')
+        return registry
+
+    @staticmethod
+    def worker_id():
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    @staticmethod
+    def requeue_stale():
+        """Queue again tasks left running by a worker that died"""
+        return BackgroundTask.objects.filter(
+            status='running', started_at__lt=timezone.now() - TaskQueue.STALE_AFTER
+        ).update(status='queued', locked_by='')
+
+    @staticmethod
+    @transaction.atomic
+    def claim(limit, worker_id=None):
+        """
+        Claim up to limit due tasks, honouring each task type's concurrency cap
+
+        Running counts per type are read once and caps apply across all
+        workers sharing the database.
+
+        Returns:
+            List of claimed BackgroundTask rows (now running)
+        """
+        if limit <= 0:
+            return []
+
+        now = timezone.now()
+        running = dict(
+            BackgroundTask.objects.filter(status='running').values('task_name').annotate(
+                count=Count('id')
+            ).values_list('task_name', 'count').order_by()
+        )
+        candidates = BackgroundTask.objects.select_for_update(skip_locked=True).filter(
+            status='queued', run_at__lte=now
+        ).order_by('-priority', 'run_at', 'id').values_list('id', 'task_name')[:limit * 5]
+
+        chosen = []
+        for task_id, name in candidates:
+            cap = registry[name].concurrency if name in registry else None
+            if cap is not None and running.get(name, 0) >= cap:
+                continue
+            running[name] = running.get(name, 0) + 1
+            chosen.append(task_id)
+            if len(chosen) == limit:
+                break
+        if not chosen:
+            return []
+
+        worker_id = worker_id or TaskQueue.worker_id()
+        BackgroundTask.objects.filter(id__in=chosen, status='queued').update(
+            status='running', locked_by=worker_id, started_at=now, attempts=F('attempts') + 1
+        )
+        return list(BackgroundTask.objects.filter(id__in=chosen, status='running', locked_by=worker_id, started_at=now))
+
+    @staticmethod
+    def complete(task_row, result):
+        """Store a task's result"""
+        BackgroundTask.objects.filter(id=task_row.id).update(
+            status='succeeded', result=result, error='', finished_at=timezone.now(), locked_by=''
+        )
+
+    @staticmethod
+    def fail(task_row, error):
+        """Record a failure and schedule a retry while attempts remain"""
+        now = timezone.now()
+        if task_row.attempts < task_row.max_attempts:
+            registered = registry.get(task_row.task_name)
+            delay = registered.retry_delay(task_row.attempts) if registered else timedelta(minutes=1)
+            changes = {'status': 'queued', 'run_at': now + delay}
+        else:
+            changes = {'status': 'failed', 'finished_at': now}
+        BackgroundTask.objects.filter(id=task_row.id).update(error=error, locked_by='', **changes)
+
+    @staticmethod
+    def run(task_row):
+        """Run a claimed task in this process and record the outcome"""
+        try:
+            result = get_task(task_row.task_name)(*task_row.args, **task_row.kwargs)
+        except Exception:
+            TaskQueue.fail(task_row, traceback.format_exc())
+            return False
+        return TaskQueue.record(task_row, result)
+
+    @staticmethod
+    def record(task_row, result):
+        """Store a successful result, failing the task if it cannot be stored"""
+        try:
+            TaskQueue.complete(task_row, result)
+        except (TypeError, ValueError):
+            TaskQueue.fail(task_row, f'Result is not JSON serializable: {traceback.format_exc()}')
+            return False
+        return True
+
+    @staticmethod
+    def run_pending(limit=100):
+        """Claim and run due tasks inline (tests, or a worker without a pool)"""
+        TaskQueue.load_tasks()
+        count = 0
+        for task_row in TaskQueue.claim(limit):
+            TaskQueue.run(task_row)
+            count += 1
+        return count
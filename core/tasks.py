@@ -0,0 +1,11 @@
+"""
+Background tasks of the core app (run by run_task_worker)
+"""
+from core.task_queue import task
+
+
+@task(concurrency=2, max_attempts=2)
+def render_report_export(export_id):
+    """Render a queued report file"""
+    from core.report_exports import ReportExports
+    return ReportExports.render(export_id)
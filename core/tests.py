@@ -1,3 +1,286 @@
-from django.test import TestCase
+import csv
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from core.models import BackgroundTask, CustomUser, ReportExport
+from core.report_engine import Column, Report, Section, Summary, render
+from core.task_queue import TaskQueue, task
 
-# Create your tests here.
+calls = []
+
+
+@task
+def add(a, b):
+    calls.append((a, b))
+    return {'sum': Decimal(a) + Decimal(b)}
+
+
+@task(max_attempts=2, retry_base_seconds=10)
+def explode():
+    raise RuntimeError('boom')
+
+
+@task(concurrency=1)
+def exclusive():
+    return 'done'
+
+
+class TaskQueueTestCase(TestCase):
+    """Tests for the database-backed background task queue"""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        queued = add.enqueue(2, b=3)
+        self.assertEqual(queued.task_name, 'core.tests.add')
+        self.assertEqual(queued.status, 'queued')
+
+        self.assertEqual(TaskQueue.run_pending(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'succeeded')
+        self.assertEqual(queued.attempts, 1)
+        self.assertEqual(queued.result, {'sum': '5'})
+        self.assertEqual(calls, [(2, 3)])
+
+    def test_future_tasks_wait(self):
+        add.enqueue(1, 1, run_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(TaskQueue.run_pending(), 0)
+        self.assertEqual(calls, [])
+
+    def test_failure_backs_off_then_fails(self):
+        queued = explode.enqueue()
+        before = timezone.now()
+        TaskQueue.run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'queued')
+        self.assertIn('RuntimeError: boom', queued.error)
+        self.assertGreaterEqual(queued.run_at, before + timedelta(seconds=10))
+
+        BackgroundTask.objects.filter(id=queued.id).update(run_at=timezone.now())
+        TaskQueue.run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'failed')
+        self.assertEqual(queued.attempts, 2)
+        self.assertIsNotNone(queued.finished_at)
+
+    def test_concurrency_cap(self):
+        first = exclusive.enqueue()
+        second = exclusive.enqueue()
+        other = add.enqueue(1, 2)
+
+        claimed = TaskQueue.claim(10, 'worker-a')
+        self.assertEqual({row.id for row in claimed}, {first.id, other.id})
+        # Capped type stays queued while one instance runs
+        self.assertEqual(TaskQueue.claim(10, 'worker-b'), [])
+
+        TaskQueue.complete(next(row for row in claimed if row.id == first.id), 'done')
+        self.assertEqual([row.id for row in TaskQueue.claim(10, 'worker-b')], [second.id])
+
+    def test_stale_running_tasks_are_requeued(self):
+        queued = add.enqueue(1, 2)
+        TaskQueue.claim(1, 'dead-worker')
+        BackgroundTask.objects.filter(id=queued.id).update(started_at=timezone.now() - timedelta(hours=2))
+
+        self.assertEqual(TaskQueue.requeue_stale(), 1)
+        self.assertEqual(TaskQueue.run_pending(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'succeeded')
+        self.assertEqual(queued.attempts, 2)
+
+
+class ReportExportTestCase(TestCase):
+    """Tests for background report exports and their file cache"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = CustomUser.objects.create_user(username='reports', password='pass1234')
+        self.client.force_login(self.user)
+        self.url = reverse('round_wood:inventory_export_pdf')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_export_is_rendered_by_worker_and_then_cached(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'queued')
+        export = ReportExport.objects.get(id=response.json()['export_id'])
+        self.assertEqual(export.task.task_name, 'core.tasks.render_report_export')
+
+        # A repeated request while queued joins the same export
+        self.assertEqual(self.client.get(self.url, HTTP_ACCEPT='application/json').json()['export_id'], export.id)
+        self.assertEqual(BackgroundTask.objects.count(), 1)
+
+        TaskQueue.run_pending()
+        export.refresh_from_db()
+        self.assertEqual(export.status, 'ready')
+        self.assertGreater(export.size, 0)
+
+        status = self.client.get(reverse('report-export-status', args=[export.id])).json()
+        self.assertEqual(status['download_url'], reverse('report-export-download', args=[export.id]))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        self.assertEqual(BackgroundTask.objects.count(), 1)
+
+    def test_data_change_renders_a_new_file(self):
+        from app_round_wood.models import WoodType
+        from core.report_exports import ReportExports
+
+        first = ReportExports.request('round_wood_inventory', {}, self.user)
+        WoodType.objects.create(name='Narra')
+        second = ReportExports.request('round_wood_inventory', {}, self.user)
+        self.assertNotEqual(first.key, second.key)
+        self.assertEqual(ReportExports.request('round_wood_inventory', {}, self.user).id, second.id)
+
+    def test_least_recently_used_files_are_evicted(self):
+        from core.report_exports import ReportExports
+
+        exports = []
+        for index in range(3):
+            export = ReportExport.objects.create(key=f'{index:064d}', report_type='round_wood_inventory')
+            export.file.save(f'{export.key}.pdf', ContentFile(b'x' * 100), save=False)
+            export.size = 100
+            export.status = 'ready'
+            export.save()
+            ReportExport.objects.filter(id=export.id).update(
+                last_accessed_at=timezone.now() - timedelta(hours=3 - index)
+            )
+            exports.append(export)
+
+        self.assertEqual(ReportExports.evict(max_bytes=250), 1)
+        self.assertEqual(
+            list(ReportExport.objects.order_by('id').values_list('id', flat=True)), [exports[1].id, exports[2].id]
+        )
+        self.assertFalse(exports[0].file.storage.exists(exports[0].file.name))
+
+    def test_output_parameter_selects_the_file_format(self):
+        response = self.client.get(self.url, {'output': 'csv'}, HTTP_ACCEPT='application/json')
+        export = ReportExport.objects.get(id=response.json()['export_id'])
+        self.assertEqual(export.params['output'], 'csv')
+
+        TaskQueue.run_pending()
+        response = self.client.get(self.url, {'output': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('.csv', response['Content-Disposition'])
+
+
+class ReportEngineTestCase(TestCase):
+    """Tests for the PDF/CSV/XLSX report renderers"""
+
+    def setUp(self):
+        self.rows_read = 0
+
+    def rows(self, count):
+        for index in range(count):
+            self.rows_read += 1
+            yield {'name': f'Item {index}', 'qty': index, 'amount': Decimal(index) / 4}
+
+    def report(self, count):
+        return Report('Test Report', [
+            Summary([('Items', count, 'int')]),
+            Section('Items', [
+                Column('Name', 'name'),
+                Column('Qty', 'qty', fmt='int'),
+                Column('Amount', 'amount', fmt='money'),
+            ], self.rows(count), totals={'qty': count}),
+        ])
+
+    def test_csv_has_header_and_one_line_per_row(self):
+        stream = io.BytesIO()
+        render(self.report(3), 'csv', stream)
+        lines = list(csv.reader(io.StringIO(stream.getvalue().decode('utf-8-sig'))))
+        self.assertIn(['Name', 'Qty', 'Amount'], lines)
+        self.assertIn(['Item 2', '2', '0.50'], lines)
+
+    def test_xlsx_is_a_workbook_with_numeric_cells(self):
+        stream = io.BytesIO()
+        render(self.report(3), 'xlsx', stream)
+        with zipfile.ZipFile(stream) as workbook:
+            self.assertIn('xl/worksheets/sheet1.xml', workbook.namelist())
+            sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIn('Item 2', sheet)
+        self.assertIn('<v>0.50</v>', sheet)
+
+    def test_pdf_reads_rows_lazily_across_many_pages(self):
+        stream = io.BytesIO()
+        render(self.report(2000), 'pdf', stream)
+        self.assertTrue(stream.getvalue().startswith(b'%PDF'))
+        self.assertEqual(self.rows_read, 2000)
+
+    def test_pdf_rows_are_capped(self):
+        from unittest import mock
+        from core import report_engine
+        from reportlab.platypus import LongTable
+
+        with mock.patch.object(report_engine, 'PDF_MAX_ROWS', 300):
+            flowables = list(report_engine._pdf_flowables(self.report(1000), report_engine.PdfStyles()))
+        tables = [flowable for flowable in flowables if isinstance(flowable, LongTable)]
+        # Header row plus data rows per table
+        self.assertEqual([len(table._cellvalues) - 1 for table in tables], [250, 50])
+        self.assertIn('CSV or XLSX', ' '.join(
+            flowable.text for flowable in flowables if hasattr(flowable, 'text')
+        ))
+
+    def test_unknown_output_is_rejected(self):
+        with self.assertRaises(ValueError):
+            render(self.report(1), 'docx', io.BytesIO())
+
+
+class DownsampleTestCase(TestCase):
+    def setUp(self):
+        start = timezone.localdate() - timedelta(days=999)
+        self.points = [
+            {'date': start + timedelta(days=day), 'total': Decimal(day * 37 % 101)} for day in range(1000)
+        ]
+        self.points[500]['total'] = Decimal('5000')
+        self.points[700]['total'] = Decimal('-50')
+
+    def test_lttb_keeps_shape(self):
+        from core import stats
+
+        sampled = stats.downsample(self.points, 100)
+
+        self.assertEqual(len(sampled), 100)
+        self.assertIs(sampled[0], self.points[0])
+        self.assertIs(sampled[-1], self.points[-1])
+        self.assertIn(self.points[500], sampled)
+        self.assertEqual(sampled, sorted(sampled, key=lambda point: point['date']))
+
+    def test_minmax_keeps_extremes(self):
+        from core import stats
+
+        sampled = stats.downsample(self.points, 50, method='minmax')
+
+        self.assertLessEqual(len(sampled), 50)
+        self.assertIn(self.points[500], sampled)
+        self.assertIn(self.points[700], sampled)
+
+    def test_pure_python_matches_numpy(self):
+        from unittest import mock
+        from core import stats
+
+        for method in ('lttb', 'minmax'):
+            vectorized = stats.downsample(self.points, 60, method=method)
+            with mock.patch.object(stats, 'np', None):
+                self.assertEqual(stats.downsample(self.points, 60, method=method), vectorized)
+
+    def test_short_series_unchanged(self):
+        from core import stats
+
+        short = self.points[:10]
+        self.assertIs(stats.downsample(short, 100), short)
+        self.assertIs(stats.downsample(self.points, None), self.points)
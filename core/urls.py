@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import home, dashboard, customer_dashboard
+from .views import home, dashboard, customer_dashboard, report_export_status, report_export_download
 from .customer_views import (
     customer_browse_products, customer_product_detail, 
     customer_my_orders, customer_order_detail, customer_profile,
@@ -16,7 +16,7 @@ from app_sales.sales_pdf_views import sales_orders_export_preview, export_sales_
 from app_sales.report_pdf_views import export_sales_report_pdf
 from app_dashboard.views import (
     low_stock_alerts_view, aged_receivables_view, inventory_composition_view,
-    sales_trend_view, supplier_totals_view
+    sales_trend_view, sales_heatmap_view, supplier_totals_view, fulfillment_latency_view
 )
 
 urlpatterns = [
@@ -56,11 +56,15 @@ urlpatterns = [
     path('reports/inventory/', inventory_reports, name='inventory-reports'),
     path('reports/sales/', sales_reports, name='sales-reports'),
     path('reports/sales/export/pdf/', export_sales_report_pdf, name='sales-reports-export-pdf'),
+    path('reports/exports/<int:export_id>/', report_export_status, name='report-export-status'),
+    path('reports/exports/<int:export_id>/download/', report_export_download, name='report-export-download'),
     
     # Dashboard Partials Routes
     path('dashboard/low_stock_alerts/', low_stock_alerts_view, name='dashboard-low-stock-alerts'),
     path('dashboard/aged_receivables/', aged_receivables_view, name='dashboard-aged-receivables'),
     path('dashboard/inventory_composition/', inventory_composition_view, name='dashboard-inventory-composition'),
     path('dashboard/sales_trend/', sales_trend_view, name='dashboard-sales-trend'),
+    path('dashboard/sales_heatmap/', sales_heatmap_view, name='dashboard-sales-heatmap'),
     path('dashboard/supplier_totals/', supplier_totals_view, name='dashboard-supplier-totals'),
+    path('dashboard/fulfillment_latency/', fulfillment_latency_view, name='dashboard-fulfillment-latency'),
 ]
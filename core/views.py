@@ -1,14 +1,16 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.cache import never_cache
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden, JsonResponse
+from django.utils import timezone
 from functools import wraps
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from core.models import CustomUser
+from core.models import CustomUser, ReportExport
+from core.report_exports import ReportExports
 from core.serializers import UserSerializer, UserCreateSerializer
 
 
@@ -87,8 +89,8 @@ def customer_dashboard(request):
     print(f"DEBUG: Rendering customer dashboard", file=sys.stderr)
     
     from app_sales.models import SalesOrder
+    from app_sales.receivables import Receivables
     from app_sales.services import SalesService
-    from django.db.models import Sum, Count
     
     # Get customer's sales orders if they have a linked customer record
     sales_orders = SalesOrder.objects.none()
@@ -101,12 +103,9 @@ def customer_dashboard(request):
         
         if sales_customer:
             sales_orders = sales_customer.sales_orders.all().order_by('-created_at')[:10]
-            stats = sales_customer.sales_orders.aggregate(
-                total=Sum('total_amount'),
-                count=Count('id')
-            )
-            total_spent = stats['total'] or 0
-            order_count = stats['count'] or 0
+            account = Receivables.account(sales_customer)
+            total_spent = account.total_purchases
+            order_count = account.order_count
     except Exception as e:
         print(f"DEBUG: Exception in customer_dashboard: {e}", file=sys.stderr)
         pass
@@ -317,3 +316,28 @@ def delivery_reports(request):
         'breadcrumbs': ['Reports', 'Delivery'],
     }
     return render(request, 'reports/delivery_reports.html', context)
+
+
+# Report exports
+
+@login_required
+@require_http_methods(["GET"])
+def report_export_status(request, export_id):
+    """Status of a background report export (polled by the export page)"""
+    export = get_object_or_404(ReportExport, id=export_id)
+    if not ReportExports.has_permission(export.report_type, request.user):
+        return HttpResponseForbidden("Access Denied")
+    return JsonResponse(ReportExports.status_payload(export))
+
+
+@login_required
+@require_http_methods(["GET"])
+def report_export_download(request, export_id):
+    """Download a rendered report export"""
+    export = get_object_or_404(ReportExport, id=export_id, status='ready')
+    if not ReportExports.has_permission(export.report_type, request.user):
+        return HttpResponseForbidden("Access Denied")
+    if not export.file.storage.exists(export.file.name):
+        raise Http404("Export file was evicted, request the report again")
+    ReportExport.objects.filter(id=export.id).update(last_accessed_at=timezone.now())
+    return ReportExports.serve(export)
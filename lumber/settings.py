@@ -104,6 +104,12 @@ CACHES = {
 }
 
 
+# Notification badge long-polls (app_sales.notification_events) a process may
+# hold open at once. Under sync WSGI a held request blocks its worker, so keep
+# 0 (clients poll every few seconds); raise it for a threaded or ASGI server.
+NOTIFICATION_LONG_POLL_WAITERS = 0
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -130,6 +136,10 @@ LANGUAGE_CODE = "en-us"
 
 TIME_ZONE = "UTC"
 
+# Time zone of the lumber yard. Orders, receipts, stock transactions and
+# deliveries store the yard's calendar date (business_date) for daily reports.
+BUSINESS_TIME_ZONE = "Asia/Manila"
+
 USE_I18N = True
 
 USE_TZ = True
@@ -177,3 +187,16 @@ AUTH_USER_MODEL = 'core.CustomUser'
 
 # Login URL for @login_required decorator
 LOGIN_URL = 'login'
+
+# Outbound customer messages (app_sales.outbox). The console stand-ins print
+# messages instead of sending them; use the SMTP email backend and an SMS
+# gateway adapter in production.
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'orders@lumberyard.local'
+OUTBOX_ADAPTERS = {
+    'email': 'app_sales.outbox.EmailAdapter',
+    'sms': 'app_sales.outbox.ConsoleSmsAdapter',
+}
+
+# Rendered report files (core.report_exports) are evicted least recently used first beyond this size
+REPORT_EXPORT_MAX_BYTES = 500 * 1024 * 1024
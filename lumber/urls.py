@@ -13,7 +13,7 @@ from app_sales.cart_views import ShoppingCartViewSet
 from app_sales.pos import POSViewSet
 from app_sales.report_views import SalesReportViewSet
 from app_sales.confirmation_views import OrderConfirmationViewSet, NotificationViewSet
-from app_delivery.views import DeliveryViewSet
+from app_delivery.views import DeliveryViewSet, VehicleViewSet
 from app_delivery.report_views import DeliveryReportViewSet
 from app_delivery.warehouse import WarehouseViewSet
 from app_supplier.views import SupplierViewSet, PurchaseOrderViewSet, SupplierPriceHistoryViewSet
@@ -55,6 +55,7 @@ router.register(r'notifications', NotificationViewSet, basename='notification')
 router.register(r'deliveries', DeliveryViewSet, basename='delivery')
 router.register(r'delivery-reports', DeliveryReportViewSet, basename='delivery-report')
 router.register(r'warehouse', WarehouseViewSet, basename='warehouse')
+router.register(r'vehicles', VehicleViewSet, basename='vehicle')
 
 # Supplier
 router.register(r'suppliers', SupplierViewSet, basename='supplier')